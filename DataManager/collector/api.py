@@ -3,6 +3,7 @@ from os import path
 
 from .datafile.avro import AvroDataFileReader, AvroDataFileWriter
 from .datafile.json import JSONDataFileReader, JSONDataFileWriter
+from .datafile.parquet import ParquetDataFileReader
 from tqdm import tqdm
 
 __all__ = ['DataFile']
@@ -10,10 +11,20 @@ __all__ = ['DataFile']
 
 class DataFile(object):
 
-    """Interface for file access."""
+    """Interface for file access.
 
-    def __init__(self, source):
+    With num_workers greater than 1 the records are decoded by a pool
+    of processes, each one with a range of avro blocks or JSON
+    records (see the iter_parallel method of the readers). If ordered
+    is False the records of a range are returned as soon as the range
+    is decoded, otherwise they keep the file order. The columns of
+    the parquet files are decoded by the Arrow thread pool.
+    """
+
+    def __init__(self, source, num_workers: int = 0, ordered: bool = True):
         self.__source = source
+        self.__num_workers = num_workers
+        self.__ordered = ordered
         self.__data_collector = self.__get_collector(source)
         self.__iter = None
         self.__index = 0
@@ -24,11 +35,15 @@ class DataFile(object):
     def __setstate__(self, state):
         cur_source = state['source']
         self.__source = cur_source
+        self.__num_workers = state.get('num_workers', 0)
+        self.__ordered = state.get('ordered', True)
         self.__data_collector = self.__get_collector(cur_source)
 
     def __getstate__(self):
         return {
-            'source': self.__source
+            'source': self.__source,
+            'num_workers': self.__num_workers,
+            'ordered': self.__ordered
         }
 
     @property
@@ -43,7 +58,7 @@ class DataFile(object):
             if tmp.find("avro.schema") != -1:
                 return AvroDataFileReader(source)
             else:
-                return JSONDataFileReader(source)
+                return JSONDataFileReader(descriptor=source)
         elif isinstance(source, AvroDataFileWriter):
             tmp = BytesIO(source.raw_data)
             return AvroDataFileReader(tmp)
@@ -60,6 +75,8 @@ class DataFile(object):
                         path.splitext(filename)[1]))
             elif ext == ".avro":
                 return AvroDataFileReader(source)
+            elif ext == ".parquet":
+                return ParquetDataFileReader(source)
             else:
                 raise Exception("File type {} is not supported...".format(ext))
         elif not path.exists(source):
@@ -81,7 +98,12 @@ class DataFile(object):
             yield tmp
 
     def get_data(self):
-        for data in self.__data_collector:
+        if self.__num_workers > 1:
+            records = self.__data_collector.iter_parallel(
+                self.__num_workers, self.__ordered)
+        else:
+            records = self.__data_collector
+        for data in records:
             yield data
 
     def __getitem__(self, idx):
@@ -94,7 +116,10 @@ class DataFile(object):
             DataFile: this object instance
 
         """
-        self.__iter = iter(self.__data_collector)
+        if self.__num_workers > 1:
+            self.__iter = self.get_data()
+        else:
+            self.__iter = iter(self.__data_collector)
         return self
 
     def __next__(self):
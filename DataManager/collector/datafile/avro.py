@@ -1,14 +1,65 @@
 import json
+from bisect import bisect_right
 from io import BytesIO, IOBase
+from multiprocessing import cpu_count
 
 from fastavro import writer as fast_writer
 from fastavro import reader as fast_reader
 from fastavro import parse_schema
 
-from .utils import gen_increasing_slice, AvroObjectTranslator
+from .utils import gen_increasing_slice, parallel_map, AvroObjectTranslator
 
 __all__ = ['AvroDataFileWriter', 'AvroDataFileReader']
 
+AVRO_MAGIC = b'Obj\x01'
+SYNC_SIZE = 16
+# Max bytes of the blocks decoded with a single reader
+READ_SIZE = 2**23
+
+
+def _read_long(descriptor) -> int:
+    """Read a long of the avro binary encoding (zig-zag varint).
+
+    Returns:
+        int: the value, None at the end of the file
+    """
+    value = 0
+    shift = 0
+    while True:
+        byte = descriptor.read(1)
+        if not byte:
+            if shift == 0:
+                return None
+            raise Exception("Truncated avro file...")
+        value |= (byte[0] & 0x7F) << shift
+        shift += 7
+        if not byte[0] & 0x80:
+            return (value >> 1) ^ -(value & 1)
+
+
+def _read_block_range(task: tuple) -> list:
+    """Decode the records of a block range of an avro file.
+
+    Notes: this is just a multiprocessing support function.
+
+    Args:
+        task (tuple): the file name, the first block and the end block
+
+    Returns:
+        list: the records
+    """
+    filename, start, stop = task
+    with AvroDataFileReader(filename) as reader:
+        return list(reader.read_blocks(start, stop))
+
+
+def _decode_avro(data: bytes) -> list:
+    """Decode the records of an avro file in memory.
+
+    Notes: this is just a multiprocessing support function.
+    """
+    return list(fast_reader(BytesIO(data)))
+
 
 class AvroDataFileWriter(object):
 
@@ -97,7 +148,14 @@ class AvroDataFileWriter(object):
 
 class AvroDataFileReader(object):
 
-    """Read an avro file."""
+    """Read an avro file.
+
+    The blocks of the file are indexed reading only their headers
+    (number of records, size and sync marker), so the length is known
+    without decoding the records and indexing decodes only the blocks
+    of the requested records. The blocks can also be decoded in
+    parallel (see iter_parallel).
+    """
 
     def __init__(self, file_):
         """Init function of data reader for .avro files.
@@ -110,7 +168,9 @@ class AvroDataFileReader(object):
 
         """
         self.__descriptor = None
+        self.__filename = None
         if isinstance(file_, str):
+            self.__filename = file_
             self.__descriptor = open(file_, 'rb')
         elif isinstance(file_, (BytesIO, IOBase)):
             self.__descriptor = file_
@@ -118,17 +178,133 @@ class AvroDataFileReader(object):
             raise Exception(
                 "Type '{}' for file_ is not supported...".format(type(file_)))
         self.__avro_iter = None
-        self.__len = None
+        self.__header = None
+        # Offset of each block and of the end of the last one
+        self.__block_offsets = None
+        # Index of the first record of each block and number of records
+        self.__block_records = None
+
+    def __index_blocks(self):
+        """Read the header and the block headers of the file."""
+        if self.__block_offsets is not None:
+            return
+        self.__descriptor.seek(0, 0)
+        if self.__descriptor.read(len(AVRO_MAGIC)) != AVRO_MAGIC:
+            raise Exception("Not an avro file...")
+        # File metadata, a map of bytes
+        while True:
+            num_entries = _read_long(self.__descriptor)
+            if num_entries == 0:
+                break
+            if num_entries < 0:
+                num_entries = -num_entries
+                _read_long(self.__descriptor)
+            for _ in range(2 * num_entries):
+                self.__descriptor.seek(_read_long(self.__descriptor), 1)
+        sync = self.__descriptor.read(SYNC_SIZE)
+        header_size = self.__descriptor.tell()
+        self.__descriptor.seek(0, 0)
+        self.__header = self.__descriptor.read(header_size)
+
+        block_offsets = [header_size]
+        block_records = [0]
+        while True:
+            num_records = _read_long(self.__descriptor)
+            if num_records is None:
+                break
+            self.__descriptor.seek(_read_long(self.__descriptor), 1)
+            if self.__descriptor.read(SYNC_SIZE) != sync:
+                raise Exception(
+                    "Wrong sync marker of the avro block at {}...".format(
+                        block_offsets[-1]))
+            block_offsets.append(self.__descriptor.tell())
+            block_records.append(block_records[-1] + num_records)
+        self.__block_offsets = block_offsets
+        self.__block_records = block_records
 
     def __len__(self):
-        if not self.__len:
-            counter = 0
-            self.__descriptor.seek(0, 0)
-            print("[Check avro lenght...]")
-            for _ in fast_reader(self.__descriptor):
-                counter += 1
-            self.__len = counter
-        return self.__len
+        self.__index_blocks()
+        return self.__block_records[-1]
+
+    @property
+    def num_blocks(self) -> int:
+        self.__index_blocks()
+        return len(self.__block_offsets) - 1
+
+    def read_blocks(self, start: int = 0, stop: int = None):
+        """Decode the records of the blocks from start to stop (excluded).
+
+        Returns:
+            generator: the records as dictionaries
+        """
+        self.__index_blocks()
+        if stop is None or stop > self.num_blocks:
+            stop = self.num_blocks
+        while start < stop:
+            # Decode at most READ_SIZE bytes at a time
+            end = max(
+                bisect_right(self.__block_offsets,
+                             self.__block_offsets[start] + READ_SIZE) - 1,
+                start + 1
+            )
+            end = min(end, stop)
+            for record in fast_reader(BytesIO(self.__raw_blocks(start, end))):
+                yield record
+            start = end
+
+    def __raw_blocks(self, start: int, stop: int) -> bytes:
+        """Get the header and the blocks from start to stop (excluded)."""
+        self.__descriptor.seek(self.__block_offsets[start], 0)
+        return self.__header + self.__descriptor.read(
+            self.__block_offsets[stop] - self.__block_offsets[start])
+
+    def block_ranges(self, num_parts: int) -> list:
+        """Split the blocks in ranges with about the same records.
+
+        Returns:
+            list: (start, stop) of the non empty block ranges
+        """
+        self.__index_blocks()
+        ranges = []
+        start = 0
+        for part in range(1, num_parts + 1):
+            target = len(self) * part // num_parts
+            stop = bisect_right(self.__block_records, target) - 1
+            if part == num_parts:
+                stop = self.num_blocks
+            if stop > start:
+                ranges.append((start, stop))
+                start = stop
+        return ranges
+
+    def iter_parallel(self, num_workers: int = None, ordered: bool = True,
+                      parts_per_worker: int = 4):
+        """Decode the file with a pool of processes.
+
+        Each worker decodes a range of blocks and sends back its
+        records. The workers read the blocks of a file opened with its
+        name, the blocks of a descriptor are read by this process.
+
+        Args:
+            num_workers (int): number of processes, the number of CPUs
+                if not specified
+            ordered (bool): keep the order of the records in the file
+            parts_per_worker (int): block ranges of each worker
+
+        Returns:
+            generator: the records as dictionaries
+        """
+        num_workers = num_workers or cpu_count()
+        ranges = self.block_ranges(num_workers * parts_per_worker)
+        if self.__filename is not None:
+            tasks = [(self.__filename, start, stop) for start, stop in ranges]
+            function = _read_block_range
+        else:
+            tasks = (self.__raw_blocks(start, stop) for start, stop in ranges)
+            function = _decode_avro
+        for records in parallel_map(function, tasks, num_workers, ordered):
+            for record in records:
+                yield record
 
     @property
     def raw_data(self):
@@ -156,24 +332,22 @@ class AvroDataFileReader(object):
         if isinstance(idx, slice):
             to_extract = [elm for elm in gen_increasing_slice(idx)]
         else:
+            if idx < 0:
+                idx += len(self)
             to_extract = [idx]
 
         results = []
-        cur_idx = -1
-        self.__descriptor.seek(0, 0)
-        self.__avro_iter = fast_reader(self.__descriptor)
-
-        while len(to_extract):
-            try:
-                cur_elm = next(self.__avro_iter)
-            except StopIteration:
+        cur_block = None
+        block_records = []
+        for cur_idx in to_extract:
+            if not 0 <= cur_idx < len(self):
                 raise IndexError
-
-            cur_idx += 1
-
-            if cur_idx == to_extract[0]:
-                results.append(cur_elm)
-                to_extract.pop(0)
+            block = bisect_right(self.__block_records, cur_idx) - 1
+            if block != cur_block:
+                cur_block = block
+                block_records = list(self.read_blocks(block, block + 1))
+            results.append(
+                block_records[cur_idx - self.__block_records[block]])
 
         if isinstance(idx, slice):
             if idx.start is not None and idx.stop is not None and idx.start > idx.stop:
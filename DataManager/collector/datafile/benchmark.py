@@ -0,0 +1,96 @@
+import json
+from os import path
+from random import randrange, seed
+from sys import argv
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from .json import JSONDataFileReader, JSONDataFileWriter, orjson
+from .utils import get_or_create_descriptor
+
+NUM_RECORDS = 50000
+
+
+class _ByteJSONReader(object):
+
+    """The byte at a time reader, before the buffered one."""
+
+    def __init__(self, filename: str):
+        self.__descriptor = get_or_create_descriptor(filename)
+
+    def __get_json(self):
+        buffer = b''
+        start = self.__descriptor.tell()
+        for cur_char in iter(lambda: self.__descriptor.read(1), b''):
+            buffer += cur_char
+            if cur_char == b'\n' and len(buffer) >= 2:
+                return buffer, start
+
+        return (None, -1)
+
+    def __iter__(self):
+        self.__descriptor.seek(0, 0)
+        for line, _ in iter(self.__get_json, (None, -1)):
+            yield json.loads(line)
+
+
+def _records(num_records: int):
+    """Records similar to the CMS popularity ones."""
+    seed(42)
+    for idx in range(num_records):
+        yield {
+            'FileName': f"/store/data/Run2018A/file_{randrange(10**6)}.root",
+            'JobId': idx,
+            'SiteName': f"T2_IT_Site{randrange(10)}",
+            'WrapCPU': randrange(10**6) / 10.,
+            'NumberOfCPUs': randrange(1, 8),
+            'StartedRunningTimeStamp': 1530000000000 + idx * 1000,
+            'JobExecExitCode': 0,
+            'DataType': "data" if idx % 3 else "mc",
+            'Protocol': "Local",
+        }
+
+
+def throughput(read, filename: str) -> float:
+    """Measure the read rate of a JSON file.
+
+    Returns:
+        float: MB/s of uncompressed data
+    """
+    with get_or_create_descriptor(filename) as descriptor:
+        size = len(descriptor.read())
+    start = perf_counter()
+    read(filename)
+    return size / 1024**2 / (perf_counter() - start)
+
+
+def bench_json(filename: str = None, num_records: int = NUM_RECORDS):
+    if filename is None:
+        with TemporaryDirectory() as tmp_dir:
+            filename = path.join(tmp_dir, "records.json.gz")
+            with JSONDataFileWriter(filename, data=_records(num_records)):
+                pass
+            return bench_json(filename)
+
+    def iterate(name):
+        for _ in JSONDataFileReader(name):
+            pass
+
+    def batches(name):
+        for _ in JSONDataFileReader(name).iter_batches():
+            pass
+
+    print(f"[Decoder: {'orjson' if orjson is not None else 'json'}]")
+    for label, read in [
+        ("byte reader", lambda name: list(_ByteJSONReader(name))),
+        ("iteration", iterate),
+        ("batches", batches),
+    ]:
+        print(f"{label:>12}: {throughput(read, filename):8.2f} MB/s")
+
+
+if __name__ == "__main__":
+    if len(argv) > 1 and argv[1] == "json":
+        bench_json(argv[2] if len(argv) > 2 else None)
+    else:
+        print("Use: python -m DataManager.collector.datafile.benchmark json ['file.json.gz']")
@@ -0,0 +1,231 @@
+import os
+import zlib
+from os import path
+
+import numpy as np
+
+from .utils import get_or_create_descriptor
+
+__all__ = ['LineIndex']
+
+# Bytes read at a time to build an index
+READ_SIZE = 2**20
+
+
+class LineIndex(object):
+
+    """Positions of the records of a line-delimited data file.
+
+    The index has the offset of each record in the uncompressed data
+    and the access points of the file: the (compressed, uncompressed)
+    offsets where a reader can start to decompress, that are the
+    members of a multi-member gzip file, as the ones written by
+    JSONDataFileWriter. A file with a single access point can be read
+    only from the beginning.
+
+    The index is saved next to the file, in filename + ".idx", and it
+    is built again when the size or the modification time of the file
+    change. The saved index of a file with a single access point gives
+    the number of records and their offsets without a new scan, the
+    file is still decompressed from the beginning to reach them.
+    """
+
+    VERSION = 1
+
+    def __init__(self, offsets, access_points, size: int = 0, mtime: int = 0):
+        """Init function of the index.
+
+        Args:
+            offsets (list): uncompressed offset of each record
+            access_points (list): (compressed, uncompressed) offsets
+                of the access points
+            size (int): size of the indexed file
+            mtime (int): modification time of the indexed file in ns
+
+        Returns:
+            LineIndex: the instance of this object
+
+        """
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.access_points = np.asarray(
+            access_points, dtype=np.int64).reshape(-1, 2)
+        self.size = size
+        self.mtime = mtime
+
+    def __len__(self):
+        return len(self.offsets)
+
+    @property
+    def seekable(self) -> bool:
+        """True if the file can be read from more than one point."""
+        return len(self.access_points) > 1
+
+    def access_point(self, pos: int) -> tuple:
+        """Get the last access point before an uncompressed offset.
+
+        Returns:
+            tuple (int, int): the compressed and uncompressed offsets
+        """
+        idx = np.searchsorted(self.access_points[:, 1], pos, side='right') - 1
+        compressed, uncompressed = self.access_points[max(idx, 0)]
+        return int(compressed), int(uncompressed)
+
+    @staticmethod
+    def sidecar_name(filename: str) -> str:
+        return filename + ".idx"
+
+    @classmethod
+    def load(cls, filename: str) -> 'LineIndex':
+        """Load the saved index of a file.
+
+        Returns:
+            LineIndex: the index, None if it is missing or outdated
+        """
+        stat = os.stat(filename)
+        try:
+            with open(cls.sidecar_name(filename), "rb") as index_file:
+                with np.load(index_file) as arrays:
+                    header = arrays['header'].tolist()
+                    if header != [cls.VERSION, stat.st_size, stat.st_mtime_ns]:
+                        return None
+                    return cls(arrays['offsets'], arrays['access_points'],
+                               stat.st_size, stat.st_mtime_ns)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, filename: str) -> 'LineIndex':
+        """Save the index next to the file, if the folder is writable."""
+        index_name = self.sidecar_name(filename)
+        tmp_name = f"{index_name}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_name, "wb") as index_file:
+                np.savez(
+                    index_file,
+                    header=np.array([self.VERSION, self.size, self.mtime],
+                                    dtype=np.int64),
+                    offsets=self.offsets,
+                    access_points=self.access_points
+                )
+            os.replace(tmp_name, index_name)
+        except OSError:
+            if path.exists(tmp_name):
+                os.remove(tmp_name)
+        return self
+
+    @classmethod
+    def get(cls, filename: str) -> 'LineIndex':
+        """Load the index of a file, building it if needed."""
+        index = cls.load(filename)
+        if index is None:
+            index = cls.build(filename).save(filename)
+        return index
+
+    @staticmethod
+    def has_members(filename: str, max_read: int = 2**22) -> bool:
+        """Check if a gzip file has more than one member.
+
+        Only the first max_read compressed bytes are decompressed, a
+        file with a bigger first member is treated as a single member.
+        """
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        read = 0
+        with open(filename, "rb") as raw_file:
+            while read < max_read:
+                data = raw_file.read(READ_SIZE)
+                if not data:
+                    return False
+                read += len(data)
+                decompressor.decompress(data)
+                if decompressor.eof:
+                    rest = decompressor.unused_data or raw_file.read(READ_SIZE)
+                    # Padding after the member
+                    return len(rest.strip(b'\x00')) > 0
+        return False
+
+    @classmethod
+    def build(cls, filename: str = None, descriptor=None) -> 'LineIndex':
+        """Index a file, reading it once.
+
+        The access points are found only in the gzip files opened by
+        filename, the descriptors are read from the current position.
+        """
+        assert any([filename is not None, descriptor is not None]
+                   ), "You have to specify a filename or a descriptor..."
+        newlines = []
+        access_points = []
+        total = 0
+
+        def add_data(data: bytes):
+            nonlocal total
+            newlines.append(np.flatnonzero(
+                np.frombuffer(data, dtype=np.uint8) == ord('\n')) + total)
+            total += len(data)
+
+        stat = None
+        if descriptor is None:
+            stat = os.stat(filename)
+        if descriptor is None and filename.endswith(".gz"):
+            with open(filename, "rb") as raw_file:
+                for compressed, data in cls.__gzip_members(raw_file):
+                    if compressed is not None:
+                        access_points.append((compressed, total))
+                    add_data(data)
+        else:
+            access_points.append((0, 0))
+            if descriptor is None:
+                with get_or_create_descriptor(filename) as cur_descriptor:
+                    for data in iter(lambda: cur_descriptor.read(READ_SIZE), b''):
+                        add_data(data)
+            else:
+                for data in iter(lambda: descriptor.read(READ_SIZE), b''):
+                    add_data(data)
+
+        newlines = np.concatenate(newlines) if newlines else np.empty(0, dtype=np.int64)
+        starts = np.concatenate(([0], newlines + 1))
+        # Skip the empty lines and the end of the file
+        starts = starts[starts < total]
+        starts = starts[~np.isin(starts, newlines)]
+        if not access_points:
+            access_points.append((0, 0))
+        return cls(
+            starts, access_points,
+            stat.st_size if stat else 0,
+            stat.st_mtime_ns if stat else 0
+        )
+
+    @staticmethod
+    def __gzip_members(raw_file):
+        """Decompress a gzip file member by member.
+
+        Yields:
+            tuple (int, bytes): the compressed offset of the member,
+                None if the data is not at the beginning of a member,
+                and the decompressed data
+        """
+        data = b''
+        pos = 0
+        decompressor = None
+        while True:
+            if not data:
+                data = raw_file.read(READ_SIZE)
+                if not data:
+                    return
+            start = None
+            if decompressor is None:
+                # Padding after the last member
+                if not data.strip(b'\x00'):
+                    pos += len(data)
+                    data = b''
+                    continue
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                start = pos
+            out = decompressor.decompress(data)
+            if decompressor.eof:
+                consumed = len(data) - len(decompressor.unused_data)
+                data = decompressor.unused_data
+                decompressor = None
+            else:
+                consumed = len(data)
+                data = b''
+            pos += consumed
+            yield start, out
@@ -1,23 +1,102 @@
+import gzip
 import json
 from io import IOBase
-from string import whitespace
+from itertools import chain
+from multiprocessing import cpu_count
 from types import GeneratorType
 
-from .utils import gen_increasing_slice, get_or_create_descriptor
+import numpy as np
+
+from .index import LineIndex
+from .utils import gen_increasing_slice, get_or_create_descriptor, parallel_map
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 __all__ = ['JSONDataFileReader', 'JSONDataFileWriter']
 
+# Bytes decompressed by each read of the JSON reader
+BLOCK_SIZE = 2**20
+# Uncompressed bytes of each gzip member written, the access points
+# of the reader index
+MEMBER_SIZE = 2**18
+# Lines parsed by each task of a parallel read without access points
+PARSE_BATCH_SIZE = 4096
+
+
+def loads(string):
+    """Parse a JSON object, with orjson if it is installed.
+
+    The objects that orjson rejects, as the ones with NaN values or
+    integers bigger than 64 bit, are parsed with the json module.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(string)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(string)
+
+
+def _loads_lines(lines: list) -> list:
+    """Parse a batch of JSON lines.
+
+    Notes: this is just a multiprocessing support function.
+    """
+    return [loads(line) for line in lines]
+
+
+def _read_record_range(task: tuple) -> list:
+    """Parse consecutive records of a JSON data file.
+
+    Notes: this is just a multiprocessing support function.
+
+    Args:
+        task (tuple): the file name, the compressed and uncompressed
+            offsets of the access point before the records, the
+            uncompressed offset of the first record and the number of
+            records
+
+    Returns:
+        list: the records
+    """
+    filename, compressed, uncompressed, offset, num_records = task
+    records = []
+    with open(filename, "rb") as raw_file:
+        raw_file.seek(compressed)
+        descriptor = raw_file
+        if filename.endswith(".gz"):
+            descriptor = gzip.GzipFile(fileobj=raw_file, mode="rb")
+        descriptor.seek(offset - uncompressed, 1)
+        while len(records) < num_records:
+            line = descriptor.readline()
+            if not line:
+                break
+            if not line.isspace():
+                records.append(loads(line))
+    return records
+
 
 class JSONDataFileWriter(object):
 
-    """Write json.gz file."""
+    """Write json.gz file.
 
-    def __init__(self, filename: str = None, descriptor: 'IOBase' = None, data=None, append: bool = False):
+    A json.gz file is written as a sequence of gzip members of about
+    member_size uncompressed bytes, like the BGZF format, so the
+    readers can start to decompress it at the beginning of each member
+    (see LineIndex). The result is still a standard gzip file.
+    """
+
+    def __init__(self, filename: str = None, descriptor: 'IOBase' = None, data=None, append: bool = False,
+                 member_size: int = MEMBER_SIZE):
         """Init function of data writer for json.gz files.
 
         Args:
             filename (str): name of the json.gz file to write.
             data (str, dict, list(str), list(dict)): initial data to be inserted
+            member_size (int): uncompressed bytes of a gzip member
 
         Returns:
             JSONDataFileWriter: the instance of this object
@@ -27,7 +106,13 @@ class JSONDataFileWriter(object):
                    ), "You have to specify a filename or a descriptor..."
         self.__filename = filename
         self.__descriptor = descriptor
-        if not self.__descriptor:
+        self.__raw_file = None
+        self.__member_size = member_size
+        self.__member_written = 0
+        if not self.__descriptor and self.__filename.endswith(".json.gz"):
+            self.__raw_file = open(self.__filename, "ab" if append else "wb")
+            self.__descriptor = gzip.GzipFile(fileobj=self.__raw_file, mode="wb")
+        elif not self.__descriptor:
             if append:
                 self.__descriptor = get_or_create_descriptor(
                     self.__filename, "ab")
@@ -35,7 +120,7 @@ class JSONDataFileWriter(object):
                 self.__descriptor = get_or_create_descriptor(
                     self.__filename, "wb")
 
-        if append:
+        if append and self.__raw_file is None:
             self.__descriptor.seek(0, 2)
 
         if data is not None:
@@ -74,7 +159,14 @@ class JSONDataFileWriter(object):
             JSONDataFileWriter: this object instance
 
         """
-        return self.__descriptor.write(data.encode("utf-8") + b'\n')
+        if self.__raw_file is not None and self.__member_written >= self.__member_size:
+            # Start a new gzip member
+            self.__descriptor.close()
+            self.__descriptor = gzip.GzipFile(fileobj=self.__raw_file, mode="wb")
+            self.__member_written = 0
+        written = self.__descriptor.write(data.encode("utf-8") + b'\n')
+        self.__member_written += written
+        return written
 
     def append(self, data):
         """Append data to the json.gz file.
@@ -108,10 +200,15 @@ class JSONDataFileWriter(object):
         
         return self
 
-    def __del__(self):
-        """Object destructor."""
+    def __close(self):
         if not self.__descriptor.closed:
             self.__descriptor.close()
+        if self.__raw_file is not None and not self.__raw_file.closed:
+            self.__raw_file.close()
+
+    def __del__(self):
+        """Object destructor."""
+        self.__close()
 
     def __enter__(self):
         """Initialization for 'with' statement.
@@ -124,18 +221,29 @@ class JSONDataFileWriter(object):
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Closing function for the 'with' statement."""
-        self.__descriptor.close()
+        self.__close()
 
 
 class JSONDataFileReader(object):
 
-    """Read json.gz file with easy access to data."""
+    """Read json.gz file with easy access to data.
+
+    The file is decompressed in blocks of block_size bytes and the
+    objects are the lines of the blocks. Indexing, slicing and
+    start_from of a multi-member gzip file (see JSONDataFileWriter) use
+    a LineIndex of the file, built with a single read of the file the
+    first time it is needed and saved next to it. The other files are
+    scanned from the beginning, unless their index is already in memory
+    or saved (len builds and saves it).
+    """
 
-    def __init__(self, filename: str = None, descriptor: 'IOBase' = None):
+    def __init__(self, filename: str = None, descriptor: 'IOBase' = None,
+                 block_size: int = BLOCK_SIZE):
         """Init function of data reader for json.gz files.
 
         Args:
             filename (str): name of the json.gz file to open.
+            block_size (int): bytes of each read of the file
 
         Returns:
             JSONDataFileReader: the instance of this object
@@ -145,53 +253,147 @@ class JSONDataFileReader(object):
                    ), "You have to specify a filename or a descriptor..."
         self.__filename = filename
         self.__descriptor = descriptor
+        self.__own_descriptor = not self.__descriptor
         if not self.__descriptor:
             self.__descriptor = get_or_create_descriptor(self.__filename)
-        self.__last_index = 0
-        self.__last_index_pos = 0
-        self.__len = None
-        self.__whitespaces = [elm.encode("utf-8") for elm in whitespace]
-        self.__getitem_start = 0
-        self.__checkpoints = {}
+        self.__index = None
+        # If the file is a multi-member gzip, None if not checked yet
+        self.__members = None
+        self.__block_size = block_size
+        # Decompressed data not consumed yet: the bytes of the last
+        # blocks, the offset of the next object in them and the
+        # position of the first byte in the stream
+        self.__buffer = b''
+        self.__buffer_offset = 0
+        self.__buffer_start = 0
+        # The descriptor of a gzip file can start from a member: the
+        # raw file and the uncompressed position of the member
+        self.__raw_file = None
+        self.__descriptor_start = 0
 
     @property
     def raw_data(self):
+        self.__drop_buffer()
+        if self.__descriptor_start != 0:
+            self.__open_member(0, 0)
         self.__descriptor.seek(0, 0)
         return self.__descriptor.read()
 
-    def add_checkpoint(self, index: int, pos: int):
-        self.__checkpoints[index] = pos
+    @property
+    def index(self) -> 'LineIndex':
+        """The index of the file, built if it is missing."""
+        if self.__index is None:
+            if self.__own_descriptor:
+                self.__index = LineIndex.get(self.__filename)
+            else:
+                self.__drop_buffer()
+                self.__descriptor.seek(0, 0)
+                self.__index = LineIndex.build(descriptor=self.__descriptor)
+        return self.__index
 
-    def __get_checkpoint(self, cur_index: int):
-        for index in reversed(sorted(self.__checkpoints)):
-            if cur_index > index:
-                return (index, self.__checkpoints[index])
-        return False
+    @property
+    def __indexed(self) -> bool:
+        """True if the random accesses go through the index."""
+        if self.__index is None and self.__members is None:
+            if self.__own_descriptor:
+                self.__index = LineIndex.load(self.__filename)
+            self.__members = (self.__own_descriptor and self.__index is None
+                              and self.__filename.endswith(".gz")
+                              and LineIndex.has_members(self.__filename))
+        return self.__index is not None or self.__members
+
+    def __lines_at(self, targets):
+        """Get the lines of the records at increasing indexes.
+
+        Without the index the file is read once from the beginning.
+
+        Yields:
+            bytes: the line of each record, up to the end of the file
+        """
+        if self.__indexed:
+            offsets = self.index.offsets
+            for target in targets:
+                if target >= len(offsets):
+                    return
+                self.__seek(int(offsets[target]))
+                yield self.__get_json()[0]
+            return
+        self.__seek(0)
+        cur_idx = 0
+        for target in targets:
+            while cur_idx <= target:
+                line, _ = self.__get_json()
+                if line is None:
+                    return
+                cur_idx += 1
+            yield line
+
+    def __drop_buffer(self):
+        """Empty the buffer, before a direct use of the descriptor."""
+        self.__buffer = b''
+        self.__buffer_offset = 0
+        self.__buffer_start = -1
+
+    def __open_member(self, compressed: int, uncompressed: int):
+        """Start to decompress the file from a gzip member."""
+        if self.__raw_file is None:
+            self.__raw_file = open(self.__filename, "rb")
+        self.__descriptor.close()
+        self.__raw_file.seek(compressed)
+        self.__descriptor = gzip.GzipFile(fileobj=self.__raw_file, mode="rb")
+        self.__descriptor_start = uncompressed
+
+    def __seek(self, pos: int):
+        """Move the cursor to a position of the decompressed stream.
+
+        The positions inside the buffer do not touch the descriptor. A
+        backward seek of a compressed file decompresses it again from
+        the beginning, or from the nearest gzip member if the file is
+        indexed.
+        """
+        if self.__buffer_start <= pos <= self.__buffer_start + len(self.__buffer):
+            self.__buffer_offset = pos - self.__buffer_start
+            return
+        cur_pos = self.__descriptor_start + self.__descriptor.tell()
+        if self.__own_descriptor and self.__index is not None and self.__index.seekable:
+            compressed, uncompressed = self.__index.access_point(pos)
+            if uncompressed != self.__descriptor_start or pos < cur_pos:
+                self.__open_member(compressed, uncompressed)
+        elif pos < self.__descriptor_start:
+            self.__open_member(0, 0)
+        self.__descriptor.seek(pos - self.__descriptor_start, 0)
+        self.__buffer = b''
+        self.__buffer_offset = 0
+        self.__buffer_start = pos
+
+    def __read_block(self) -> bool:
+        """Add a block to the buffer, dropping the consumed data.
+
+        Returns:
+            bool: False at the end of the file
+        """
+        if self.__buffer_start < 0:
+            self.__buffer_start = self.__descriptor_start + self.__descriptor.tell()
+        block = self.__descriptor.read(self.__block_size)
+        if not block:
+            return False
+        self.__buffer_start += self.__buffer_offset
+        self.__buffer = self.__buffer[self.__buffer_offset:] + block
+        self.__buffer_offset = 0
+        return True
 
     def __len__(self):
-        if not self.__len:
-            self.__descriptor.seek(0, 0)
-            num_lines = self.__descriptor.read().decode("utf-8").count('\n')
-            self.__len = num_lines
-        return self.__len
-
-    def __get_json_from_end(self, step: int = 1024):
-        buffer = b''
-        index = -step - 1
-        cur_chars = b''
-        while cur_chars.rfind(b'\n') == -1:
-            self.__descriptor.seek(index, 2)
-            last_pos = self.__descriptor.tell()
-            cur_chars = self.__descriptor.read(step)
-            buffer = cur_chars + buffer
-            index -= step
-        if len(buffer) >= 2:
-            return (
-                buffer[cur_chars.rfind(b'\n')+1:], last_pos +
-                cur_chars.rfind(b'\n')
-            )
-        else:
-            return (None, -1)
+        if self.__index is None:
+            # Keep the cursor of a running iteration
+            if self.__buffer_start >= 0:
+                cur_pos = self.__buffer_start + self.__buffer_offset
+            else:
+                cur_pos = self.__descriptor_start + self.__descriptor.tell()
+            index = self.index
+            self.__drop_buffer()
+            self.__seek(cur_pos)
+            return len(index)
+        return len(self.__index)
 
     def __get_json(self):
         """Extract a json object string from the file.
@@ -202,14 +404,150 @@ class JSONDataFileReader(object):
                    in the file
 
         """
-        buffer = b''
-        start = self.__descriptor.tell()
-        for cur_char in iter(lambda: self.__descriptor.read(1), b''):
-            buffer += cur_char
-            if cur_char == b'\n' and len(buffer) >= 2:
-                return buffer, start
+        while True:
+            offset = self.__buffer_offset
+            end = self.__buffer.find(b'\n', offset)
+            if end == -1:
+                if self.__read_block():
+                    continue
+                end = len(self.__buffer)
+                if offset >= end:
+                    return (None, -1)
+            self.__buffer_offset = min(end + 1, len(self.__buffer))
+            # Skip the empty lines
+            if end - offset > 0 and not self.__buffer[offset:end].isspace():
+                return self.__buffer[offset:end + 1], self.__buffer_start + offset
+
+    def __get_lines(self) -> list:
+        """Extract all the complete lines of the buffer.
 
-        return (None, -1)
+        Returns:
+            list: the non empty lines, empty at the end of the file
+        """
+        while True:
+            end = self.__buffer.rfind(b'\n', self.__buffer_offset)
+            if end == -1 and self.__read_block():
+                continue
+            if end == -1:
+                # Last line without a new line character
+                end = len(self.__buffer)
+            lines = self.__buffer[self.__buffer_offset:end].split(b'\n')
+            self.__buffer_offset = min(end + 1, len(self.__buffer))
+            lines = [line for line in lines if line and not line.isspace()]
+            if lines or not self.__read_block():
+                return lines
+
+    def read_records(self, start: int = 0, stop: int = None):
+        """Parse the records from start to stop (excluded).
+
+        Returns:
+            generator: the records as dictionaries
+        """
+        offsets = self.index.offsets
+        if stop is None or stop > len(offsets):
+            stop = len(offsets)
+        if start >= stop:
+            return
+        self.__seek(int(offsets[start]))
+        for _ in range(stop - start):
+            yield loads(self.__get_json()[0])
+
+    @property
+    def __splittable(self) -> bool:
+        """True if a process can start to read the file at a record."""
+        return self.__own_descriptor and (
+            self.__filename.endswith(".json") or self.__indexed and self.index.seekable)
+
+    def record_ranges(self, num_parts: int) -> list:
+        """Split the records in ranges with about the same size.
+
+        The ranges of a multi-member gzip file start at the first
+        record of a member, so each one is decompressed only once.
+
+        Returns:
+            list: (start, stop) of the non empty record ranges
+        """
+        index = self.index
+        starts = np.arange(len(index))
+        if index.seekable:
+            starts = np.unique(np.searchsorted(
+                index.offsets, index.access_points[:, 1]))
+        targets = np.arange(1, num_parts) * len(index) // num_parts
+        bounds = starts[np.clip(np.searchsorted(starts, targets), 0, len(starts) - 1)]
+        bounds = np.unique(np.concatenate(([0], bounds, [len(index)])))
+        return [
+            (int(start), int(stop))
+            for start, stop in zip(bounds[:-1], bounds[1:])
+            if stop > start
+        ]
+
+    def iter_parallel(self, num_workers: int = None, ordered: bool = True,
+                      parts_per_worker: int = 4):
+        """Parse the file with a pool of processes.
+
+        The workers of an uncompressed or multi-member gzip file read
+        a range of records each. The other files are decompressed by
+        this process and the workers parse batches of lines.
+
+        Args:
+            num_workers (int): number of processes, the number of CPUs
+                if not specified
+            ordered (bool): keep the order of the records in the file
+            parts_per_worker (int): record ranges of each worker
+
+        Returns:
+            generator: the records as dictionaries
+        """
+        num_workers = num_workers or cpu_count()
+        if self.__splittable:
+            offsets = self.index.offsets
+            tasks = []
+            for start, stop in self.record_ranges(num_workers * parts_per_worker):
+                offset = int(offsets[start])
+                compressed, uncompressed = self.index.access_point(offset)
+                tasks.append((self.__filename, compressed,
+                              uncompressed, offset, stop - start))
+            function = _read_record_range
+        else:
+            self.__seek(0)
+            tasks = self.__line_batches(PARSE_BATCH_SIZE)
+            function = _loads_lines
+        for records in parallel_map(function, tasks, num_workers, ordered):
+            for record in records:
+                yield record
+
+    def __line_batches(self, batch_size: int):
+        batch = []
+        lines = self.__get_lines()
+        while lines:
+            batch.extend(lines)
+            while len(batch) >= batch_size:
+                yield batch[:batch_size]
+                batch = batch[batch_size:]
+            lines = self.__get_lines()
+        if batch:
+            yield batch
+
+    def iter_batches(self, batch_size: int = 1024):
+        """Iterate over the JSON objects from the current position.
+
+        Args:
+            batch_size (int): max number of objects of a batch
+
+        Yields:
+            list: a batch of objects converted in dictionaries
+        """
+        batch = []
+        lines = self.__get_lines()
+        while lines:
+            for line in lines:
+                batch.append(loads(line))
+                if len(batch) == batch_size:
+                    yield batch
+                    batch = []
+            lines = self.__get_lines()
+        if batch:
+            yield batch
 
     def start_from(self, index: int, stop: int = -1):
         """Set the cursor to a specific object index to start.
@@ -219,22 +557,15 @@ class JSONDataFileReader(object):
         """
         if index < 0:
             raise Exception("Index have to be positive or equal to 0...")
-        self.__descriptor.seek(0, 0)
-        cur_idx = 0
+        first = next(self.__lines_at([index]), None)
+        if first is None:
+            return
+        lines = chain([first], (json_obj for json_obj, _ in iter(self.__get_json, (None, -1))))
 
-        checkpoint = self.__get_checkpoint(index)
-        if checkpoint != False:
-            self.__descriptor.seek(checkpoint[1])
-            cur_idx = checkpoint[0]
-
-        for _ in range(index - cur_idx):
-            _, _ = self.__get_json()
-            cur_idx += 1
-
-        for idx, (json_obj, _) in enumerate(iter(self.__get_json, (None, -1)), cur_idx):
+        for idx, json_obj in enumerate(lines, index):
             if idx == stop - 1:
                 break
-            yield json.loads(json_obj, encoding="utf-8")
+            yield loads(json_obj)
 
     def __getitem__(self, idx):
         """Select an item or a group of item from the file.
@@ -255,52 +586,20 @@ class JSONDataFileReader(object):
         assert isinstance(
             idx, (int, slice)), "Index Could be an integer or a slice"
 
-        if isinstance(idx, int) and idx < 0:
-            for cur_index in range(-idx):
-                obj, pos = self.__get_json_from_end()
-                if -cur_index - 1 == idx:
-                    return json.loads(obj, encoding="utf-8")
+        if isinstance(idx, int):
+            if idx < 0:
+                idx += len(self)
+                if idx < 0:
+                    raise IndexError
+            for json_obj in self.__lines_at([idx]):
+                return loads(json_obj)
             raise IndexError
 
-        if isinstance(idx, slice):
-            to_extract = (elm for elm in gen_increasing_slice(idx))
-        else:
-            to_extract = [idx]
-
-        results = []
-
-        for target_idx in to_extract:
-            self.__descriptor.seek(0, 0)
-            cur_idx = 0
+        results = [loads(json_obj) for json_obj in self.__lines_at(gen_increasing_slice(idx))]
 
-            checkpoint = self.__get_checkpoint(target_idx)
-            if checkpoint != False:
-                self.__descriptor.seek(checkpoint[1])
-                cur_idx = checkpoint[0]
-                self.__last_index = checkpoint[0]
-                self.__last_index_pos = checkpoint[1]
-
-            if self.__last_index > cur_idx and target_idx > self.__last_index:
-                self.__descriptor.seek(self.__last_index_pos)
-                cur_idx = self.__last_index
-
-            for obj, start in iter(lambda: self.__get_json(), (None, -1)):
-                last_obj = obj
-                self.__last_index_pos = start
-                self.__last_index = cur_idx
-
-                if cur_idx == target_idx:
-                    results.append(json.loads(last_obj, encoding="utf-8"))
-                    break
-
-                cur_idx += 1
-
-        if isinstance(idx, slice):
-            if idx.start is not None and idx.stop is not None and idx.start > idx.stop:
-                return list(reversed(results))
-            return results
-        else:
-            return results.pop(0)
+        if idx.start is not None and idx.stop is not None and idx.start > idx.stop:
+            return list(reversed(results))
+        return results
 
     def __iter__(self):
         """Initialize the JSON reader iterator.
@@ -309,7 +608,7 @@ class JSONDataFileReader(object):
             JSONDataFileReader: this object instance
 
         """
-        self.__descriptor.seek(0, 0)
+        self.__seek(0)
         return self
 
     def __next__(self):
@@ -324,14 +623,19 @@ class JSONDataFileReader(object):
         """
         next_json, _ = self.__get_json()
         if next_json is not None:
-            return json.loads(next_json, encoding="utf-8")
+            return loads(next_json)
         else:
             raise StopIteration
 
-    def __del__(self):
-        """Object destructor."""
+    def __close(self):
         if not self.__descriptor.closed:
             self.__descriptor.close()
+        if self.__raw_file is not None and not self.__raw_file.closed:
+            self.__raw_file.close()
+
+    def __del__(self):
+        """Object destructor."""
+        self.__close()
 
     def __enter__(self):
         """Initialization for 'with' statement.
@@ -344,7 +648,7 @@ class JSONDataFileReader(object):
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Closing function for the 'with' statement."""
-        self.__descriptor.close()
+        self.__close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,378 @@
+import json
+from io import IOBase
+from types import GeneratorType
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+__all__ = ['ParquetDataFileWriter', 'ParquetDataFileReader']
+
+# Records of each row group
+ROW_GROUP_SIZE = 2**16
+# Row groups kept in memory while a column has only null values
+MAX_PENDING_GROUPS = 8
+# String columns stored with a dictionary also in memory
+DICTIONARY_COLUMNS = ['FileName', 'SiteName', 'DataType', 'Protocol']
+
+
+def _check_pyarrow():
+    if pa is None:
+        raise Exception("You need pyarrow to read or write parquet files...")
+    if int(pa.__version__.split(".")[0]) < 7:
+        raise Exception("You need pyarrow 7 or newer to read or write parquet files...")
+
+
+class ParquetDataFileWriter(object):
+
+    """Write a parquet file, a row group at a time.
+
+    The records are buffered until a row group of row_group_size
+    records is full, then the row group is converted to typed columns
+    and written. If the schema is specified the records are cast to it
+    and the fields not in the schema are dropped. Otherwise the schema
+    is the one of the first row group and the following row groups
+    have to match it: their missing fields are null and their integer
+    columns can fill a float column, while a new field or a different
+    type raise an exception and the row group is dropped (the file
+    keeps the other row groups). A column with only null values takes
+    the type of the first row group with a value: the row groups are
+    kept in memory until then, up to max_pending_groups, and after
+    that limit, or at the end of the file, the column is a string
+    column. The string columns are dictionary encoded in the file.
+    """
+
+    def __init__(self, filename: str = None, descriptor: 'IOBase' = None, data=None,
+                 schema: 'pa.Schema' = None, row_group_size: int = ROW_GROUP_SIZE,
+                 compression: str = 'snappy', max_pending_groups: int = MAX_PENDING_GROUPS):
+        """Init function of data writer for parquet files.
+
+        Args:
+            filename (str): name of the parquet file to write.
+            data (dict, list(dict), list(str)): initial data to be inserted
+            schema (pyarrow.Schema): the types of the columns
+            row_group_size (int): records of each row group
+            compression (str): the parquet compression codec
+            max_pending_groups (int): row groups kept in memory while
+                a column has only null values
+
+        Returns:
+            ParquetDataFileWriter: the instance of this object
+
+        """
+        self.__closed = True
+        _check_pyarrow()
+        assert any([filename is not None, descriptor is not None]
+                   ), "You have to specify a filename or a descriptor..."
+        self.__where = filename if descriptor is None else descriptor
+        self.__schema = schema
+        self.__fixed_schema = schema is not None
+        self.__row_group_size = row_group_size
+        self.__compression = compression
+        self.__max_pending_groups = max_pending_groups
+        self.__writer = None
+        self.__records = []
+        # Row groups waiting for the type of a column without values
+        self.__pending = []
+        self.__len = 0
+        self.__closed = False
+
+        if data is not None:
+            self.append(data)
+
+    def __len__(self):
+        """Number of records of the row groups accepted in the file.
+
+        The buffered records are counted after they are flushed.
+        """
+        return self.__len
+
+    @property
+    def __resolved(self) -> bool:
+        """True if all the columns of the schema have a type."""
+        return not any(pa.types.is_null(field.type) for field in self.__schema)
+
+    def __resolve(self, table: 'pa.Table'):
+        """Take the types of the columns without values from a row group."""
+        self.__schema = pa.schema([
+            table.schema.field(field.name)
+            if pa.types.is_null(field.type) and field.name in table.column_names
+            else field
+            for field in self.__schema
+        ])
+
+    def __conform(self, table: 'pa.Table') -> 'pa.Table':
+        """Convert a row group to the schema of the previous ones."""
+        new_fields = [name for name in table.column_names
+                      if name not in self.__schema.names]
+        if new_fields:
+            raise Exception(
+                f"Fields {new_fields} are not in the schema of the first row group, "
+                "pass the schema to the writer..."
+            )
+        columns = []
+        for field in self.__schema:
+            if field.name not in table.column_names:
+                columns.append(pa.nulls(table.num_rows, field.type))
+                continue
+            column = table.column(field.name)
+            if column.type != field.type and not pa.types.is_null(column.type) and not (
+                    pa.types.is_null(field.type) or
+                    pa.types.is_integer(column.type) and pa.types.is_floating(field.type)):
+                raise Exception(
+                    f"Field '{field.name}' is {column.type} but it is {field.type} in "
+                    "the previous row groups, pass the schema to the writer..."
+                )
+            if not pa.types.is_null(field.type):
+                column = column.cast(field.type)
+            columns.append(column)
+        return pa.Table.from_arrays(
+            columns, schema=pa.schema([
+                field.with_type(column.type)
+                for field, column in zip(self.__schema, columns)
+            ])
+        )
+
+    def __write_pending(self, force: bool = False):
+        """Write the pending row groups once all the columns have a type.
+
+        Args:
+            force (bool): write them anyway, the columns without values
+                are string columns
+        """
+        if not self.__pending or not (force or self.__resolved):
+            return
+        if not self.__resolved:
+            self.__schema = pa.schema([
+                field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                for field in self.__schema
+            ])
+        if self.__writer is None:
+            self.__writer = pq.ParquetWriter(
+                self.__where, self.__schema, compression=self.__compression,
+                use_dictionary=True
+            )
+        for table in self.__pending:
+            self.__writer.write_table(table.cast(self.__schema),
+                                      row_group_size=self.__row_group_size)
+        self.__pending = []
+
+    def flush(self):
+        """Write the buffered records as a row group.
+
+        The row group is kept in memory if a column has no values yet.
+
+        Returns:
+            ParquetDataFileWriter: this object instance
+
+        """
+        if not self.__records:
+            return self
+        records = self.__records
+        # A row group that does not match the schema is dropped
+        self.__records = []
+        if self.__fixed_schema:
+            table = pa.Table.from_pylist(records, schema=self.__schema)
+        else:
+            table = pa.Table.from_pylist(records)
+            if self.__schema is None:
+                self.__schema = table.schema
+            table = self.__conform(table)
+            self.__resolve(table)
+        self.__pending.append(table)
+        self.__len += table.num_rows
+        self.__write_pending(
+            force=len(self.__pending) >= self.__max_pending_groups)
+        return self
+
+    def __write(self, record: dict):
+        self.__records.append(record)
+        if len(self.__records) == self.__row_group_size:
+            self.flush()
+
+    def append(self, data):
+        """Append data to the parquet file.
+
+        Args:
+            data (str, dict, list(str), list(dict)): data to be inserted
+
+        Returns:
+            ParquetDataFileWriter: this object instance
+
+        """
+        if isinstance(data, str):
+            self.__write(json.loads(data))
+        elif isinstance(data, dict):
+            self.__write(data)
+        elif isinstance(data, (list, GeneratorType)):
+            for elm in data:
+                if isinstance(elm, dict):
+                    self.__write(elm)
+                elif isinstance(elm, str):
+                    self.__write(json.loads(elm))
+                else:
+                    raise Exception(
+                        "You can pass only a list of 'dict' or JSON strings"
+                    )
+        else:
+            raise Exception(
+                "'{}' is not a valid input data type".format(type(data)))
+
+        return self
+
+    def close(self):
+        """Write the last row group and the file footer."""
+        if self.__closed:
+            return
+        self.flush()
+        self.__write_pending(force=True)
+        if self.__writer is None and self.__schema is not None:
+            # A file without records
+            self.__writer = pq.ParquetWriter(self.__where, self.__schema)
+        if self.__writer is not None:
+            self.__writer.close()
+            self.__writer = None
+        self.__closed = True
+
+    def __del__(self):
+        """Object destructor."""
+        self.close()
+
+    def __enter__(self):
+        """Initialization for 'with' statement.
+
+        Returns:
+            ParquetDataFileWriter: this object instance
+
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Closing function for the 'with' statement."""
+        self.close()
+
+
+class ParquetDataFileReader(object):
+
+    """Read a parquet file.
+
+    The file is memory mapped and read a row group at a time. The
+    read_table method returns the columns as Arrow arrays, without
+    copies and reading only the requested columns.
+    """
+
+    def __init__(self, file_, columns: list = None):
+        """Init function of data reader for parquet files.
+
+        Args:
+            file_ (str, BytesIO, IOBase): the parquet file to read.
+            columns (list): read only these columns
+
+        Returns:
+            ParquetDataFileReader: the instance of this object
+
+        """
+        _check_pyarrow()
+        self.__columns = columns
+        memory_map = isinstance(file_, str)
+        names = pq.read_schema(file_, memory_map=memory_map).names
+        self.__parquet_file = pq.ParquetFile(
+            file_, memory_map=memory_map,
+            read_dictionary=[name for name in DICTIONARY_COLUMNS if name in names]
+        )
+        self.__iter = None
+
+    def __len__(self):
+        return self.__parquet_file.metadata.num_rows
+
+    @property
+    def schema(self) -> 'pa.Schema':
+        return self.__parquet_file.schema_arrow
+
+    def read_table(self, columns: list = None) -> 'pa.Table':
+        """Read the file as an Arrow table.
+
+        Args:
+            columns (list): read only these columns, all if not specified
+
+        Returns:
+            pyarrow.Table: the columns of the file
+        """
+        return self.__parquet_file.read(columns=columns or self.__columns)
+
+    def iter_batches(self, batch_size: int = ROW_GROUP_SIZE):
+        """Iterate over the records in batches.
+
+        Yields:
+            list: a batch of records as dictionaries
+        """
+        for batch in self.__parquet_file.iter_batches(
+                batch_size=batch_size, columns=self.__columns):
+            yield batch.to_pylist()
+
+    def iter_parallel(self, num_workers: int = None, ordered: bool = True):
+        """Iterate over the records decoded in parallel.
+
+        The columns are already decoded by the Arrow thread pool, so
+        the options are only for the DataFile interface.
+
+        Yields:
+            dict: the records
+        """
+        for batch in self.iter_batches():
+            yield from batch
+
+    def __getitem__(self, idx):
+        assert isinstance(idx, int), "Index could be only an integer"
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError
+        metadata = self.__parquet_file.metadata
+        for row_group in range(metadata.num_row_groups):
+            num_rows = metadata.row_group(row_group).num_rows
+            if idx < num_rows:
+                return self.__parquet_file.read_row_group(
+                    row_group, columns=self.__columns
+                ).slice(idx, 1).to_pylist()[0]
+            idx -= num_rows
+
+    def __iter__(self):
+        """Initialize the parquet reader iterator.
+
+        Returns:
+            ParquetDataFileReader: this object instance
+
+        """
+        self.__iter = (
+            record for batch in self.iter_batches() for record in batch
+        )
+        return self
+
+    def __next__(self):
+        """Get the next record (inside iteration).
+
+        Returns:
+            dict: The record as a dictionary
+
+        Raises:
+            StopIteration: to end the iterator
+
+        """
+        return next(self.__iter)
+
+    def __enter__(self):
+        """Initialization for 'with' statement.
+
+        Returns:
+            ParquetDataFileReader: this object instance
+
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Closing function for the 'with' statement."""
+        self.__parquet_file = None
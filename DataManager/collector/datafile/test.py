@@ -2,48 +2,300 @@ import unittest
 import os
 import json
 
+from .parquet import pa
+
 
 class TestConverters(unittest.TestCase):
 
+    def __check_saved_len(self, filename: str, num_records: int):
+        """Check that the length of a file is read from its saved index."""
+        from unittest import mock
+        from .index import LineIndex
+        from .json import JSONDataFileReader
+
+        with JSONDataFileReader(filename) as data:
+            self.assertEqual(len(data), num_records)
+        self.assertTrue(os.path.exists(filename + ".idx"))
+        with mock.patch.object(LineIndex, "build", side_effect=AssertionError):
+            with JSONDataFileReader(filename) as data:
+                self.assertEqual(len(data), num_records)
+                self.assertEqual(data[-1], data[num_records - 1])
+        os.remove(filename)
+        os.remove(filename + ".idx")
+
     def test_jsonDataFile_gz(self):
         from .json import JSONDataFileWriter, JSONDataFileReader
 
         FILENAME = "test.json.gz"
-        with JSONDataFileWriter(FILENAME, ['{"a": 2}']) as data:
+        with JSONDataFileWriter(FILENAME, data=['{"a": 2}']) as data:
             data.append(json.dumps({}))
             data.append([json.dumps({})])
             data.append([{}, {"a": 2}, {}])
 
         with JSONDataFileReader(FILENAME) as data:
             self.assertEqual(data[0], data[4])
+        # The random accesses do not index a single access point file
+        self.assertFalse(os.path.exists(FILENAME + ".idx"))
 
-        os.remove(FILENAME)
+        self.__check_saved_len(FILENAME, 6)
 
     def test_jsonDataFile_bz2(self):
         from .json import JSONDataFileWriter, JSONDataFileReader
 
         FILENAME = "test.json.bz2"
-        with JSONDataFileWriter(FILENAME, ['{"a": 2}']) as data:
+        with JSONDataFileWriter(FILENAME, data=['{"a": 2}']) as data:
             data.append(json.dumps({}))
             data.append([json.dumps({})])
             data.append([{}, {"a": 2}, {}])
 
         with JSONDataFileReader(FILENAME) as data:
             self.assertEqual(data[0], data[4])
+        # The random accesses do not index a single access point file
+        self.assertFalse(os.path.exists(FILENAME + ".idx"))
 
-        os.remove(FILENAME)
+        self.__check_saved_len(FILENAME, 6)
 
     def test_jsonDataFile_binary(self):
         from .json import JSONDataFileWriter, JSONDataFileReader
 
         FILENAME = "test.json"
-        with JSONDataFileWriter(FILENAME, ['{"a": 2}']) as data:
+        with JSONDataFileWriter(FILENAME, data=['{"a": 2}']) as data:
             data.append(json.dumps({}))
             data.append([json.dumps({})])
             data.append([{}, {"a": 2}, {}])
 
         with JSONDataFileReader(FILENAME) as data:
             self.assertEqual(data[0], data[4])
+        # The random accesses do not index a single access point file
+        self.assertFalse(os.path.exists(FILENAME + ".idx"))
+
+        self.__check_saved_len(FILENAME, 6)
+
+    def test_jsonDataFile_blocks(self):
+        from .json import JSONDataFileWriter, JSONDataFileReader
+
+        FILENAME = "test_blocks.json.gz"
+        objects = [{"idx": idx, "name": "file_{}".format(idx) * (idx % 5)}
+                   for idx in range(100)]
+        with JSONDataFileWriter(FILENAME, data=objects):
+            pass
+
+        # Blocks smaller than the objects
+        with JSONDataFileReader(FILENAME, block_size=7) as data:
+            self.assertEqual(list(data), objects)
+            self.assertEqual(len(data), 100)
+            self.assertEqual(data[42], objects[42])
+            self.assertEqual(data[10:5], list(reversed(objects[6:11])))
+            self.assertEqual(list(data.start_from(90)), objects[90:])
+            self.assertEqual(data[-1], objects[-1])
+            iter(data)
+            batches = list(data.iter_batches(batch_size=32))
+            self.assertEqual([len(batch) for batch in batches], [32, 32, 32, 4])
+            self.assertEqual(sum(batches, []), objects)
+
+        self.assertTrue(os.path.exists(FILENAME + ".idx"))
+        with JSONDataFileReader(FILENAME) as data:
+            self.assertEqual(data[42], objects[42])
+            self.assertFalse(data.index.seekable)
+        os.remove(FILENAME)
+        os.remove(FILENAME + ".idx")
+
+    def test_jsonDataFile_index(self):
+        import gzip
+        from .index import LineIndex
+        from .json import JSONDataFileWriter, JSONDataFileReader
+
+        FILENAME = "test_index.json.gz"
+        objects = [{"idx": idx, "name": "file_{}".format(idx) * (idx % 5)}
+                   for idx in range(100)]
+        with JSONDataFileWriter(FILENAME, data=objects, member_size=256):
+            pass
+        # Still a standard gzip file
+        with gzip.open(FILENAME) as data:
+            self.assertEqual(len(data.read().splitlines()), 100)
+
+        with JSONDataFileReader(FILENAME, block_size=64) as data:
+            self.assertEqual(len(data), 100)
+            self.assertTrue(data.index.seekable)
+            for idx in [99, 3, 57, 56, 0, -1, -100]:
+                self.assertEqual(data[idx], objects[idx])
+            self.assertEqual(data[95:200], objects[95:])
+            self.assertEqual(list(data.start_from(42, 45)), objects[42:44])
+            self.assertEqual(list(data), objects)
+            with self.assertRaises(IndexError):
+                data[100]
+
+        self.assertIsNotNone(LineIndex.load(FILENAME))
+        with JSONDataFileWriter(FILENAME, data=[{"idx": 100}], append=True):
+            pass
+        self.assertIsNone(LineIndex.load(FILENAME))
+        with JSONDataFileReader(FILENAME) as data:
+            self.assertEqual(len(data), 101)
+            self.assertEqual(data[-1], {"idx": 100})
+
+        os.remove(FILENAME)
+        os.remove(FILENAME + ".idx")
+
+    def test_avroDataFile_blocks(self):
+        from .avro import AvroDataFileWriter, AvroDataFileReader
+
+        FILENAME = "test_blocks.avro"
+        objects = [{"idx": idx, "name": "file_{}".format(idx)}
+                   for idx in range(5000)]
+        with AvroDataFileWriter(FILENAME, objects, codec="deflate"):
+            pass
+
+        with AvroDataFileReader(FILENAME) as data:
+            self.assertEqual(len(data), 5000)
+            self.assertGreater(data.num_blocks, 1)
+            for idx in [0, 4999, 1234, -1]:
+                self.assertEqual(data[idx], objects[idx])
+            self.assertEqual(data[10:5], list(reversed(objects[6:11])))
+            self.assertEqual(data[4990:5000], objects[4990:])
+            with self.assertRaises(IndexError):
+                data[5000]
+
+            ranges = data.block_ranges(3)
+            self.assertEqual(ranges[0][0], 0)
+            self.assertEqual(ranges[-1][1], data.num_blocks)
+            self.assertEqual(
+                sum((list(data.read_blocks(*cur_range)) for cur_range in ranges), []),
+                objects
+            )
+            self.assertEqual(list(data.iter_parallel(2)), objects)
+            self.assertEqual(
+                sorted(data.iter_parallel(2, ordered=False), key=lambda obj: obj["idx"]),
+                objects
+            )
+            self.assertEqual(list(data), objects)
+
+        os.remove(FILENAME)
+
+    def test_parallel_decoding(self):
+        from io import BytesIO
+        from ..api import DataFile
+        from .avro import AvroDataFileWriter, AvroDataFileReader
+        from .json import JSONDataFileWriter, JSONDataFileReader
+
+        objects = [{"idx": idx, "name": "file_{}".format(idx)}
+                   for idx in range(3000)]
+
+        for FILENAME, member_size in [("test_members.json.gz", 4096),
+                                      ("test_single.json.gz", 2**30),
+                                      ("test_parallel.json.bz2", 0),
+                                      ("test_parallel.json", 0)]:
+            with JSONDataFileWriter(FILENAME, data=objects, member_size=member_size):
+                pass
+            with JSONDataFileReader(FILENAME) as data:
+                ranges = data.record_ranges(5)
+                self.assertEqual(ranges[0][0], 0)
+                self.assertEqual(ranges[-1][1], 3000)
+                self.assertEqual(list(data.read_records(*ranges[1])),
+                                 objects[ranges[1][0]:ranges[1][1]])
+                self.assertEqual(list(data.iter_parallel(2, parts_per_worker=3)), objects)
+            if FILENAME != "test_parallel.json":
+                self.assertEqual(
+                    sorted(DataFile(FILENAME, num_workers=2, ordered=False),
+                           key=lambda obj: obj["idx"]),
+                    objects
+                )
+            self.assertTrue(os.path.exists(FILENAME + ".idx"))
+            os.remove(FILENAME)
+            os.remove(FILENAME + ".idx")
+
+        with BytesIO() as descriptor:
+            for obj in objects:
+                descriptor.write(json.dumps(obj).encode("utf-8") + b'\n')
+            descriptor.seek(0)
+            self.assertEqual(list(DataFile(descriptor, num_workers=2)), objects)
+
+        descriptor = BytesIO(AvroDataFileWriter(
+            BytesIO(), objects, codec="deflate").raw_data)
+        self.assertEqual(
+            list(AvroDataFileReader(descriptor).iter_parallel(2)), objects)
+
+    @unittest.skipIf(pa is None, "pyarrow is not installed")
+    def test_parquetDataFile(self):
+        from ..api import DataFile
+        from .parquet import ParquetDataFileReader, ParquetDataFileWriter
+
+        FILENAME = "test.parquet"
+        objects = [{"idx": idx, "FileName": "file_{}".format(idx % 7),
+                    "SiteName": None if idx < 5 else "T2_IT_Site{}".format(idx % 3)}
+                   for idx in range(1000)]
+
+        with ParquetDataFileWriter(FILENAME, row_group_size=300) as data:
+            data.append(objects[:400])
+            data.append(json.dumps(objects[400]))
+            data.append(obj for obj in objects[401:])
+            self.assertEqual(len(data), 900)
+            data.flush()
+            self.assertEqual(len(data), 1000)
+
+        with ParquetDataFileReader(FILENAME) as data:
+            self.assertEqual(len(data), 1000)
+            self.assertEqual(data[0], objects[0])
+            self.assertEqual(data[650], objects[650])
+            self.assertEqual(data[-1], objects[-1])
+            self.assertEqual(list(data), objects)
+            table = data.read_table(["FileName"])
+            self.assertEqual(table.column_names, ["FileName"])
+            self.assertTrue(pa.types.is_dictionary(table.schema.field("FileName").type))
+        self.assertEqual(list(DataFile(FILENAME, num_workers=2)), objects)
+
+        os.remove(FILENAME)
+
+    @unittest.skipIf(pa is None, "pyarrow is not installed")
+    def test_parquetDataFile_schema(self):
+        from .parquet import ParquetDataFileReader, ParquetDataFileWriter
+
+        FILENAME = "test_schema.parquet"
+        # The first values of Size and Protocol are in the second row group
+        objects = [{"idx": idx, "Size": None if idx < 10 else idx * 1.5,
+                    "Protocol": None if idx < 10 else "Remote",
+                    "CPUTime": float(idx) if idx < 10 else idx}
+                   for idx in range(20)]
+
+        with ParquetDataFileWriter(FILENAME, row_group_size=10) as data:
+            data.append(objects[:10])
+            self.assertEqual(len(data), 10)
+            data.append(objects[10:])
+            self.assertEqual(len(data), 20)
+            # The new fields are not dropped silently
+            with self.assertRaises(Exception):
+                data.append([{"idx": idx, "NewField": 1} for idx in range(10)])
+            with self.assertRaises(Exception):
+                data.append([{"idx": idx, "Protocol": idx} for idx in range(10)])
+            # The dropped row groups are not counted
+            self.assertEqual(len(data), 20)
+            data.append([{"idx": idx, "Protocol": "Local", "CPUTime": idx}
+                         for idx in range(5)])
+            self.assertEqual(len(data), 20)
+            data.flush()
+            self.assertEqual(len(data), 25)
+        with ParquetDataFileReader(FILENAME) as data:
+            self.assertEqual(len(data), 25)
+            self.assertEqual(data.schema.field("Size").type, pa.float64())
+            self.assertEqual(list(data)[:20], objects)
+            self.assertEqual(data[-1], {"idx": 4, "Size": None,
+                                        "Protocol": "Local", "CPUTime": 4.})
+
+        # A column without values after max_pending_groups row groups
+        with ParquetDataFileWriter(FILENAME, data=objects[:10], row_group_size=5,
+                                   max_pending_groups=2) as data:
+            with self.assertRaises(Exception):
+                data.append(objects[10:15])
+        with ParquetDataFileReader(FILENAME) as data:
+            self.assertEqual(data.schema.field("Size").type, pa.string())
+            self.assertEqual(len(data), 10)
+
+        schema = pa.schema([("idx", pa.int64()), ("Size", pa.float64()),
+                            ("Protocol", pa.string()), ("CPUTime", pa.float64())])
+        with ParquetDataFileWriter(FILENAME, data=objects, schema=schema,
+                                   row_group_size=10):
+            pass
+        with ParquetDataFileReader(FILENAME) as data:
+            self.assertEqual(list(data), objects)
 
         os.remove(FILENAME)
 
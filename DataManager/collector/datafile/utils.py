@@ -2,10 +2,13 @@
 import bz2
 import gzip
 import json
+from collections import deque
+from multiprocessing import Pool, cpu_count
 from os import path
+from queue import Queue
 
-__all__ = ['gen_increasing_slice',
-           'get_or_create_descriptor', 'AvroObjectTranslator']
+__all__ = ['gen_increasing_slice', 'get_or_create_descriptor',
+           'parallel_map', 'AvroObjectTranslator']
 
 
 def gen_increasing_slice(slice):
@@ -64,6 +67,58 @@ def get_or_create_descriptor(filename, open_mode='rb'):
     return stream
 
 
+def parallel_map(function, tasks, num_workers: int = None,
+                 ordered: bool = True, window: int = None):
+    """Run a function on the tasks with a pool of processes.
+
+    At most window tasks (2 per worker by default) are running or
+    waiting to be consumed, so the results of a slow consumer do not
+    pile up in memory.
+
+    Args:
+        function (callable): picklable function with a single argument
+        tasks (iterable): the arguments of the function, consumed while
+            the results are yielded
+        num_workers (int): number of processes, the number of CPUs if
+            not specified
+        ordered (bool): yield the results in the task order or as
+            soon as they are ready
+
+    Returns:
+        generator: the results of the function
+    """
+    num_workers = num_workers or cpu_count()
+    window = window or 2 * num_workers
+    with Pool(num_workers) as pool:
+        if ordered:
+            pending = deque()
+            for task in tasks:
+                if len(pending) == window:
+                    yield pending.popleft().get()
+                pending.append(pool.apply_async(function, (task,)))
+            while pending:
+                yield pending.popleft().get()
+        else:
+            results = Queue()
+            in_flight = 0
+
+            def get_result():
+                result = results.get()
+                if isinstance(result, Exception):
+                    raise result
+                return result
+
+            for task in tasks:
+                if in_flight == window:
+                    in_flight -= 1
+                    yield get_result()
+                pool.apply_async(function, (task,), callback=results.put,
+                                 error_callback=results.put)
+                in_flight += 1
+            for _ in range(in_flight):
+                yield get_result()
+
+
 class AvroObjectTranslator(object):
 
     def deduce_scheme(self, obj, lvl: int = 0):
@@ -13,6 +13,7 @@ from ...agent.api import HTTPFS
 from ..api import DataFile
 from ..datafeatures.extractor import CMSDataPopularity, CMSDataPopularityRaw
 from ..datafile.json import JSONDataFileWriter
+from ..datafile.parquet import ParquetDataFileWriter
 from .stage import Stage
 from .utils import (ReadableDictAsAttribute, SupportTable, flush_queue,
                     gen_window_dates)
@@ -56,14 +57,21 @@ class Pipeline(object):
     def stats(self):
         return self.__stats
 
-    def save(self, out_dir: str = 'PipelineResults'):
-        out_name = "{}.json.gz".format(self._dataset_name)
+    def save(self, out_dir: str = 'PipelineResults', out_format: str = 'json'):
+        if out_format == 'json':
+            out_name = "{}.json.gz".format(self._dataset_name)
+            writer = JSONDataFileWriter
+        elif out_format == 'parquet':
+            out_name = "{}.parquet".format(self._dataset_name)
+            writer = ParquetDataFileWriter
+        else:
+            raise Exception("Output format '{}' is not supported...".format(out_format))
         makedirs(out_dir, exist_ok=True)
         out_file_path = path.join(out_dir, out_name)
         # Write output
         start_time = time()
         print("[Pipeline][{}][Write output]".format(self._dataset_name))
-        with JSONDataFileWriter(out_file_path) as out_file:
+        with writer(out_file_path) as out_file:
             for record in tqdm(self.result, desc="[Save dataset]"):
                 out_file.append(record)
         self.__stats['time']['out_file'] = time() - start_time
@@ -92,7 +100,8 @@ class Pipeline(object):
                 ))
                 yield batch
 
-    def run(self, save_stage: bool = False, use_spark: bool = False):
+    def run(self, save_stage: bool = False, use_spark: bool = False,
+            out_format: str = 'json'):
         output = None
 
         print("[Pipeline][{}][START]".format(self._dataset_name))
@@ -120,7 +129,8 @@ class Pipeline(object):
             if save_stage:
                 self._source.set(
                     stage.output,
-                    stage_name=stage.name
+                    stage_name=stage.name,
+                    out_format=out_format
                 )
 
             self.__stats['time']['stages'][stage.name] = time() - start_time
@@ -9,8 +9,25 @@ from yaspin import yaspin
 from ...agent.api import HTTPFS
 from ..api import DataFile
 from ..datafile.json import JSONDataFileReader, JSONDataFileWriter
+from ..datafile.parquet import ParquetDataFileWriter
 from .utils import BaseSpark, gen_window_dates
 
+# Extension and writer of each output format
+OUT_FORMATS = {
+    'json': ("json.gz", JSONDataFileWriter),
+    'parquet': ("parquet", ParquetDataFileWriter),
+}
+
+
+def _write_records(data, out_format: str, filename: str):
+    """Write the records with the writer of the output format."""
+    if out_format not in OUT_FORMATS:
+        raise Exception("Output format '{}' is not supported...".format(out_format))
+    _, writer = OUT_FORMATS[out_format]
+    with writer(filename) as out_data:
+        for record in tqdm(data, desc="[Write records]"):
+            out_data.append(record)
+
 
 class Resource(BaseSpark):
 
@@ -51,19 +68,11 @@ class CMSDatasetResourceManager(Resource):
     def get(self):
         return self.gen_batches(DataFile(self.__dataset_path))
 
-    def set(self, data: 'DataFile', out_name: str, out_dir: str = 'cache'):
-        with NamedTemporaryFile() as tmp_file:
-            with JSONDataFileWriter(descriptor=tmp_file) as tmp_data:
-                for record in tqdm(data, desc="[Prepare tempfile]"):
-                    tmp_data.append(record)
-
-                with yaspin(text="[Save Dataset]") as spinner:
-                    cur_base_path = out_dir
-                    makedirs(cur_base_path, exist_ok=True)
-                    with open(path.join(cur_base_path, out_name), 'w') as out_data:
-                        out_data.write(tmp_data.raw_data)
-
-                    spinner.write("[Dataset saved]")
+    def set(self, data: 'DataFile', out_name: str, out_dir: str = 'cache',
+            out_format: str = 'json'):
+        makedirs(out_dir, exist_ok=True)
+        _write_records(data, out_format, filename=path.join(out_dir, out_name))
+        print("[Dataset saved]")
 
 
 class CMSResourceManager(Resource):
@@ -146,40 +155,43 @@ class CMSResourceManager(Resource):
                 raise Exception("No methods to retrieve data...")
             yield collector
 
-    def set(self, data: 'DataFile', stage_name: str = '', out_dir: str = 'cache'):
-        out_name = "dataset_y{}-m{}-d{}_ws{}_stage-{}.json.gz".format(
+    def set(self, data: 'DataFile', stage_name: str = '', out_dir: str = 'cache',
+            out_format: str = 'json'):
+        if out_format not in OUT_FORMATS:
+            raise Exception("Output format '{}' is not supported...".format(out_format))
+        out_name = "dataset_y{}-m{}-d{}_ws{}_stage-{}.{}".format(
             self._year,
             self._month,
             self._day,
             self._window_size,
-            stage_name
+            stage_name,
+            OUT_FORMATS[out_format][0]
         )
 
-        with NamedTemporaryFile() as tmp_file:
-            with JSONDataFileWriter(descriptor=tmp_file) as tmp_data:
-                for record in tqdm(data, desc="[Prepare tempfile]"):
-                    tmp_data.append(record)
-
-                with yaspin(text="[Save Dataset]") as spinner:
-                    if self.type == 'local':
-                        cur_base_path = path.join(
-                            self._local_folder,
-                            out_dir
-                        )
-                        makedirs(cur_base_path, exist_ok=True)
-                        with open(path.join(cur_base_path, out_name), 'w') as out_data:
-                            out_data.write(tmp_data.raw_data)
-
-                    elif self.type == 'httpfs':
-                        self._httpfs.create(
-                            "/{}".format(path.join(out_dir, out_name)),
-                            tmp_file.name,
-                            overwrite=True
-                        )
-                    else:
-                        raise Exception(
-                            "Save to '{}' not implemented...".format(
-                                self.type)
-                        )
+        if self.type == 'local':
+            cur_base_path = path.join(
+                self._local_folder,
+                out_dir
+            )
+            makedirs(cur_base_path, exist_ok=True)
+            _write_records(
+                data, out_format, filename=path.join(cur_base_path, out_name)
+            )
+        elif self.type == 'httpfs':
+            # The upload needs a local file, written by name so that the
+            # writer compresses it and closes only its own descriptor
+            with NamedTemporaryFile(suffix=".{}".format(OUT_FORMATS[out_format][0])) as tmp_file:
+                _write_records(data, out_format, filename=tmp_file.name)
+                with yaspin(text="[Upload Dataset]"):
+                    self._httpfs.create(
+                        "/{}".format(path.join(out_dir, out_name)),
+                        tmp_file.name,
+                        overwrite=True
+                    )
+        else:
+            raise Exception(
+                "Save to '{}' not implemented...".format(
+                    self.type)
+            )
 
-                    spinner.write("[Dataset saved]")
+        print("[Dataset saved]")
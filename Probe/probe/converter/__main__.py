@@ -9,6 +9,7 @@ from .. import loaders
 from ..utils import STATUS_ARROW, STATUS_WARNING, str2bool
 from .extractor import (check_filename_info, check_region_info,
                         get_object_columns, get_unique_values)
+from .name_table import NameTable
 from .utils import (CategoryContainer, convert_categories, save_numeric_df,
                     shuffle_df, sort_from_avro)
 
@@ -36,6 +37,9 @@ def main():
     parser.add_argument('--order-folder', type=str,
                         default="",
                         help='Folder with file order from AVRO source [DEFAULT: ""]')
+    parser.add_argument('--filename-table', type=str,
+                        default="",
+                        help='Shared NameTable log for the Filename ids [DEFAULT: ""]')
 
     args, _ = parser.parse_known_args()
 
@@ -52,6 +56,10 @@ def main():
         else:
             container = CategoryContainer()
 
+        filename_table = None
+        if args.filename_table:
+            filename_table = NameTable(args.filename_table)
+
         for filepath, df in tqdm(
             files,
             desc=f"{STATUS_ARROW}Convert files",
@@ -102,6 +110,10 @@ def main():
                             f"{STATUS_ARROW}Jump file due to no avro order: {STATUS_WARNING(filepath)}")
                         continue
 
+                if filename_table is not None:
+                    print(f"{STATUS_ARROW}Convert filenames with the shared table...")
+                    df['Filename'] = filename_table.intern(df.Filename)
+
                 columns = get_object_columns(df)
                 categories = dict(
                     (name, get_unique_values(df[name])) for name in columns
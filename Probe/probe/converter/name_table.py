@@ -0,0 +1,101 @@
+import mmap
+from os import path
+
+import numpy as np
+import pandas as pd
+
+__all__ = ['NameTable']
+
+
+class NameTable(object):
+
+    """Append-only log of names with consecutive int32 ids.
+
+    The id of a name is its line number in the log. This is the same
+    format of SmartCache.utils.name_table.NameTable, so the converted
+    Filename ids are shared with pySim and the other tools, without
+    a dependency on the SmartCache package.
+
+    Note:
+        Only one process at a time should add names to a log.
+    """
+
+    def __init__(self, filename: str):
+        """Init function of the name table.
+
+        Args:
+            filename (str): the log file, created if it does not exist
+
+        Returns:
+            NameTable: the instance of this object
+
+        """
+        self._ids = {}
+        self._pending = []
+        self._filename = filename
+        self.__load()
+        self.__log = open(filename, "ab")
+
+    def __load(self):
+        if not path.isfile(self._filename) or path.getsize(self._filename) == 0:
+            return
+        with open(self._filename, "r+b") as log_file:
+            with mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                end = content.rfind(b"\n") + 1
+                names = content[:end].decode("utf-8").split("\n")[:-1]
+            # Drop a partial record left by an interrupted write
+            if end != path.getsize(self._filename):
+                log_file.truncate(end)
+        self._ids = dict(zip(names, range(len(names))))
+
+    def __len__(self):
+        return len(self._ids)
+
+    def get_or_add(self, name) -> int:
+        """Get the id of a name, adding it if it is new."""
+        name = str(name)
+        idx = self._ids.get(name)
+        if idx is None:
+            if name.find("\n") != -1:
+                raise Exception("Names with a new line are not supported...")
+            idx = len(self._ids)
+            self._pending.append(name)
+            self._ids[name] = idx
+        return idx
+
+    def intern(self, values) -> np.ndarray:
+        """Get the ids of an array of names, adding the new ones.
+
+        Args:
+            values (numpy.ndarray, pandas.Series): the names to intern
+
+        Returns:
+            numpy.ndarray: the int32 ids of the names
+        """
+        codes, uniques = pd.factorize(np.asarray(values))
+        if (codes < 0).any():
+            raise Exception("Missing names (None or NaN) cannot be interned...")
+        uniques = uniques.tolist()
+        table = np.fromiter(
+            (self.get_or_add(value) for value in uniques),
+            dtype=np.int32, count=len(uniques)
+        )
+        self.flush()
+        return table[codes]
+
+    def flush(self):
+        """Append the new names to the log."""
+        if self._pending:
+            self.__log.write(("\n".join(self._pending) + "\n").encode("utf-8"))
+            self.__log.flush()
+            self._pending = []
+
+    def close(self):
+        if not self.__log.closed:
+            self.flush()
+            self.__log.close()
+
+    def __del__(self):
+        """Object destructor."""
+        if hasattr(self, "_NameTable__log"):
+            self.close()
@@ -0,0 +1,83 @@
+from random import randrange, seed
+from sys import argv
+from time import perf_counter
+
+import numpy as np
+
+from .evaluator import FIFOCache, LRUCache
+
+MAX_SIZES = [10**2, 10**3, 10**4, 10**5]
+NUM_REQUESTS = 10**5
+# The list based caches are too slow above this size
+MAX_LIST_SIZE = 10**4
+
+
+class _ListLRUCache(object):
+
+    """The list based LRUCache, before the OrderedDict one."""
+
+    def __init__(self, max_size: int = 1000):
+        self._cache = []
+        self._max_size = max_size
+        self._counters = np.zeros(max_size)
+
+    def update(self, file_, insert: bool = True):
+        self._counters += 1
+        hit = file_ in self._cache
+        if hit:
+            self._counters[self._cache.index(file_)] = 0
+        elif len(self._cache) == self._max_size:
+            if insert:
+                idx = np.argmin(self._counters)
+                self._cache[idx] = file_
+                self._counters[idx] = 0
+        elif insert:
+            self._cache.append(file_)
+            self._counters[len(self._cache) - 1] = 0
+        return hit
+
+
+def _requests(max_size: int, num_requests: int) -> list:
+    """Requests with half of the files among the ones of the last max_size."""
+    seed(42)
+    requests = []
+    next_file = 0
+    for _ in range(num_requests):
+        if next_file > max_size and randrange(2) == 0:
+            requests.append(f"/store/file_{randrange(next_file - max_size, next_file)}")
+        else:
+            requests.append(f"/store/file_{next_file}")
+            next_file += 1
+    return requests
+
+
+def update_throughput(cache, requests: list) -> float:
+    """Measure the update rate of a cache.
+
+    Returns:
+        float: requests per second
+    """
+    start = perf_counter()
+    for file_ in requests:
+        cache.update(file_)
+    return len(requests) / (perf_counter() - start)
+
+
+def bench_caches(max_sizes: list = MAX_SIZES, num_requests: int = NUM_REQUESTS):
+    print(f"{'max size':>10} {'LRU req/s':>14} {'FIFO req/s':>14} {'list LRU req/s':>16}")
+    for max_size in max_sizes:
+        requests = _requests(max_size, num_requests)
+        lru_rate = update_throughput(LRUCache(max_size=max_size), requests)
+        fifo_rate = update_throughput(FIFOCache(max_size=max_size), requests)
+        if max_size <= MAX_LIST_SIZE:
+            list_rate = f"{update_throughput(_ListLRUCache(max_size), requests):>16.0f}"
+        else:
+            list_rate = f"{'-':>16}"
+        print(f"{max_size:>10} {lru_rate:>14.0f} {fifo_rate:>14.0f} {list_rate}")
+
+
+if __name__ == "__main__":
+    if len(argv) > 1 and argv[1] == "caches":
+        bench_caches([int(value) for value in argv[2:]] or MAX_SIZES)
+    else:
+        print("Use: python -m SmartCache.ai.models.benchmark caches [max_size ...]")
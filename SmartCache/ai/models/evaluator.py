@@ -1,49 +1,72 @@
+from collections import OrderedDict
 from datetime import timedelta
+from multiprocessing import Pool, cpu_count
+from queue import Empty, Full, Queue
+from threading import Event, Thread
 
 import matplotlib.pyplot as plt
 import numpy as np
 from tqdm import tqdm
 
+from .history import History
 from .utils import date_from_timestamp_ms
 
 
 class SimpleCache(object):
 
-    def __init__(self, init_state: dict = {}):
-        self._cache = []
+    """Cache without a size limit.
+
+    The stored files are the keys of an OrderedDict, used as an
+    ordered set: membership, insertion and removal of the oldest file
+    are O(1). The size and the hit rate after each request are
+    recorded in a History, configured with history_settings (see
+    History for the arguments).
+    """
+
+    def __init__(self, init_state: dict = {}, history_settings: dict = {}):
+        self._cache = OrderedDict()
         self._hit = 0
         self._miss = 0
-        self._size_history = []
-        self._hit_rate_history = []
+        self._history = History(['size', 'hit_rate'], **history_settings)
 
         if init_state:
-            self._cache += init_state['cache']
+            self._cache.update((file_, None) for file_ in init_state['cache'])
             self._hit += init_state['hit']
             self._miss += init_state['miss']
-            self._size_history += init_state['size_history']
-            self._hit_rate_history += init_state['hit_rate_history']
+            self._history.extend(
+                index=init_state.get('request_history'),
+                requests=init_state.get('requests'),
+                size=init_state['size_history'],
+                hit_rate=init_state['hit_rate_history']
+            )
 
     @property
     def state(self):
         return {
-            'cache': self._cache,
+            'cache': list(self._cache),
             'hit': self._hit,
             'miss': self._miss,
-            'size_history': self._size_history,
-            'hit_rate_history': self._hit_rate_history
+            'size_history': self.size_history,
+            'hit_rate_history': self.hit_rate_history,
+            'request_history': self._history.index,
+            'requests': self._history.requests,
         }
 
+    @property
+    def records(self) -> 'History':
+        return self._history
+
     @property
     def history(self):
-        return list(zip(self._size_history, self._hit_rate_history))
+        return list(zip(self.size_history, self.hit_rate_history))
 
     @property
     def size_history(self):
-        return self._size_history
+        return self._history['size']
 
     @property
     def hit_rate_history(self):
-        return self._hit_rate_history
+        return self._history['hit_rate']
 
     @property
     def hit_rate(self):
@@ -55,20 +78,27 @@ class SimpleCache(object):
     def check(self, file_):
         return file_ in self._cache
 
+    def _add(self, file_, insert_index: int = -1):
+        if insert_index == -1:
+            self._cache[file_] = None
+        else:
+            files = list(self._cache)
+            files.insert(insert_index, file_)
+            self._cache = OrderedDict((cur_file, None) for cur_file in files)
+
+    def _record(self):
+        self._history.append(len(self), self.hit_rate)
+
     def update(self, file_, insert: bool = True, insert_index: int = -1):
         hit = self.check(file_)
         if not hit:
             self._miss += 1
             if insert:
-                if insert_index == -1:
-                    self._cache.append(file_)
-                else:
-                    self._cache.insert(insert_index, file_)
+                self._add(file_, insert_index)
         else:
             self._hit += 1
 
-        self._size_history.append(len(self))
-        self._hit_rate_history.append(self.hit_rate)
+        self._record()
 
         return hit
 
@@ -81,70 +111,131 @@ class FIFOCache(SimpleCache):
 
     def update(self, file_, insert: bool = True):
         if len(self._cache) == self._max_size:
-            self._cache.pop(0)
+            self._cache.popitem(last=False)
         return super(FIFOCache, self).update(file_, insert)
 
 
 class LRUCache(SimpleCache):
 
+    """Least recently used cache.
+
+    The OrderedDict of the stored files is kept in access order, the
+    least recently used file is the first one.
+    """
+
     def __init__(self, *args, max_size: int = 1000, **kwargs):
         super(LRUCache, self).__init__(*args, **kwargs)
         self._max_size = max_size
-        self._counters = np.zeros(self._max_size)
 
+        init_state = args[0] if args else kwargs.get('init_state', {})
         if 'init_state' in kwargs:
             self._max_size = kwargs['init_state']['max_size']
-            self._counters = np.array(kwargs['init_state']['counters'])
+        if init_state and len(init_state.get('counters', [])) == len(self._cache):
+            # Counters are the number of requests since the last access
+            order = sorted(
+                zip(init_state['counters'], init_state['cache']),
+                key=lambda item: -item[0]
+            )
+            self._cache = OrderedDict((file_, None) for _, file_ in order)
 
     def update(self, file_, insert: bool = True):
-        self._counters += 1
-
         hit = self.check(file_)
         if hit:
             self._hit += 1
-            idx = self._cache.index(file_)
-            self._counters[idx] = 0
-        elif len(self._cache) == self._max_size:
-            self._miss += 1
-            if insert:
-                idx = np.argmin(self._counters)
-                self._cache.pop(idx)
-                self._cache.insert(idx, file_)
-                self._counters[idx] = 0
+            self._cache.move_to_end(file_)
         else:
             self._miss += 1
             if insert:
-                self._cache.append(file_)
-                idx = self._cache.index(file_)
-                self._counters[idx] = 0
+                if len(self._cache) == self._max_size:
+                    self._cache.popitem(last=False)
+                self._cache[file_] = None
 
-        self._size_history.append(len(self))
-        self._hit_rate_history.append(self.hit_rate)
+        self._record()
 
         return hit
 
     @property
     def state(self):
-        return {
-            'cache': self._cache,
-            'hit': self._hit,
-            'miss': self._miss,
-            'size_history': self._size_history,
-            'hit_rate_history': self._hit_rate_history,
-            'max_size': self._max_size,
-            'counters': list(self._counters)
-        }
+        state = super(LRUCache, self).state
+        state['max_size'] = self._max_size
+        # Recency rank of each file, the least recently used has the
+        # biggest counter
+        state['counters'] = list(range(len(self._cache) - 1, -1, -1))
+        return state
+
+
+# Support table of the conversion worker processes
+_SUPPORT_TABLE = None
+
+
+def _init_conversion(support_table):
+    global _SUPPORT_TABLE
+    _SUPPORT_TABLE = support_table
+
+
+def _convert(features: list, support_table=None) -> 'np.ndarray':
+    """Convert the features of a batch of records to model inputs."""
+    if support_table is None:
+        support_table = _SUPPORT_TABLE
+    ##
+    # TO DO
+    # Add support table configuration and dataset export
+    # configuration to be loaded to pass also normalized and
+    # one hot arguments
+    return np.array([
+        support_table.close_conversion(
+            'features',
+            cur_features,
+            normalized=False,
+            one_hot=True
+        )
+        for cur_features in features
+    ])
+
+
+def _put(queue: 'Queue', item, stop: 'Event') -> bool:
+    """Put an item in a bounded queue unless the pipeline stops."""
+    while not stop.is_set():
+        try:
+            queue.put(item, timeout=0.1)
+            return True
+        except Full:
+            pass
+    return False
+
+
+def _get(queue: 'Queue', stop: 'Event'):
+    """Get an item from a queue, None if the pipeline stops."""
+    while not stop.is_set():
+        try:
+            return queue.get(timeout=0.1)
+        except Empty:
+            pass
+    return None
 
 
 class Evaluator(object):
 
+    """Compare a cache with a cache that stores what the model predicts.
+
+    The simulation is a pipeline of three stages: the records are read
+    in batches of ai_stride records and their features are converted
+    to model inputs by num_workers processes (by the reader thread if
+    num_workers is 0), a thread makes the predictions of each batch
+    and the caches are updated in the record order. At most prefetch
+    batches wait between two stages.
+    """
+
     def __init__(
         self,
         dataset, model, support_table,
         cache_type: str = 'simple',
         ai_cache_type: str = 'simple',
         cache_settings: dict = {},
-        ai_stride: int = 100
+        ai_stride: int = 100,
+        history_settings: dict = {},
+        num_workers: int = cpu_count() - 1,
+        prefetch: int = 4
     ):
         self._dataset = dataset
         self._support_table = support_table
@@ -156,22 +247,116 @@ class Evaluator(object):
             'lru': LRUCache,
             'fifo': FIFOCache
         }
-        self.__cache_settings = cache_settings
+        self.__cache_settings = dict(
+            cache_settings, history_settings=history_settings
+        )
+        # Running sum of the WrapCPU of the hits
         self._wrap_cpu = {
-            'cache': [],
-            'ai_cache': []
+            'cache': History(['wrap_cpu'], **history_settings),
+            'ai_cache': History(['wrap_cpu'], **history_settings)
+        }
+        self._wrap_cpu_sum = {
+            'cache': 0.,
+            'ai_cache': 0.
         }
         self.__ai_stride = ai_stride
+        self.__num_workers = num_workers
+        self.__prefetch = prefetch
 
     def add_wrap_cpu(self, cache: str, amount: float, hit: bool):
         cur_cache = self._wrap_cpu[cache]
-        if len(cur_cache) == 0:
-            cur_cache.append(amount)
-        else:
-            if hit:
-                cur_cache.append(amount + cur_cache[-1])
+        if cur_cache.requests == 0 or hit:
+            self._wrap_cpu_sum[cache] += amount
+        cur_cache.append(self._wrap_cpu_sum[cache])
+
+    def __read(self, pool, batches: 'Queue', stop: 'Event'):
+        """Read and convert the record batches."""
+        def send(records: list, features: list) -> bool:
+            if pool is not None:
+                tensors = pool.apply_async(_convert, (features,))
             else:
-                cur_cache.append(cur_cache[-1])
+                tensors = _convert(features, self._support_table)
+            return _put(batches, (records, tensors), stop)
+
+        try:
+            records = []
+            features = []
+            for obj in self._dataset:
+                records.append((
+                    obj['data']['FileName'],
+                    float(obj['data']['WrapCPU']),
+                    obj['data'].get('StartedRunningTimeStamp', None)
+                ))
+                features.append(obj['features'])
+                if len(records) == self.__ai_stride:
+                    if not send(records, features):
+                        return
+                    records = []
+                    features = []
+            if records and not send(records, features):
+                return
+        except Exception as err:
+            _put(batches, err, stop)
+        else:
+            _put(batches, None, stop)
+
+    def __predict(self, batches: 'Queue', predictions: 'Queue', stop: 'Event'):
+        """Make the predictions of the converted batches, in order."""
+        while True:
+            batch = _get(batches, stop)
+            if batch is None or isinstance(batch, Exception):
+                _put(predictions, batch, stop)
+                return
+            records, tensors = batch
+            try:
+                if not isinstance(tensors, np.ndarray):
+                    tensors = tensors.get()
+                result = (records, self._model.predict(tensors))
+            except Exception as err:
+                _put(predictions, err, stop)
+                return
+            if not _put(predictions, result, stop):
+                return
+
+    def __predictions(self):
+        """Iterate over the record batches and their predictions.
+
+        Yields:
+            tuple (list, numpy.ndarray): the (FileName, WrapCPU,
+                StartedRunningTimeStamp) of the records and their
+                predictions
+        """
+        pool = None
+        if self.__num_workers > 0:
+            pool = Pool(
+                self.__num_workers,
+                initializer=_init_conversion,
+                initargs=(self._support_table,)
+            )
+        batches = Queue(maxsize=self.__prefetch)
+        predictions = Queue(maxsize=self.__prefetch)
+        stop = Event()
+        stages = [
+            Thread(target=self.__read, args=(pool, batches, stop), daemon=True),
+            Thread(target=self.__predict, args=(batches, predictions, stop), daemon=True)
+        ]
+        for stage in stages:
+            stage.start()
+        try:
+            while True:
+                result = predictions.get()
+                if result is None:
+                    break
+                if isinstance(result, Exception):
+                    raise result
+                yield result
+        finally:
+            stop.set()
+            for stage in stages:
+                stage.join()
+            if pool is not None:
+                pool.terminate()
+                pool.join()
 
     def _compare(
         self, initial_values: dict = {}
@@ -194,78 +379,32 @@ class Evaluator(object):
 
         last_day = None
         delta_time = timedelta(days=1)
-        lazy_predictions = {
-            'tensors': [],
-            'data': []
-        }
+        idx = 0
 
-        for idx, obj in tqdm(enumerate(self._dataset), desc="Simulation"):
-            FileName = obj['data']['FileName']
-            WrapCPU = float(obj['data']['WrapCPU'])
-            timestamp = obj['data'].get('StartedRunningTimeStamp', None)
-            obj_deltatime = None
-
-            if timestamp:
-                obj_deltatime = date_from_timestamp_ms(timestamp)
-
-            if obj_deltatime:
-                if not last_day:
-                    separators.append(idx)
-                    last_day = obj_deltatime
-                else:
-                    if obj_deltatime - last_day > delta_time:
-                        separators.append(idx)
-                        last_day = obj_deltatime
-            ##
-            # TO DO
-            # Add support table configuration and dataset export
-            # configuration to be loaded to pass also normalized and
-            # one hot arguments
-            tensor = np.array(
-                self._support_table.close_conversion(
-                    'features',
-                    obj['features'],
-                    normalized=False,
-                    one_hot=True
-                )
-            )
+        with tqdm(desc="Simulation") as progress:
+            for records, predictions in self.__predictions():
+                for (FileName, WrapCPU, timestamp), prediction in zip(records, predictions):
+                    obj_deltatime = None
 
-            hit = cache.update(FileName)
-            self.add_wrap_cpu('cache', WrapCPU, hit)
+                    if timestamp:
+                        obj_deltatime = date_from_timestamp_ms(timestamp)
 
-            lazy_predictions['data'].append((FileName, WrapCPU))
-            lazy_predictions['tensors'].append(tensor)
+                    if obj_deltatime:
+                        if not last_day:
+                            separators.append(idx)
+                            last_day = obj_deltatime
+                        else:
+                            if obj_deltatime - last_day > delta_time:
+                                separators.append(idx)
+                                last_day = obj_deltatime
+
+                    hit = cache.update(FileName)
+                    self.add_wrap_cpu('cache', WrapCPU, hit)
 
-            if len(lazy_predictions['tensors']) == self.__ai_stride:
-                cur_data = lazy_predictions['data']
-                predictions = self._model.predict(
-                    np.array(lazy_predictions['tensors']))
-                for idx, prediction in enumerate(predictions):
-                    FileName, WrapCPU = cur_data[idx]
-                    hit = ai_cache.update(FileName, bool(prediction))
-                    self.add_wrap_cpu('ai_cache', WrapCPU, hit)
-                else:
-                    lazy_predictions = {
-                        'tensors': [],
-                        'data': []
-                    }
-
-            # prediction = self._model.predict_single(tensor)
-            # hit = ai_cache.update(FileName, bool(prediction))
-            # self.add_wrap_cpu('ai_cache', WrapCPU, hit)
-
-            # Block for debug
-            # if idx == 1000:
-            #     break
-        else:
-            if len(lazy_predictions['tensors']) > 0:
-                cur_data = lazy_predictions['data']
-                predictions = self._model.predict(
-                    np.array(lazy_predictions['tensors']))
-                for idx, prediction in enumerate(predictions):
-                    FileName, WrapCPU = cur_data[idx]
                     hit = ai_cache.update(FileName, bool(prediction))
                     self.add_wrap_cpu('ai_cache', WrapCPU, hit)
+                    idx += 1
+                progress.update(len(records))
 
         return {
             'cache': cache,
@@ -292,12 +431,8 @@ class Evaluator(object):
 
         self._plot_stats(
             {
-                'cache': result['cache'].size_history,
-                'ai_cache': result['ai_cache'].size_history
-            },
-            {
-                'cache': result['cache'].hit_rate_history,
-                'ai_cache': result['ai_cache'].hit_rate_history
+                'cache': result['cache'].records,
+                'ai_cache': result['ai_cache'].records
             },
             {
                 'cache': self._wrap_cpu['cache'],
@@ -310,21 +445,21 @@ class Evaluator(object):
         else:
             plt.savefig(filename, dpi=dpi)
 
-    def _plot_stats(self, size, hit_rate, wrap_cpu, x_separator: list = []):
+    def _plot_stats(self, records: dict, wrap_cpu: dict, x_separator: list = []):
         plt.clf()
         # Size
         axes = plt.subplot(3, 1, 1)
         for _x_ in x_separator:
             axes.axvline(x=_x_)
         plt.plot(
-            range(len(size['cache'])),
-            size['cache'],
+            records['cache'].index,
+            records['cache']['size'],
             label="cache [{}] size".format(self.__cache_type),
             alpha=0.9
         )
         plt.plot(
-            range(len(size['ai_cache'])),
-            size['ai_cache'],
+            records['ai_cache'].index,
+            records['ai_cache']['size'],
             label="ai_cache [{}] hit rate".format(self.__ai_cache_type),
             alpha=0.9
         )
@@ -337,14 +472,14 @@ class Evaluator(object):
         for _x_ in x_separator:
             axes.axvline(x=_x_)
         plt.plot(
-            range(len(hit_rate['cache'])),
-            hit_rate['cache'],
+            records['cache'].index,
+            records['cache']['hit_rate'],
             label="cache [{}] hit rate".format(self.__cache_type),
             alpha=0.9
         )
         plt.plot(
-            range(len(hit_rate['ai_cache'])),
-            hit_rate['ai_cache'],
+            records['ai_cache'].index,
+            records['ai_cache']['hit_rate'],
             label="ai_cache [{}] hit rate".format(self.__ai_cache_type),
             alpha=0.9
         )
@@ -357,14 +492,14 @@ class Evaluator(object):
         for _x_ in x_separator:
             axes.axvline(x=_x_)
         plt.plot(
-            range(len(wrap_cpu['cache'])),
-            wrap_cpu['cache'],
+            wrap_cpu['cache'].index,
+            wrap_cpu['cache']['wrap_cpu'],
             label="cache [{}] WrapCPU".format(self.__cache_type),
             alpha=0.9
         )
         plt.plot(
-            range(len(wrap_cpu['ai_cache'])),
-            wrap_cpu['ai_cache'],
+            wrap_cpu['ai_cache'].index,
+            wrap_cpu['ai_cache']['wrap_cpu'],
             label="ai_cache [{}] WrapCPU".format(self.__ai_cache_type),
             alpha=0.9
         )
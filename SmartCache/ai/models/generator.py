@@ -2,8 +2,12 @@ import gzip
 import json
 import logging
 import os
+import signal
+from collections import OrderedDict
 from concurrent import futures
+from queue import Empty, Queue
 from sys import argv
+from threading import Lock, Thread
 from time import time
 
 import grpc
@@ -11,15 +15,151 @@ import numpy as np
 
 
 from ..service import ai_pb2, ai_pb2_grpc
+from .numpy_model import NumpyModel
+
+
+class _PredictionBatcher(object):
+
+    """Merge the concurrent single predictions in one forward pass.
+
+    A thread makes the predictions of all the pending inputs with a
+    single model call. A lone call is predicted at once, while the
+    calls that find others pending wait until max_batch of them are
+    queued or the oldest one waited max_wait seconds.
+    """
+
+    def __init__(self, predict, max_batch: int = 64, max_wait: float = 0.002):
+        self._predict = predict
+        self._max_batch = max_batch
+        self._max_wait = max_wait
+        self._requests = Queue()
+        self._lock = Lock()
+        self._stopped = False
+        self._worker = Thread(target=self.__run, daemon=True)
+        self._worker.start()
+
+    def __run(self):
+        while True:
+            batch = [self._requests.get()]
+            if batch[0] is None:
+                return
+            # Wait for the others only under concurrent load
+            deadline = time() + self._max_wait if not self._requests.empty() else 0.
+            while len(batch) < self._max_batch:
+                try:
+                    request = self._requests.get(timeout=max(deadline - time(), 0.))
+                except Empty:
+                    break
+                if request is None:
+                    self._requests.put(None)
+                    break
+                batch.append(request)
+            try:
+                predictions = self._predict(np.stack([data for data, _ in batch]))
+            except Exception as err:
+                for _, result in batch:
+                    result.set_exception(err)
+            else:
+                for (_, result), prediction in zip(batch, predictions):
+                    result.set_result(prediction)
+
+    def predict_one(self, data):
+        result = futures.Future()
+        with self._lock:
+            # Calls that arrive after a stop are not batched
+            if self._stopped:
+                return self._predict(np.expand_dims(data, 0))[0]
+            self._requests.put((data, result))
+        return result.result()
+
+    def stop(self):
+        """Stop the batching thread after the pending predictions."""
+        with self._lock:
+            if self._stopped:
+                return
+            self._stopped = True
+            self._requests.put(None)
+        self._worker.join()
+
+
+class _PredictionCache(object):
+
+    """Bounded LRU of the predictions of the input vectors.
+
+    Inputs are quantized to multiples of quantum, so vectors that
+    differ only for the float noise share the same entry, and the key
+    is the hash of the quantized values. Each clear starts a new
+    generation, and the predictions made in an older generation (by
+    the previous model) are not stored.
+    """
+
+    def __init__(self, max_entries: int = 2**16, quantum: float = 1e-6):
+        self._max_entries = max_entries
+        self._quantum = quantum
+        self._predictions = OrderedDict()
+        self._lock = Lock()
+        self._generation: int = 0
+        # Stat attributes
+        self._hits: int = 0
+        self._misses: int = 0
+
+    def key(self, data) -> int:
+        return hash(np.rint(np.asarray(data) / self._quantum).astype(np.int64).tobytes())
+
+    def get(self, key: int):
+        with self._lock:
+            prediction = self._predictions.get(key)
+            if prediction is None:
+                self._misses += 1
+            else:
+                self._predictions.move_to_end(key)
+                self._hits += 1
+            return prediction
+
+    @property
+    def generation(self) -> int:
+        """Take it before the prediction to store with set."""
+        return self._generation
+
+    def set(self, key: int, prediction, generation: int):
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._predictions[key] = prediction
+            if len(self._predictions) > self._max_entries:
+                self._predictions.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._predictions.clear()
+
+    def hit_rate(self) -> float:
+        return self._hits / max(self._hits + self._misses, 1)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            'hits': self._hits,
+            'misses': self._misses,
+            'hit_rate': self.hit_rate(),
+            'entries': len(self._predictions),
+        }
 
 
 class DonkeyModel(ai_pb2_grpc.AIServiceServicer):
 
-    def __init__(self, epochs: int = 20, batch_size: int = 64):
+    def __init__(self, epochs: int = 20, batch_size: int = 64,
+                 cache_size: int = 2**16, cache_quantum: float = 1e-6):
         self._batch_size = batch_size
         self._epochs = epochs
         self._model = None
         self._server = None
+        self._batcher = None
+        # Predictions of the input vectors already seen, 0 to disable
+        self._cache = _PredictionCache(
+            cache_size, cache_quantum
+        ) if cache_size > 0 else None
         # Outputs
         self.__num_predictions = 0
         self.__start_time = time()
@@ -83,22 +223,110 @@ class DonkeyModel(ai_pb2_grpc.AIServiceServicer):
             validation_split=0.1
         )
 
+    def __count_predictions(self, num_predictions: int):
+        self.__num_predictions += num_predictions
+
+        if time() - self.__start_time >= 1.0:
+            if self._cache is not None:
+                print(f"[AI][Predicted {self.__num_predictions}/s]"
+                      f"[Cache hit rate: {self._cache.hit_rate() * 100.:0.2f}%]", end="\r")
+            else:
+                print(f"[AI][Predicted {self.__num_predictions}/s]", end="\r")
+            self.__num_predictions = 0
+            self.__start_time = time()
+
     def AIPredictOne(self, request, context) -> 'ai_pb2.StorePrediction':
-        prediction = self.predict_one(np.array(request.inputVector))
+        data = np.array(request.inputVector)
+        prediction = None
+        if self._cache is not None:
+            generation = self._cache.generation
+            key = self._cache.key(data)
+            prediction = self._cache.get(key)
+        if prediction is None:
+            if self._batcher is not None:
+                prediction = self._batcher.predict_one(data)
+            else:
+                prediction = self.predict_one(data)
+            if self._cache is not None:
+                self._cache.set(key, prediction, generation)
 
         response = ai_pb2.StorePrediction(
             store=True if prediction == 1 else False
         )
 
-        self.__num_predictions += 1
+        self.__count_predictions(1)
 
-        if time() - self.__start_time >= 1.0:
-            print(f"[AI][Predicted {self.__num_predictions}/s]", end="\r")
-            self.__num_predictions = 0
-            self.__start_time = time()
+        return response
+
+    def AIPredictBatch(self, request, context) -> 'ai_pb2.StorePredictionBatch':
+        data = np.array(request.inputVectors).reshape(-1, request.vectorSize)
+        if self._cache is not None and len(data) > 0:
+            predictions = self.__predict_cached(data)
+        else:
+            predictions = self.predict_batch(data) if len(data) > 0 else np.array([])
+
+        response = ai_pb2.StorePredictionBatch(
+            store=(predictions == 1).tolist()
+        )
+
+        self.__count_predictions(len(data))
 
         return response
 
+    def __predict_cached(self, data):
+        """Predict a batch using the cached predictions."""
+        generation = self._cache.generation
+        keys = [self._cache.key(row) for row in data]
+        predictions = [self._cache.get(key) for key in keys]
+        # The repeated inputs of the batch are predicted only once
+        missing = {}
+        for idx, (key, prediction) in enumerate(zip(keys, predictions)):
+            if prediction is None:
+                missing.setdefault(key, idx)
+        if missing:
+            new_predictions = dict(zip(
+                missing, self.predict_batch(data[list(missing.values())]).tolist()
+            ))
+            for key, prediction in new_predictions.items():
+                self._cache.set(key, prediction, generation)
+            predictions = [
+                new_predictions[key] if prediction is None else prediction
+                for key, prediction in zip(keys, predictions)
+            ]
+        return np.array(predictions)
+
+    @property
+    def input_size(self) -> int:
+        if isinstance(self._model, NumpyModel):
+            return self._model.input_size
+        return self._model.input_shape[1]
+
+    def warm_up(self, batch_size: int = 64) -> 'DonkeyModel':
+        """Make the first predictions, that build the model graph."""
+        data = np.zeros((batch_size, self.input_size))
+        self.predict_batch(data)
+        self.predict_batch(data[:1])
+        return self
+
+    def enable_batching(self, max_batch: int = 64,
+                        max_wait: float = 0.002) -> 'DonkeyModel':
+        """Merge the concurrent AIPredictOne calls, see serve."""
+        if self._batcher is not None:
+            self._batcher.stop()
+            self._batcher = None
+        if max_batch > 1:
+            self._batcher = _PredictionBatcher(self.predict_batch, max_batch, max_wait)
+        return self
+
+    def stop_batching(self):
+        if self._batcher is not None:
+            self._batcher.stop()
+
+    @property
+    def cache_stats(self) -> dict:
+        """Hits, misses, hit rate and entries of the prediction cache."""
+        return self._cache.stats if self._cache is not None else {}
+
     def predict_one(self, data):
         tmp = np.expand_dims(data, 0)
         prediction = self._model.predict(tmp)
@@ -108,6 +336,15 @@ class DonkeyModel(ai_pb2_grpc.AIServiceServicer):
         predictions = self._model.predict(data)
         return np.argmax(predictions, axis=1)
 
+    def predict_batch(self, data):
+        """Predict a small batch with a single forward pass.
+
+        predict_on_batch skips the input pipeline setup of predict,
+        that dominates the time of the small batches of the service.
+        """
+        predictions = self._model.predict_on_batch(data)
+        return np.argmax(predictions, axis=1)
+
     def export_weights(self, out_name: str):
         model = {
             'name': "DonkeyModel",
@@ -142,29 +379,166 @@ class DonkeyModel(ai_pb2_grpc.AIServiceServicer):
         return self
 
     def load(self, filename: str):
-        try:
-            from tensorflow import keras
-        except ImportError:
-            print("Warning: TF not present or AVX instructions are not supported!")
-        self._model = keras.models.load_model(filename)
+        # Exported weights are served by the NumPy engine, without TF
+        if filename.endswith(".npz") or filename.endswith(".dump.json.gz"):
+            self._model = NumpyModel.load(filename)
+        else:
+            try:
+                from tensorflow import keras
+            except ImportError:
+                print("Warning: TF not present or AVX instructions are not supported!")
+            self._model = keras.models.load_model(filename)
+        # The predictions of the previous model are not valid anymore,
+        # also the ones of the calls still in flight
+        if self._cache is not None:
+            self._cache.clear()
 
     def serve(self, host: str = "127.0.0.1",
               port: int = 4242,
               max_workers: int = 10,
+              max_batch: int = 64,
+              max_wait: float = 0.002,
               ) -> 'DonkeyModel':
-        self._server = grpc.server(
-            futures.ThreadPoolExecutor(max_workers=max_workers)
+        """Serve the model predictions with gRPC.
+
+        Args:
+            host (str): the address to listen to
+            port (int): the port to listen to
+            max_workers (int): number of threads serving the calls
+            max_batch (int): max number of concurrent AIPredictOne
+                calls merged in one forward pass, 1 to disable
+            max_wait (float): max time in seconds a call waits for
+                the others of its batch, when other calls are pending
+
+        Returns:
+            DonkeyModel: this object instance
+        """
+        self.enable_batching(max_batch, max_wait)
+        # Each pending call of the batch holds a worker
+        self._server = _start_server(self, host, port, max(max_workers, max_batch))
+        self._server.wait_for_termination()
+        return self
+
+    def __del__(self):
+        if self._server:
+            self._server.stop(True)
+        if self._batcher:
+            self._batcher.stop()
+
+
+def _start_server(servicer, host: str, port: int, max_workers: int) -> 'grpc.Server':
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=max_workers)
+    )
+    ai_pb2_grpc.add_AIServiceServicer_to_server(servicer, server)
+    server.add_insecure_port(f'{host}:{port}')
+    print(f"[AI][Serve on {host}:{port}]")
+    server.start()
+    return server
+
+
+class ModelRegistry(ai_pb2_grpc.AIServiceServicer):
+
+    """Serve several named models from the same process.
+
+    The requests are routed by the model field of the input, an empty
+    name selects the default model (the first added). Each model is
+    loaded and warmed up before it can receive requests, and adding a
+    model with the name of a served one swaps them atomically: the
+    calls already started finish with the old model.
+    """
+
+    def __init__(self, max_batch: int = 64, max_wait: float = 0.002,
+                 cache_size: int = 2**16):
+        """Init function of the registry.
+
+        Args:
+            max_batch (int): max number of concurrent AIPredictOne
+                calls merged in one forward pass, 1 to disable
+            max_wait (float): max time in seconds a call waits for
+                the others of its batch, when other calls are pending
+            cache_size (int): number of cached predictions of each model
+
+        Returns:
+            ModelRegistry: the instance of this object
+
+        """
+        self._max_batch = max_batch
+        self._max_wait = max_wait
+        self._cache_size = cache_size
+        self._models = {}
+        self._files = {}
+        self._default = None
+        self._lock = Lock()
+        self._server = None
+
+    @property
+    def names(self) -> list:
+        return list(self._models)
+
+    def add(self, name: str, filename: str) -> 'DonkeyModel':
+        """Load, warm up and serve a model, replacing the one with the same name."""
+        model = DonkeyModel(cache_size=self._cache_size)
+        model.load(filename)
+        start = time()
+        model.warm_up()
+        print(f"[AI][Model {name} warmed up in {time() - start:0.2f}s]")
+        model.enable_batching(self._max_batch, self._max_wait)
+        with self._lock:
+            old_model = self._models.get(name)
+            self._models[name] = model
+            self._files[name] = filename
+            if self._default is None:
+                self._default = name
+        if old_model is not None:
+            old_model.stop_batching()
+        return model
+
+    def remove(self, name: str):
+        with self._lock:
+            model = self._models.pop(name)
+            del self._files[name]
+            if self._default == name:
+                self._default = next(iter(self._models), None)
+        model.stop_batching()
+
+    def reload(self):
+        """Swap all the models with the current version of their files."""
+        for name, filename in list(self._files.items()):
+            self.add(name, filename)
+
+    def get(self, name: str = "") -> 'DonkeyModel':
+        with self._lock:
+            return self._models.get(name if name else self._default)
+
+    def __route(self, name: str, context) -> 'DonkeyModel':
+        model = self.get(name)
+        if model is None:
+            context.abort(grpc.StatusCode.NOT_FOUND, f"Model '{name}' not found")
+        return model
+
+    def AIPredictOne(self, request, context) -> 'ai_pb2.StorePrediction':
+        return self.__route(request.model, context).AIPredictOne(request, context)
+
+    def AIPredictBatch(self, request, context) -> 'ai_pb2.StorePredictionBatch':
+        return self.__route(request.model, context).AIPredictBatch(request, context)
+
+    def serve(self, host: str = "127.0.0.1",
+              port: int = 4242,
+              max_workers: int = 10,
+              ) -> 'ModelRegistry':
+        """Serve the models with gRPC, see DonkeyModel.serve."""
+        self._server = _start_server(
+            self, host, port, max(max_workers, self._max_batch)
         )
-        ai_pb2_grpc.add_AIServiceServicer_to_server(self, self._server)
-        self._server.add_insecure_port(f'{host}:{port}')
-        print(f"[AI][Serve on {host}:{port}]")
-        self._server.start()
         self._server.wait_for_termination()
         return self
 
     def __del__(self):
         if self._server:
             self._server.stop(True)
+        for model in self._models.values():
+            model.stop_batching()
 
 
 class CMSTest0ModelGenerator(object):
@@ -248,5 +622,15 @@ if __name__ == "__main__":
         model.load(argv[3])
         logging.basicConfig()
         model.serve()
+    elif argv[1] == "serve" and argv[2] == "registry":
+        registry = ModelRegistry()
+        for model_arg in argv[3:]:
+            name, filename = model_arg.split("=", 1)
+            registry.add(name, filename)
+        # Hot-swap the models after they are updated with kill -HUP
+        signal.signal(signal.SIGHUP, lambda *_: registry.reload())
+        logging.basicConfig()
+        registry.serve()
     else:
         print("Use: python -m SmartCache.ai.models.generator serve 'model_name' 'model_file_path'")
+        print("     python -m SmartCache.ai.models.generator serve registry 'name=model_file_path' ...")
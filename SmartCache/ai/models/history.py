@@ -0,0 +1,145 @@
+import os
+from tempfile import mkstemp
+
+import numpy as np
+
+__all__ = ['History']
+
+
+class History(object):
+
+    """Columnar recorder of per-request values.
+
+    Records are stored in NumPy chunks of chunk_size rows, one row per
+    record with the request index as first column: only the rows of the
+    chunk being filled are Python tuples. If every is greater than 1
+    only one request every 'every' is recorded. When the chunks in
+    memory exceed max_memory bytes they are appended to a file, that is
+    read back as a memory-mapped array.
+    """
+
+    def __init__(self, columns: list, every: int = 1, chunk_size: int = 2**16,
+                 max_memory: int = 2**28, spill_dir: str = None):
+        """Init function of the recorder.
+
+        Args:
+            columns (list): the names of the recorded values
+            every (int): record a request every 'every' requests
+            chunk_size (int): number of rows of a chunk
+            max_memory (int): max bytes of the chunks in memory
+            spill_dir (str): folder of the spill file, the default
+                temporary folder if not specified
+
+        Returns:
+            History: the instance of this object
+
+        """
+        self._columns = ['request'] + list(columns)
+        self._every = every
+        self._chunk_size = chunk_size
+        self._max_chunks = max(max_memory // (chunk_size * len(self._columns) * 8), 1)
+        self._spill_dir = spill_dir
+        self._spill_file = None
+        self._spilled_rows = 0
+        self._chunks = []
+        self._buffer = []
+        self._requests = 0
+
+    @property
+    def columns(self) -> list:
+        return self._columns[1:]
+
+    @property
+    def requests(self) -> int:
+        """Number of requests, recorded or not."""
+        return self._requests
+
+    def __len__(self):
+        return self._spilled_rows + len(self._chunks) * self._chunk_size \
+            + len(self._buffer)
+
+    def __flush(self):
+        if len(self._chunks) == self._max_chunks:
+            self.__spill()
+        self._chunks.append(np.array(self._buffer, dtype=np.float64))
+        self._buffer = []
+
+    def __spill(self):
+        if self._spill_file is None:
+            handle, self._spill_file = mkstemp(suffix=".history", dir=self._spill_dir)
+            os.close(handle)
+        with open(self._spill_file, "ab") as spill_file:
+            for chunk in self._chunks:
+                spill_file.write(chunk.tobytes())
+        self._spilled_rows += len(self._chunks) * self._chunk_size
+        self._chunks = []
+
+    def append(self, *values):
+        """Record the values of a request, in column order."""
+        if self._requests % self._every == 0:
+            self._buffer.append((self._requests, *values))
+            if len(self._buffer) == self._chunk_size:
+                self.__flush()
+        self._requests += 1
+
+    def extend(self, index=None, requests: int = None, **columns):
+        """Record the values of previous requests.
+
+        Args:
+            index (list): the request index of each row, consecutive
+                requests after the recorded ones if not specified
+            requests (int): the number of requests after the rows,
+                recorded or not, one after the last index if not
+                specified
+            **columns: the values of each column
+        """
+        num_rows = len(columns[self.columns[0]])
+        if index is None:
+            index = range(self._requests, self._requests + num_rows)
+        rows = zip(
+            [int(idx) for idx in index],
+            *[list(columns[name]) for name in self.columns]
+        )
+        for row in rows:
+            self._buffer.append(row)
+            if len(self._buffer) == self._chunk_size:
+                self.__flush()
+            self._requests = row[0] + 1
+        if requests is not None:
+            self._requests = requests
+
+    def __getitem__(self, name: str) -> 'np.ndarray':
+        """Get all the recorded values of a column.
+
+        If all the records are in a single part (the spill file, a
+        chunk or the rows being filled) the result is a read-only view,
+        otherwise the parts are copied in a new array.
+        """
+        col = self._columns.index(name)
+        parts = []
+        if self._spilled_rows > 0:
+            spilled = np.memmap(self._spill_file, dtype=np.float64, mode='r',
+                                shape=(self._spilled_rows, len(self._columns)))
+            parts.append(spilled[:, col])
+        parts.extend(chunk[:, col] for chunk in self._chunks)
+        if self._buffer or not parts:
+            parts.append(np.array([row[col] for row in self._buffer], dtype=np.float64))
+        if len(parts) > 1:
+            return np.concatenate(parts)
+        column = parts[0].view()
+        column.flags.writeable = False
+        return column
+
+    @property
+    def index(self) -> 'np.ndarray':
+        """The request index of each record."""
+        return self['request']
+
+    def close(self):
+        if self._spill_file is not None:
+            os.remove(self._spill_file)
+            self._spill_file = None
+
+    def __del__(self):
+        """Remove the spill file."""
+        self.close()
@@ -0,0 +1,155 @@
+import gzip
+import json
+from sys import argv
+
+import numpy as np
+
+__all__ = ['NumpyModel']
+
+
+def _sigmoid(values: 'np.ndarray') -> 'np.ndarray':
+    # Same as 1 / (1 + exp(-x)) without overflows for big negative values
+    values *= 0.5
+    np.tanh(values, out=values)
+    values += 1.
+    values *= 0.5
+    return values
+
+
+def _hard_sigmoid(values: 'np.ndarray') -> 'np.ndarray':
+    values *= 0.2
+    values += 0.5
+    return np.clip(values, 0., 1., out=values)
+
+
+def _softmax(values: 'np.ndarray') -> 'np.ndarray':
+    values -= values.max(axis=1, keepdims=True)
+    np.exp(values, out=values)
+    values /= values.sum(axis=1, keepdims=True)
+    return values
+
+
+ACTIVATIONS = {
+    'linear': lambda values: values,
+    'relu': lambda values: np.maximum(values, 0., out=values),
+    'tanh': lambda values: np.tanh(values, out=values),
+    'sigmoid': _sigmoid,
+    'hard_sigmoid': _hard_sigmoid,
+    'softmax': _softmax,
+}
+
+
+class NumpyModel(object):
+
+    """Forward pass of a dense model with NumPy only.
+
+    The model is loaded from the dump of DonkeyModel.export_weights and
+    it can be saved as an uncompressed .npz file, that loads in a few
+    milliseconds. It has the prediction methods of a Keras model used
+    by DonkeyModel, so the service can run without TensorFlow.
+    """
+
+    def __init__(self, layers: list, dtype=np.float32):
+        """Init function of the model.
+
+        Args:
+            layers (list): (weights, bias, activation) of each dense
+                layer, in order
+            dtype (numpy.dtype): type of the computations
+
+        Returns:
+            NumpyModel: the instance of this object
+
+        """
+        self._layers = []
+        for weights, bias, activation in layers:
+            if activation not in ACTIVATIONS:
+                raise Exception(f"Activation '{activation}' is not supported...")
+            self._layers.append((
+                np.ascontiguousarray(weights, dtype=dtype),
+                np.ascontiguousarray(bias, dtype=dtype),
+                activation,
+            ))
+        self._dtype = dtype
+
+    @property
+    def input_size(self) -> int:
+        return self._layers[0][0].shape[0]
+
+    @property
+    def output_size(self) -> int:
+        return self._layers[-1][0].shape[1]
+
+    @classmethod
+    def from_dump(cls, filename: str) -> 'NumpyModel':
+        """Load a model from a DonkeyModel.export_weights dump."""
+        with gzip.GzipFile(filename, "rb") as dump_file:
+            model = json.loads(dump_file.read().decode("utf-8"))
+        return cls([
+            (
+                np.array(layer['weights']['values']).reshape(
+                    layer['weights']['shape']),
+                np.array(layer['bias']['values']).reshape(
+                    layer['bias']['shape']),
+                layer['activation_function'],
+            )
+            for layer in model['layers']
+        ])
+
+    def save(self, filename: str) -> 'NumpyModel':
+        """Save the model as an uncompressed .npz file."""
+        arrays = {
+            'activations': np.array([layer[2] for layer in self._layers])
+        }
+        for idx, (weights, bias, _) in enumerate(self._layers):
+            arrays[f"weights_{idx}"] = weights
+            arrays[f"bias_{idx}"] = bias
+        np.savez(filename, **arrays)
+        return self
+
+    @classmethod
+    def load(cls, filename: str) -> 'NumpyModel':
+        """Load a model saved as .npz or a .dump.json.gz dump."""
+        if filename.endswith(".json.gz"):
+            return cls.from_dump(filename)
+        with np.load(filename) as arrays:
+            activations = arrays['activations'].tolist()
+            return cls([
+                (arrays[f"weights_{idx}"], arrays[f"bias_{idx}"], activation)
+                for idx, activation in enumerate(activations)
+            ])
+
+    def predict_on_batch(self, data) -> 'np.ndarray':
+        """Compute the output of the model.
+
+        Args:
+            data (numpy.ndarray): the inputs, a row for each input
+
+        Returns:
+            numpy.ndarray: the output probabilities of each input
+        """
+        values = np.asarray(data, dtype=self._dtype)
+        if values.ndim == 1:
+            values = values.reshape(1, -1)
+        for weights, bias, activation in self._layers:
+            values = values @ weights
+            values += bias
+            values = ACTIVATIONS[activation](values)
+        return values
+
+    def predict(self, data, batch_size: int = 4096) -> 'np.ndarray':
+        """Compute the output of the model in batches of batch_size."""
+        data = np.asarray(data)
+        if len(data) <= batch_size:
+            return self.predict_on_batch(data)
+        return np.concatenate([
+            self.predict_on_batch(data[idx:idx + batch_size])
+            for idx in range(0, len(data), batch_size)
+        ])
+
+
+if __name__ == "__main__":
+    if len(argv) == 4 and argv[1] == "convert":
+        NumpyModel.from_dump(argv[2]).save(argv[3])
+    else:
+        print("Use: python -m SmartCache.ai.models.numpy_model convert 'dump_file.json.gz' 'model.npz'")
@@ -0,0 +1,330 @@
+import unittest
+
+
+class _SupportTable(object):
+
+    """One hot conversion of the 'type' feature, picklable for the workers."""
+
+    def close_conversion(self, table_name, data, normalized=True, one_hot=False):
+        return [float(data['type'] == 'mc'), float(data['type'] == 'data')]
+
+
+class _Model(object):
+
+    """Store only the data files."""
+
+    def predict(self, data):
+        return data[:, 1].astype(int)
+
+
+class TestNumpyModel(unittest.TestCase):
+
+    def test_dump_forward(self):
+        import gzip
+        import json
+        from os import path
+        from tempfile import TemporaryDirectory
+
+        import numpy as np
+
+        from .numpy_model import NumpyModel
+
+        rnd = np.random.RandomState(42)
+        weights = [rnd.normal(size=(8, 16)), rnd.normal(size=(16, 2))]
+        biases = [rnd.normal(size=16), rnd.normal(size=2)]
+        data = rnd.normal(size=(32, 8))
+
+        hidden = 1. / (1. + np.exp(-(data @ weights[0] + biases[0])))
+        output = np.exp(hidden @ weights[1] + biases[1])
+        expected = output / output.sum(axis=1, keepdims=True)
+
+        with TemporaryDirectory() as folder:
+            dump_name = path.join(folder, "model.dump.json.gz")
+            # Same format of DonkeyModel.export_weights
+            with gzip.GzipFile(dump_name, "wb") as dump_file:
+                dump_file.write(json.dumps({
+                    'name': "DonkeyModel",
+                    'layers': [
+                        {
+                            'name': f"dense_{idx}",
+                            'weights': {"shape": cur_weights.shape,
+                                        "values": cur_weights.tolist()},
+                            'bias': {"shape": cur_bias.shape,
+                                     "values": cur_bias.tolist()},
+                            'activation_function': activation
+                        }
+                        for idx, (cur_weights, cur_bias, activation) in enumerate(
+                            zip(weights, biases, ["sigmoid", "softmax"]))
+                    ]
+                }).encode("utf-8"))
+
+            model = NumpyModel.from_dump(dump_name)
+            self.assertEqual((model.input_size, model.output_size), (8, 2))
+            np.testing.assert_allclose(model.predict(data), expected, rtol=1e-4)
+
+            npz_name = path.join(folder, "model.npz")
+            model.save(npz_name)
+            loaded = NumpyModel.load(npz_name)
+            np.testing.assert_allclose(
+                loaded.predict(data, batch_size=5), expected, rtol=1e-4)
+            np.testing.assert_allclose(
+                loaded.predict_on_batch(data[0]), expected[:1], rtol=1e-4)
+
+
+class TestDonkeyModel(unittest.TestCase):
+
+    def test_prediction_cache(self):
+        from os import path
+        from tempfile import TemporaryDirectory
+
+        import numpy as np
+
+        from ..service import ai_pb2
+        from .generator import DonkeyModel
+        from .numpy_model import NumpyModel
+
+        with TemporaryDirectory() as folder:
+            store_name = path.join(folder, "store.npz")
+            skip_name = path.join(folder, "skip.npz")
+            NumpyModel([(np.zeros((2, 2)), [0., 1.], "softmax")]).save(store_name)
+            NumpyModel([(np.zeros((2, 2)), [1., 0.], "softmax")]).save(skip_name)
+
+            model = DonkeyModel(cache_size=2)
+            model.load(store_name)
+            inputs = [[0., 1.], [1., 0.], [0., 1. + 1e-9], [1., 0.]]
+            stores = [
+                model.AIPredictOne(ai_pb2.AIInput(inputVector=vector), None).store
+                for vector in inputs
+            ]
+            self.assertEqual(stores, [True] * 4)
+            self.assertEqual(
+                (model.cache_stats['hits'], model.cache_stats['misses']), (2, 2))
+
+            # A call still in flight with the previous model
+            generation = model._cache.generation
+            model.load(skip_name)
+            self.assertEqual(model.cache_stats['entries'], 0)
+            model._cache.set(model._cache.key([0., 1.]), 1, generation)
+            self.assertEqual(model.cache_stats['entries'], 0)
+            result = model.AIPredictBatch(ai_pb2.AIInputBatch(
+                inputVectors=np.ravel(inputs), vectorSize=2), None)
+            self.assertEqual(list(result.store), [False] * 4)
+            self.assertEqual(model.cache_stats['entries'], 2)
+            result = model.AIPredictBatch(ai_pb2.AIInputBatch(
+                inputVectors=np.ravel(inputs), vectorSize=2), None)
+            self.assertEqual(list(result.store), [False] * 4)
+            self.assertEqual(
+                (model.cache_stats['hits'], model.cache_stats['misses']), (6, 6))
+
+    def test_batching(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from threading import Event
+        from time import sleep, time
+
+        import numpy as np
+
+        from ..service import ai_pb2
+        from .generator import DonkeyModel
+
+        class BatchModel(object):
+
+            """Store the inputs with a positive second feature."""
+
+            def __init__(self):
+                self.batches = []
+                self.release = Event()
+
+            def predict_on_batch(self, data):
+                self.batches.append(len(data))
+                # The other calls are queued while the first one runs
+                self.release.wait()
+                return data
+
+        model = DonkeyModel(cache_size=0)
+        model._model = BatchModel()
+        model.enable_batching(max_batch=8, max_wait=10.)
+        # A lone call does not wait max_wait
+        model._model.release.set()
+        start = time()
+        self.assertTrue(
+            model.AIPredictOne(ai_pb2.AIInput(inputVector=[0., 1.]), None).store)
+        self.assertLess(time() - start, 5.)
+        self.assertEqual(model._model.batches, [1])
+
+        model._model = BatchModel()
+        inputs = [[0., 1.] if idx % 3 else [1., 0.] for idx in range(8)]
+        with ThreadPoolExecutor(max_workers=len(inputs) + 1) as pool:
+            # The first call keeps the model busy while the others are queued
+            first = pool.submit(model.AIPredictOne, ai_pb2.AIInput(inputVector=[0., 1.]), None)
+            while len(model._model.batches) == 0:
+                sleep(0.01)
+            results = [pool.submit(model.AIPredictOne, ai_pb2.AIInput(inputVector=vector), None)
+                       for vector in inputs]
+            while model._batcher._requests.qsize() < len(inputs):
+                sleep(0.01)
+            model._model.release.set()
+            self.assertTrue(first.result().store)
+            stores = [result.result().store for result in results]
+        model.stop_batching()
+
+        self.assertEqual(stores, [vector[1] == 1. for vector in inputs])
+        self.assertEqual(model._model.batches, [1, 8])
+
+    def test_registry(self):
+        from os import path
+        from tempfile import TemporaryDirectory
+
+        import numpy as np
+
+        from ..service import ai_pb2
+        from .generator import ModelRegistry
+        from .numpy_model import NumpyModel
+
+        class Context(object):
+            def abort(self, code, details):
+                raise Exception(details)
+
+        with TemporaryDirectory() as folder:
+            store_name = path.join(folder, "store.npz")
+            skip_name = path.join(folder, "skip.npz")
+            NumpyModel([(np.zeros((2, 2)), [0., 1.], "softmax")]).save(store_name)
+            NumpyModel([(np.zeros((2, 2)), [1., 0.], "softmax")]).save(skip_name)
+
+            registry = ModelRegistry(max_wait=0.)
+            registry.add("store", store_name)
+            registry.add("skip", skip_name)
+
+            def predict(name):
+                request = ai_pb2.AIInput(inputVector=[0., 1.], model=name)
+                return registry.AIPredictOne(request, Context()).store
+
+            self.assertEqual([predict(""), predict("store"), predict("skip")],
+                             [True, True, False])
+            with self.assertRaises(Exception):
+                predict("lru")
+
+            old_model = registry.get("store")
+            registry.add("store", skip_name)
+            self.assertFalse(predict("store"))
+            # A call that got the swapped model is still served
+            self.assertEqual(
+                old_model.AIPredictOne(ai_pb2.AIInput(inputVector=[0., 1.]), None).store,
+                True)
+            registry.remove("store")
+            self.assertEqual(registry.names, ["skip"])
+            self.assertFalse(predict(""))
+
+
+class TestEvaluatorCaches(unittest.TestCase):
+
+    def test_lru(self):
+        from .evaluator import LRUCache
+        cache = LRUCache(max_size=2)
+        hits = [cache.update(file_) for file_ in ["A", "B", "A", "C", "A", "B"]]
+        self.assertEqual(hits, [False, False, True, False, True, False])
+        self.assertEqual(cache.state['cache'], ["A", "B"])
+        self.assertEqual(cache.size_history.tolist(), [1, 2, 2, 2, 2, 2])
+
+        restored = LRUCache(cache.state, max_size=2)
+        self.assertTrue(restored.update("A"))
+        self.assertFalse(restored.update("C"))
+        self.assertEqual(restored.state['cache'], ["A", "C"])
+        self.assertFalse(restored.update("D", insert=False))
+        self.assertEqual(len(restored), 2)
+
+    def test_fifo(self):
+        from .evaluator import FIFOCache
+        cache = FIFOCache(max_size=2)
+        hits = [cache.update(file_) for file_ in ["A", "B", "B", "C", "B"]]
+        self.assertEqual(hits, [False, False, True, False, False])
+        self.assertEqual(cache.state['cache'], ["C", "B"])
+
+
+class TestHistory(unittest.TestCase):
+
+    def test_spill_and_downsampling(self):
+        from tempfile import TemporaryDirectory
+        from .history import History
+        with TemporaryDirectory() as folder:
+            # 3 columns of 8 bytes: one chunk of 4 rows in memory
+            history = History(['size', 'hit_rate'], every=2, chunk_size=4,
+                              max_memory=96, spill_dir=folder)
+            for idx in range(21):
+                history.append(idx, idx / 2.)
+            self.assertEqual(history.requests, 21)
+            self.assertEqual(len(history), 11)
+            self.assertEqual(history.index.tolist(), list(range(0, 21, 2)))
+            self.assertEqual(history['size'].tolist(), list(range(0, 21, 2)))
+            self.assertEqual(history['hit_rate'][-1], 10.)
+
+            history.extend(size=[30, 31], hit_rate=[1., 2.])
+            self.assertEqual(history.index.tolist()[-2:], [21, 22])
+            self.assertEqual(history['size'].tolist()[-3:], [20, 30, 31])
+            history.close()
+
+        import numpy as np
+        # The records of a single chunk are not copied
+        history = History(['size'], chunk_size=4)
+        history.extend(size=[1., 2., 3., 4.])
+        self.assertTrue(np.shares_memory(history['size'], history['size']))
+        self.assertFalse(history['size'].flags.writeable)
+        history.extend(index=[10], requests=12, size=[5.])
+        self.assertEqual(history.index.tolist(), [0, 1, 2, 3, 10])
+        self.assertEqual(history.requests, 12)
+
+    def test_cache_records(self):
+        from .evaluator import LRUCache
+        cache = LRUCache(max_size=2, history_settings={'every': 2})
+        for file_ in ["A", "B", "A", "C"]:
+            cache.update(file_)
+        self.assertEqual(cache.records.index.tolist(), [0, 2])
+        self.assertEqual(cache.hit_rate_history.tolist(), [0., 1. / 3. * 100.])
+
+        restored = LRUCache(cache.state, max_size=2)
+        self.assertEqual(restored.size_history.tolist(), [1., 2.])
+        self.assertEqual(restored.records.index.tolist(), [0, 2])
+        self.assertEqual(restored.records.requests, 4)
+
+
+class TestEvaluator(unittest.TestCase):
+
+    def test_pipeline(self):
+        from .evaluator import Evaluator
+
+        day = 24 * 60 * 60 * 1000
+        dataset = [
+            {
+                'data': {
+                    'FileName': f"/store/{idx % 7}",
+                    'WrapCPU': 1.,
+                    'StartedRunningTimeStamp': (idx // 10 + 1) * 2 * day
+                },
+                'features': {'type': 'data' if idx % 7 < 3 else 'mc'}
+            }
+            for idx in range(53)
+        ]
+        expected_hits = sum(
+            1 for idx in range(7, 53) if idx % 7 < 3
+        )
+        for num_workers in [0, 2]:
+            evaluator = Evaluator(
+                dataset, _Model(), _SupportTable(),
+                ai_stride=4, num_workers=num_workers, prefetch=2
+            )
+            result = evaluator._compare()
+            self.assertEqual(result['separators'], [0, 10, 20, 30, 40, 50])
+            self.assertEqual(result['cache'].size_history.tolist()[-1], 7)
+            self.assertEqual(result['ai_cache'].size_history.tolist()[-1], 3)
+            self.assertEqual(
+                evaluator._wrap_cpu['ai_cache']['wrap_cpu'][-1],
+                expected_hits + 1
+            )
+
+        evaluator = Evaluator([{'data': {}}], _Model(), _SupportTable(),
+                              num_workers=0)
+        with self.assertRaises(KeyError):
+            evaluator._compare()
+
+
+if __name__ == '__main__':
+    unittest.main()
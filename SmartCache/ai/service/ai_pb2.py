@@ -1,9 +1,7 @@
 # -*- coding: utf-8 -*-
 # Generated by the protocol buffer compiler.  DO NOT EDIT!
 # source: ai.proto
-
-import sys
-_b=sys.version_info[0]<3 and (lambda x:x) or (lambda x:x.encode('latin1'))
+"""Generated protocol buffer code."""
 from google.protobuf import descriptor as _descriptor
 from google.protobuf import message as _message
 from google.protobuf import reflection as _reflection
@@ -19,8 +17,9 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   name='ai.proto',
   package='aiservice',
   syntax='proto3',
-  serialized_options=_b('\n\030io.grpc.cache.ai.serviceB\016CacheAIServiceP\001'),
-  serialized_pb=_b('\n\x08\x61i.proto\x12\taiservice\"\x1e\n\x07\x41IInput\x12\x13\n\x0binputVector\x18\x01 \x03(\x01\" \n\x0fStorePrediction\x12\r\n\x05store\x18\x01 \x01(\x08\x32M\n\tAIService\x12@\n\x0c\x41IPredictOne\x12\x12.aiservice.AIInput\x1a\x1a.aiservice.StorePrediction\"\x00\x42,\n\x18io.grpc.cache.ai.serviceB\x0e\x43\x61\x63heAIServiceP\x01\x62\x06proto3')
+  serialized_options=b'\n\030io.grpc.cache.ai.serviceB\016CacheAIServiceP\001',
+  create_key=_descriptor._internal_create_key,
+  serialized_pb=b'\n\x08\x61i.proto\x12\taiservice\"-\n\x07\x41IInput\x12\x13\n\x0binputVector\x18\x01 \x03(\x01\x12\r\n\x05model\x18\x02 \x01(\t\" \n\x0fStorePrediction\x12\r\n\x05store\x18\x01 \x01(\x08\"G\n\x0c\x41IInputBatch\x12\x14\n\x0cinputVectors\x18\x01 \x03(\x01\x12\x12\n\nvectorSize\x18\x02 \x01(\r\x12\r\n\x05model\x18\x03 \x01(\t\"%\n\x14StorePredictionBatch\x12\r\n\x05store\x18\x01 \x03(\x08\x32\x9b\x01\n\tAIService\x12@\n\x0c\x41IPredictOne\x12\x12.aiservice.AIInput\x1a\x1a.aiservice.StorePrediction\"\x00\x12L\n\x0e\x41IPredictBatch\x12\x17.aiservice.AIInputBatch\x1a\x1f.aiservice.StorePredictionBatch\"\x00\x42,\n\x18io.grpc.cache.ai.serviceB\x0e\x43\x61\x63heAIServiceP\x01\x62\x06proto3'
 )
 
 
@@ -32,6 +31,7 @@ _AIINPUT = _descriptor.Descriptor(
   filename=None,
   file=DESCRIPTOR,
   containing_type=None,
+  create_key=_descriptor._internal_create_key,
   fields=[
     _descriptor.FieldDescriptor(
       name='inputVector', full_name='aiservice.AIInput.inputVector', index=0,
@@ -39,7 +39,14 @@ _AIINPUT = _descriptor.Descriptor(
       has_default_value=False, default_value=[],
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR),
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='model', full_name='aiservice.AIInput.model', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
   ],
   extensions=[
   ],
@@ -53,7 +60,7 @@ _AIINPUT = _descriptor.Descriptor(
   oneofs=[
   ],
   serialized_start=23,
-  serialized_end=53,
+  serialized_end=68,
 )
 
 
@@ -63,6 +70,7 @@ _STOREPREDICTION = _descriptor.Descriptor(
   filename=None,
   file=DESCRIPTOR,
   containing_type=None,
+  create_key=_descriptor._internal_create_key,
   fields=[
     _descriptor.FieldDescriptor(
       name='store', full_name='aiservice.StorePrediction.store', index=0,
@@ -70,7 +78,53 @@ _STOREPREDICTION = _descriptor.Descriptor(
       has_default_value=False, default_value=False,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR),
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=70,
+  serialized_end=102,
+)
+
+
+_AIINPUTBATCH = _descriptor.Descriptor(
+  name='AIInputBatch',
+  full_name='aiservice.AIInputBatch',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='inputVectors', full_name='aiservice.AIInputBatch.inputVectors', index=0,
+      number=1, type=1, cpp_type=5, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='vectorSize', full_name='aiservice.AIInputBatch.vectorSize', index=1,
+      number=2, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='model', full_name='aiservice.AIInputBatch.model', index=2,
+      number=3, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
   ],
   extensions=[
   ],
@@ -83,12 +137,46 @@ _STOREPREDICTION = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=55,
-  serialized_end=87,
+  serialized_start=104,
+  serialized_end=175,
+)
+
+
+_STOREPREDICTIONBATCH = _descriptor.Descriptor(
+  name='StorePredictionBatch',
+  full_name='aiservice.StorePredictionBatch',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='store', full_name='aiservice.StorePredictionBatch.store', index=0,
+      number=1, type=8, cpp_type=7, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=177,
+  serialized_end=214,
 )
 
 DESCRIPTOR.message_types_by_name['AIInput'] = _AIINPUT
 DESCRIPTOR.message_types_by_name['StorePrediction'] = _STOREPREDICTION
+DESCRIPTOR.message_types_by_name['AIInputBatch'] = _AIINPUTBATCH
+DESCRIPTOR.message_types_by_name['StorePredictionBatch'] = _STOREPREDICTIONBATCH
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
 
 AIInput = _reflection.GeneratedProtocolMessageType('AIInput', (_message.Message,), {
@@ -105,6 +193,20 @@ StorePrediction = _reflection.GeneratedProtocolMessageType('StorePrediction', (_
   })
 _sym_db.RegisterMessage(StorePrediction)
 
+AIInputBatch = _reflection.GeneratedProtocolMessageType('AIInputBatch', (_message.Message,), {
+  'DESCRIPTOR' : _AIINPUTBATCH,
+  '__module__' : 'ai_pb2'
+  # @@protoc_insertion_point(class_scope:aiservice.AIInputBatch)
+  })
+_sym_db.RegisterMessage(AIInputBatch)
+
+StorePredictionBatch = _reflection.GeneratedProtocolMessageType('StorePredictionBatch', (_message.Message,), {
+  'DESCRIPTOR' : _STOREPREDICTIONBATCH,
+  '__module__' : 'ai_pb2'
+  # @@protoc_insertion_point(class_scope:aiservice.StorePredictionBatch)
+  })
+_sym_db.RegisterMessage(StorePredictionBatch)
+
 
 DESCRIPTOR._options = None
 
@@ -114,8 +216,9 @@ _AISERVICE = _descriptor.ServiceDescriptor(
   file=DESCRIPTOR,
   index=0,
   serialized_options=None,
-  serialized_start=89,
-  serialized_end=166,
+  create_key=_descriptor._internal_create_key,
+  serialized_start=217,
+  serialized_end=372,
   methods=[
   _descriptor.MethodDescriptor(
     name='AIPredictOne',
@@ -125,6 +228,17 @@ _AISERVICE = _descriptor.ServiceDescriptor(
     input_type=_AIINPUT,
     output_type=_STOREPREDICTION,
     serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
+  _descriptor.MethodDescriptor(
+    name='AIPredictBatch',
+    full_name='aiservice.AIService.AIPredictBatch',
+    index=1,
+    containing_service=None,
+    input_type=_AIINPUTBATCH,
+    output_type=_STOREPREDICTIONBATCH,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
   ),
 ])
 _sym_db.RegisterServiceDescriptor(_AISERVICE)
@@ -19,6 +19,11 @@ class AIServiceStub(object):
         request_serializer=ai__pb2.AIInput.SerializeToString,
         response_deserializer=ai__pb2.StorePrediction.FromString,
         )
+    self.AIPredictBatch = channel.unary_unary(
+        '/aiservice.AIService/AIPredictBatch',
+        request_serializer=ai__pb2.AIInputBatch.SerializeToString,
+        response_deserializer=ai__pb2.StorePredictionBatch.FromString,
+        )
 
 
 class AIServiceServicer(object):
@@ -32,6 +37,13 @@ class AIServiceServicer(object):
     context.set_details('Method not implemented!')
     raise NotImplementedError('Method not implemented!')
 
+  def AIPredictBatch(self, request, context):
+    """Make a prediction for each input vector of the batch
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
 
 def add_AIServiceServicer_to_server(servicer, server):
   rpc_method_handlers = {
@@ -40,6 +52,11 @@ def add_AIServiceServicer_to_server(servicer, server):
           request_deserializer=ai__pb2.AIInput.FromString,
           response_serializer=ai__pb2.StorePrediction.SerializeToString,
       ),
+      'AIPredictBatch': grpc.unary_unary_rpc_method_handler(
+          servicer.AIPredictBatch,
+          request_deserializer=ai__pb2.AIInputBatch.FromString,
+          response_serializer=ai__pb2.StorePredictionBatch.SerializeToString,
+      ),
   }
   generic_handler = grpc.method_handlers_generic_handler(
       'aiservice.AIService', rpc_method_handlers)
@@ -0,0 +1,288 @@
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle
+
+import grpc
+from aiohttp import web
+from google.protobuf import empty_pb2
+
+from das import DAS_COMMAND, das_args, das_env, parse_size, to_lfn
+from pluginProto import pluginProto_pb2, pluginProto_pb2_grpc
+from size_cache import SIZE_DB, SizeCache
+
+
+class ChannelPool(object):
+
+    """Round robin pool of grpc.aio channels to the simulator service.
+
+    A single HTTP/2 connection serializes the streams of all the
+    requests on one socket, with more channels the calls of concurrent
+    requests are spread over several connections.
+    """
+
+    def __init__(self, target: str, size: int = 4):
+        self._channels = [grpc.aio.insecure_channel(target) for _ in range(size)]
+        self._stubs = cycle([
+            pluginProto_pb2_grpc.PluginProtoStub(channel)
+            for channel in self._channels
+        ])
+
+    def stub(self) -> 'pluginProto_pb2_grpc.PluginProtoStub':
+        return next(self._stubs)
+
+    async def close(self):
+        for channel in self._channels:
+            await channel.close()
+
+
+class SizeResolver(object):
+
+    """Get the file sizes from DAS with concurrent dasgoclient processes.
+
+    At most max_lookups processes run at the same time and concurrent
+    requests of the same LFN wait for the same lookup. The size cache
+    calls SQLite, so they run in a worker thread, out of the event loop.
+    """
+
+    def __init__(self, sizes: 'SizeCache', command: str = DAS_COMMAND,
+                 max_lookups: int = 8):
+        self._sizes = sizes
+        self._command = command
+        self._limit = asyncio.Semaphore(max_lookups)
+        self._in_flight = {}
+        # The cache serializes the SQLite calls, one thread is enough
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        # Stat attributes
+        self.lookups: int = 0
+        self.coalesced: int = 0
+
+    async def __lookup(self, file_name: str) -> float:
+        async with self._limit:
+            self.lookups += 1
+            process = await asyncio.create_subprocess_exec(
+                *das_args(file_name, self._command),
+                stdout=asyncio.subprocess.PIPE,
+                env=das_env(),
+            )
+            output, _ = await process.communicate()
+        if process.returncode != 0:
+            raise Exception(
+                f"dasgoclient exited with code {process.returncode} for {file_name}"
+            )
+        size = parse_size(output, file_name)
+        await asyncio.get_event_loop().run_in_executor(
+            self._executor, self._sizes.set, file_name, size
+        )
+        return size
+
+    def __done(self, file_name: str, _):
+        del self._in_flight[file_name]
+
+    async def size(self, file_name: str) -> float:
+        size = await asyncio.get_event_loop().run_in_executor(
+            self._executor, self._sizes.get, file_name
+        )
+        if size is not None:
+            return size
+        lookup = self._in_flight.get(file_name)
+        if lookup is None:
+            lookup = asyncio.ensure_future(self.__lookup(file_name))
+            lookup.add_done_callback(lambda task: self.__done(file_name, task))
+            self._in_flight[file_name] = lookup
+        else:
+            self.coalesced += 1
+        # A cancelled request does not cancel the lookup of the others
+        return await asyncio.shield(lookup)
+
+    def close(self):
+        self._executor.shutdown()
+
+
+class HintBatcher(object):
+
+    """Send the concurrent requests to the simulator in batches.
+
+    Requests are buffered until max_batch of them are waiting or the
+    oldest one waited max_wait seconds, then they are sent with a single
+    ProcessBatch call and each waiting request gets its own hint.
+    """
+
+    def __init__(self, pool: 'ChannelPool', max_batch: int = 64,
+                 max_wait: float = 0.002):
+        self._pool = pool
+        self._max_batch = max_batch
+        self._max_wait = max_wait
+        self._pending = []
+        self._timer = None
+        # Stat attributes
+        self.batches: int = 0
+        self.requests: int = 0
+
+    def __flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        asyncio.ensure_future(self.__send(batch))
+
+    async def __send(self, batch: list):
+        self.batches += 1
+        self.requests += len(batch)
+        try:
+            result = await self._pool.stub().ProcessBatch(
+                pluginProto_pb2.FileRequestBatch(
+                    requests=[file_request for file_request, _ in batch]
+                )
+            )
+        except Exception as err:
+            for _, waiter in batch:
+                if not waiter.done():
+                    waiter.set_exception(err)
+            return
+        for (_, waiter), hint in zip(batch, result.hints):
+            if not waiter.done():
+                waiter.set_result(hint)
+
+    async def hint(self, file_request: 'pluginProto_pb2.FileRequest') -> 'pluginProto_pb2.FileHint':
+        """UpdateStats and GetHint of a request as part of a batch."""
+        waiter = asyncio.get_event_loop().create_future()
+        self._pending.append((file_request, waiter))
+        if len(self._pending) >= self._max_batch:
+            self.__flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_event_loop().call_later(
+                self._max_wait, self.__flush
+            )
+        return await waiter
+
+
+async def resolve(request: 'web.Request') -> 'web.Response':
+    values = dict(request.query)
+    if request.can_read_body:
+        values.update(await request.post())
+    file_name = values.get('lfn', False)
+    file_downloaded = float(values.get('downloaded', 0.))
+    if not file_name:
+        return web.json_response({'error': "lfn argument missing"})
+
+    file_name = to_lfn(file_name)
+    file_size = await request.app['resolver'].size(file_name)
+    # if it is the first time we assign the whole size as
+    # file downloaded info
+    if file_downloaded == 0.:
+        file_downloaded = file_size
+    file_request = pluginProto_pb2.FileRequest(
+        filename=file_name,
+        downloaded=file_downloaded,
+        hit=False,
+    )
+    if request.app['batcher'] is not None:
+        result = await request.app['batcher'].hint(file_request)
+    else:
+        stub = request.app['pool'].stub()
+        await stub.UpdateStats(file_request)
+        result = await stub.GetHint(pluginProto_pb2.FileHint(
+            filename=file_name,
+            store=False,
+        ))
+    return web.json_response({'store': result.store, 'filename': result.filename})
+
+
+async def stats(request: 'web.Request') -> 'web.Response':
+    resolver = request.app['resolver']
+    batcher = request.app['batcher']
+    return web.json_response({
+        'das_lookups': resolver.lookups,
+        'das_coalesced': resolver.coalesced,
+        'size_cache': request.app['size_cache'].stats,
+        'batches': batcher.batches if batcher is not None else 0,
+        'batched_requests': batcher.requests if batcher is not None else 0,
+    })
+
+
+def create_app(sim_target: str = "localhost:4243", channels: int = 4,
+               das_command: str = DAS_COMMAND, max_lookups: int = 8,
+               size_cache: 'SizeCache' = None,
+               max_batch: int = 1, max_wait: float = 0.002,
+               reset_history: bool = True) -> 'web.Application':
+    """Create the asyncio version of the plugin service.
+
+    Args:
+        sim_target (str): address of the simulator gRPC service
+        channels (int): number of gRPC channels of the pool
+        das_command (str): the dasgoclient executable (and arguments)
+        max_lookups (int): max number of concurrent DAS lookups
+        size_cache (SizeCache): the cache of the resolved sizes, a
+            memory only one if not specified
+        max_batch (int): max number of requests sent to the simulator
+            with a single call, 1 to disable the batching
+        max_wait (float): max time in seconds a request waits for
+            the others of its batch
+        reset_history (bool): reset the simulator history at start
+
+    Returns:
+        aiohttp.web.Application: the service application
+    """
+    app = web.Application()
+    app['size_cache'] = size_cache if size_cache is not None else SizeCache(None)
+
+    async def on_startup(app):
+        app['pool'] = ChannelPool(sim_target, channels)
+        app['resolver'] = SizeResolver(app['size_cache'], das_command, max_lookups)
+        app['batcher'] = HintBatcher(
+            app['pool'], max_batch, max_wait
+        ) if max_batch > 1 else None
+        if reset_history:
+            await app['pool'].stub().ResetHistory(empty_pb2.Empty())
+
+    async def on_cleanup(app):
+        await app['pool'].close()
+        app['resolver'].close()
+        app['size_cache'].close()
+
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    app.router.add_route('*', "/resolve", resolve)
+    app.router.add_get("/stats", stats)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        "aioapp", description="Asyncio plugin service"
+    )
+    parser.add_argument('--port', type=int, default=4242,
+                        help='Service port [DEFAULT: 4242]')
+    parser.add_argument('--sim-target', type=str, default="localhost:4243",
+                        help='Simulator gRPC service [DEFAULT: localhost:4243]')
+    parser.add_argument('--channels', type=int, default=4,
+                        help='Number of gRPC channels [DEFAULT: 4]')
+    parser.add_argument('--das-command', type=str, default=DAS_COMMAND,
+                        help=f'dasgoclient command [DEFAULT: {DAS_COMMAND}]')
+    parser.add_argument('--max-lookups', type=int, default=8,
+                        help='Max concurrent DAS lookups [DEFAULT: 8]')
+    parser.add_argument('--size-db', type=str, default=SIZE_DB,
+                        help=f'File size cache database [DEFAULT: {SIZE_DB}]')
+    parser.add_argument('--size-entries', type=int, default=100000,
+                        help='Max file sizes in memory [DEFAULT: 100000]')
+    parser.add_argument('--size-ttl', type=float, default=None,
+                        help='Max age of a cached size in seconds [DEFAULT: None]')
+    parser.add_argument('--max-batch', type=int, default=1,
+                        help='Max requests of a simulator call, 1 to disable batching [DEFAULT: 1]')
+    parser.add_argument('--max-wait', type=float, default=2.,
+                        help='Max wait of a request for its batch in ms [DEFAULT: 2.]')
+    args = parser.parse_args()
+
+    print(f"[Server start on port {args.port}]")
+    web.run_app(
+        create_app(args.sim_target, args.channels,
+                   args.das_command, args.max_lookups,
+                   SizeCache(args.size_db, args.size_entries, args.size_ttl),
+                   args.max_batch, args.max_wait / 1000.),
+        host='0.0.0.0', port=args.port, print=None
+    )
+
+
+if __name__ == '__main__':
+    main()
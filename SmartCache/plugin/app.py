@@ -1,13 +1,14 @@
 import json
 import math
-from os import path
 from subprocess import check_output
 
 import grpc
 from flask import Flask, jsonify, request
 from google.protobuf import empty_pb2 as google_dot_protobuf_dot_empty__pb2
 
+from das import das_args, das_env, getSize, to_lfn
 from pluginProto import pluginProto_pb2, pluginProto_pb2_grpc
+from size_cache import SizeCache
 
 app = Flask(__name__)
 channel = grpc.insecure_channel("localhost:4243")
@@ -15,16 +16,7 @@ stubSimService = pluginProto_pb2_grpc.SimServiceStub(channel)
 stubSimService.ResetHistory(google_dot_protobuf_dot_empty__pb2.Empty())
 
 
-def getSize(dasgresult: list, filename: str):
-    for result in dasgresult:
-        if 'das' in result and 'file' in result:
-            for file_ in result['file']:
-                if file_['name'] == filename:
-                    return file_['size']
-    return 1024. ** 2
-
-
-SIZES = {}
+SIZES = SizeCache()
 
 
 @app.route("/resolve", methods=['GET', 'POST'])
@@ -38,20 +30,18 @@ def resolve():
         'downloaded': file_downloaded
     }, indent=2, sort_keys=True))
     if file_name:
-        file_name = f"/store{file_name.split('//store')[1].split('.root')[0]}.root"
+        file_name = to_lfn(file_name)
         print(f"[Request][Filename: {file_name}]")
         # TO DO
         # - Calculate the % of file read
-        if file_name not in SIZES:
+        file_size = SIZES.get(file_name)
+        if file_size is None:
             dasgocresult = json.loads(
-                check_output(
-                    f'X509_USER_PROXY={path.abspath("./proxy")} ./dasgoclient_linux -query="file={file_name}" -json',
-                    shell=True
-                )
+                check_output(das_args(file_name), env=das_env())
             )
             print(json.dumps(dasgocresult, indent=2))
-            SIZES[file_name] = getSize(dasgocresult, file_name)
-        file_size = SIZES[file_name]
+            file_size = getSize(dasgocresult, file_name)
+            SIZES.set(file_name, file_size)
         print(f"[Request][Size: {file_size}]")
         # if it is the first time we assign the whole size as
         # file downloaded info
@@ -0,0 +1,36 @@
+import json
+import os
+import shlex
+from os import path
+
+DAS_COMMAND = "./dasgoclient_linux"
+# Size used when DAS does not know the file
+DEFAULT_SIZE = 1024. ** 2
+
+
+def getSize(dasgresult: list, filename: str):
+    for result in dasgresult:
+        if 'das' in result and 'file' in result:
+            for file_ in result['file']:
+                if file_['name'] == filename:
+                    return file_['size']
+    return DEFAULT_SIZE
+
+
+def to_lfn(file_name: str) -> str:
+    """Get the LFN of a file from the name in the XRootD request."""
+    return f"/store{file_name.split('//store')[1].split('.root')[0]}.root"
+
+
+def das_args(file_name: str, command: str = DAS_COMMAND) -> list:
+    """Arguments of the dasgoclient query for the size of a file."""
+    return shlex.split(command) + [f"-query=file={file_name}", "-json"]
+
+
+def das_env() -> dict:
+    """Environment of the dasgoclient process."""
+    return dict(os.environ, X509_USER_PROXY=path.abspath("./proxy"))
+
+
+def parse_size(output: bytes, file_name: str):
+    return getSize(json.loads(output), file_name)
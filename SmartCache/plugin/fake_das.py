@@ -0,0 +1,29 @@
+"""Fake dasgoclient for the plugin load test.
+
+Answers a file query with a made up size after a delay, it uses only
+the standard library so the process starts as fast as possible.
+
+Usage:
+    python fake_das.py [--delay seconds] -query=file=<lfn> -json
+"""
+import argparse
+import json
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser("fake_das")
+    parser.add_argument('-query', type=str)
+    parser.add_argument('-json', action='store_true')
+    parser.add_argument('--delay', type=float, default=0.1)
+    args = parser.parse_args()
+    file_name = args.query.split("file=", 1)[1]
+    time.sleep(args.delay)
+    print(json.dumps([{
+        'das': {'expire': 0},
+        'file': [{'name': file_name, 'size': 1024 ** 3 + len(file_name)}],
+    }]))
+
+
+if __name__ == '__main__':
+    main()
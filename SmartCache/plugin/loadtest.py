@@ -0,0 +1,206 @@
+"""Load test of the asyncio plugin service.
+
+The service runs against a fake dasgoclient (fake_das.py) and a fake
+simulator gRPC service, both with a configurable latency, so the
+numbers measure only the plugin.
+
+Usage:
+    python loadtest.py run [--requests N] [--concurrency N] ...
+    python loadtest.py bench [--max-batch N] [--max-wait ms] ...
+"""
+import argparse
+import asyncio
+import shlex
+import sys
+import time
+from os import path
+from random import Random
+
+import aiohttp
+import grpc
+import numpy as np
+from aiohttp import web
+from google.protobuf import empty_pb2
+
+from aioapp import create_app
+from pluginProto import pluginProto_pb2, pluginProto_pb2_grpc
+from size_cache import SizeCache
+
+# Concurrency levels of the bench target
+BENCH_CONCURRENCY = [1, 8, 32, 128, 256]
+
+
+class FakeSimService(pluginProto_pb2_grpc.PluginProtoServicer):
+
+    """Simulator service that answers after a fixed latency."""
+
+    def __init__(self, latency: float = 0.001):
+        self._latency = latency
+        self.calls: int = 0
+
+    async def GetHint(self, request, context):
+        self.calls += 1
+        await asyncio.sleep(self._latency)
+        return pluginProto_pb2.FileHint(filename=request.filename, store=True)
+
+    async def UpdateStats(self, request, context):
+        self.calls += 1
+        await asyncio.sleep(self._latency)
+        return empty_pb2.Empty()
+
+    async def ResetHistory(self, request, context):
+        return empty_pb2.Empty()
+
+    async def ProcessBatch(self, request, context):
+        self.calls += 1
+        await asyncio.sleep(self._latency)
+        return pluginProto_pb2.FileHintBatch(hints=[
+            pluginProto_pb2.FileHint(filename=file_request.filename, store=True)
+            for file_request in request.requests
+        ])
+
+
+async def client(session: 'aiohttp.ClientSession', url: str,
+                 lfns: list, latencies: list):
+    for lfn in lfns:
+        start = time.perf_counter()
+        async with session.get(url, params={'lfn': lfn}) as response:
+            result = await response.json()
+        latencies.append(time.perf_counter() - start)
+        assert result['store'], result
+
+
+async def load(args, concurrency: int, max_batch: int,
+               size_cache: 'SizeCache' = None) -> dict:
+    """Run the service and send it args.requests requests.
+
+    Returns:
+        dict: the request latencies in ms, the throughput and the
+            service and fake simulator stats
+    """
+    sim_service = FakeSimService(args.sim_latency)
+    server = grpc.aio.server()
+    pluginProto_pb2_grpc.add_PluginProtoServicer_to_server(sim_service, server)
+    sim_port = server.add_insecure_port("localhost:0")
+    await server.start()
+
+    das_command = " ".join([
+        shlex.quote(sys.executable),
+        shlex.quote(path.join(path.dirname(path.abspath(__file__)), "fake_das.py")),
+        "--delay", str(args.das_delay),
+    ])
+    app = create_app(f"localhost:{sim_port}", args.channels,
+                     das_command, args.max_lookups,
+                     size_cache, max_batch, args.max_wait / 1000.)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "localhost", args.port)
+    await site.start()
+
+    # Zipf-like popularity: some files are requested by many clients
+    # at the same time, as the files of the same dataset
+    rnd = Random(42)
+    files = [f"root://xrootd//store/data/file_{idx}.root" for idx in range(args.files)]
+    weights = [1. / (idx + 1) for idx in range(args.files)]
+    requests = rnd.choices(files, weights, k=args.requests)
+
+    latencies = []
+    url = f"http://localhost:{args.port}/resolve"
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    start = time.perf_counter()
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await asyncio.gather(*[
+            client(session, url, requests[idx::concurrency], latencies)
+            for idx in range(concurrency)
+        ])
+        elapsed = time.perf_counter() - start
+        async with session.get(f"http://localhost:{args.port}/stats") as response:
+            stats = await response.json()
+
+    await runner.cleanup()
+    await server.stop(None)
+
+    stats['sim_calls'] = sim_service.calls
+    stats['distinct_files'] = len(set(requests))
+    stats['latencies'] = np.array(latencies) * 1000.
+    stats['throughput'] = len(latencies) / elapsed
+    return stats
+
+
+async def run(args):
+    stats = await load(args, args.concurrency, args.max_batch, SizeCache(args.size_db))
+    latencies = stats['latencies']
+    print(f"[Requests: {len(latencies)}][Concurrency: {args.concurrency}]"
+          f"[Distinct files: {stats['distinct_files']}]")
+    print(f"[Throughput: {stats['throughput']:.1f} req/s]"
+          f"[Latency p50: {np.percentile(latencies, 50):.2f} ms]"
+          f"[p99: {np.percentile(latencies, 99):.2f} ms]")
+    print(f"[DAS lookups: {stats['das_lookups']}]"
+          f"[Coalesced: {stats['das_coalesced']}]"
+          f"[Sim calls: {stats['sim_calls']}]"
+          f"[Batches: {stats['batches']}]")
+    print(f"[Size cache: {stats['size_cache']}]")
+
+
+async def bench(args):
+    """Latency against throughput with and without batching.
+
+    The file sizes are resolved before the measures, so only the
+    simulator calls are compared.
+    """
+    sizes = SizeCache(None)
+    for idx in range(args.files):
+        sizes.set(f"/store/data/file_{idx}.root", 1024. ** 3)
+    print("batch,concurrency,throughput,p50_ms,p99_ms,sim_calls")
+    for max_batch in [1, args.max_batch]:
+        for concurrency in BENCH_CONCURRENCY:
+            stats = await load(args, concurrency, max_batch, sizes)
+            print(",".join(str(value) for value in [
+                max_batch, concurrency,
+                round(stats['throughput'], 1),
+                round(np.percentile(stats['latencies'], 50), 2),
+                round(np.percentile(stats['latencies'], 99), 2),
+                stats['sim_calls'],
+            ]))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        "loadtest", description="Load test of the asyncio plugin service"
+    )
+    parser.add_argument('target', choices=['run', 'bench'])
+    parser.add_argument('--requests', type=int, default=5000,
+                        help='Number of requests [DEFAULT: 5000]')
+    parser.add_argument('--concurrency', type=int, default=64,
+                        help='Number of concurrent clients [DEFAULT: 64]')
+    parser.add_argument('--files', type=int, default=500,
+                        help='Number of distinct files [DEFAULT: 500]')
+    parser.add_argument('--das-delay', type=float, default=0.1,
+                        help='Fake DAS lookup time in seconds [DEFAULT: 0.1]')
+    parser.add_argument('--sim-latency', type=float, default=0.001,
+                        help='Fake simulator call time in seconds [DEFAULT: 0.001]')
+    parser.add_argument('--channels', type=int, default=4,
+                        help='Number of gRPC channels [DEFAULT: 4]')
+    parser.add_argument('--max-lookups', type=int, default=8,
+                        help='Max concurrent DAS lookups [DEFAULT: 8]')
+    parser.add_argument('--max-batch', type=int, default=1,
+                        help='Max requests of a simulator call, the bench '
+                        'target compares it with 1 [DEFAULT: 1, 64 for bench]')
+    parser.add_argument('--max-wait', type=float, default=2.,
+                        help='Max wait of a request for its batch in ms [DEFAULT: 2.]')
+    parser.add_argument('--size-db', type=str, default=None,
+                        help='File size cache database, memory only if not specified')
+    parser.add_argument('--port', type=int, default=4280,
+                        help='Service port [DEFAULT: 4280]')
+    args = parser.parse_args()
+
+    if args.target == "run":
+        asyncio.run(run(args))
+    elif args.target == "bench":
+        if args.max_batch <= 1:
+            args.max_batch = 64
+        asyncio.run(bench(args))
+
+
+if __name__ == '__main__':
+    main()
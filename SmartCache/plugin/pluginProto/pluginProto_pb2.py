@@ -1,9 +1,7 @@
 # -*- coding: utf-8 -*-
 # Generated by the protocol buffer compiler.  DO NOT EDIT!
 # source: pluginProto/pluginProto.proto
-
-import sys
-_b=sys.version_info[0]<3 and (lambda x:x) or (lambda x:x.encode('latin1'))
+"""Generated protocol buffer code."""
 from google.protobuf import descriptor as _descriptor
 from google.protobuf import message as _message
 from google.protobuf import reflection as _reflection
@@ -20,8 +18,9 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   name='pluginProto/pluginProto.proto',
   package='pluginproto',
   syntax='proto3',
-  serialized_options=_b('\n\034io.grpc.cache.plugin.serviceB\013PluginProtoP\001'),
-  serialized_pb=_b('\n\x1dpluginProto/pluginProto.proto\x12\x0bpluginproto\x1a\x1bgoogle/protobuf/empty.proto\"@\n\x0b\x46ileRequest\x12\x10\n\x08\x66ilename\x18\x01 \x01(\t\x12\x12\n\ndownloaded\x18\x02 \x01(\x02\x12\x0b\n\x03hit\x18\x03 \x01(\x08\"+\n\x08\x46ileHint\x12\x10\n\x08\x66ilename\x18\x01 \x01(\t\x12\r\n\x05store\x18\x02 \x01(\x08\x32\xcd\x01\n\x0bPluginProto\x12\x39\n\x07GetHint\x12\x15.pluginproto.FileHint\x1a\x15.pluginproto.FileHint\"\x00\x12\x41\n\x0bUpdateStats\x12\x18.pluginproto.FileRequest\x1a\x16.google.protobuf.Empty\"\x00\x12@\n\x0cResetHistory\x12\x16.google.protobuf.Empty\x1a\x16.google.protobuf.Empty\"\x00\x42-\n\x1cio.grpc.cache.plugin.serviceB\x0bPluginProtoP\x01\x62\x06proto3')
+  serialized_options=b'\n\034io.grpc.cache.plugin.serviceB\013PluginProtoP\001',
+  create_key=_descriptor._internal_create_key,
+  serialized_pb=b'\n\x1dpluginProto/pluginProto.proto\x12\x0bpluginproto\x1a\x1bgoogle/protobuf/empty.proto\"@\n\x0b\x46ileRequest\x12\x10\n\x08\x66ilename\x18\x01 \x01(\t\x12\x12\n\ndownloaded\x18\x02 \x01(\x02\x12\x0b\n\x03hit\x18\x03 \x01(\x08\"+\n\x08\x46ileHint\x12\x10\n\x08\x66ilename\x18\x01 \x01(\t\x12\r\n\x05store\x18\x02 \x01(\x08\">\n\x10\x46ileRequestBatch\x12*\n\x08requests\x18\x01 \x03(\x0b\x32\x18.pluginproto.FileRequest\"5\n\rFileHintBatch\x12$\n\x05hints\x18\x01 \x03(\x0b\x32\x15.pluginproto.FileHint2\x9a\x02\n\x0bPluginProto\x12\x39\n\x07GetHint\x12\x15.pluginproto.FileHint\x1a\x15.pluginproto.FileHint\"\x00\x12\x41\n\x0bUpdateStats\x12\x18.pluginproto.FileRequest\x1a\x16.google.protobuf.Empty\"\x00\x12@\n\x0cResetHistory\x12\x16.google.protobuf.Empty\x1a\x16.google.protobuf.Empty\"\x00\x12K\n\x0cProcessBatch\x12\x1d.pluginproto.FileRequestBatch\x1a\x1a.pluginproto.FileHintBatch\"\x00\x42-\n\x1cio.grpc.cache.plugin.serviceB\x0bPluginProtoP\x01\x62\x06proto3'
   ,
   dependencies=[google_dot_protobuf_dot_empty__pb2.DESCRIPTOR,])
 
@@ -34,28 +33,29 @@ _FILEREQUEST = _descriptor.Descriptor(
   filename=None,
   file=DESCRIPTOR,
   containing_type=None,
+  create_key=_descriptor._internal_create_key,
   fields=[
     _descriptor.FieldDescriptor(
       name='filename', full_name='pluginproto.FileRequest.filename', index=0,
       number=1, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=_b("").decode('utf-8'),
+      has_default_value=False, default_value=b"".decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR),
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
     _descriptor.FieldDescriptor(
       name='downloaded', full_name='pluginproto.FileRequest.downloaded', index=1,
       number=2, type=2, cpp_type=6, label=1,
       has_default_value=False, default_value=float(0),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR),
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
     _descriptor.FieldDescriptor(
       name='hit', full_name='pluginproto.FileRequest.hit', index=2,
       number=3, type=8, cpp_type=7, label=1,
       has_default_value=False, default_value=False,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR),
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
   ],
   extensions=[
   ],
@@ -79,21 +79,22 @@ _FILEHINT = _descriptor.Descriptor(
   filename=None,
   file=DESCRIPTOR,
   containing_type=None,
+  create_key=_descriptor._internal_create_key,
   fields=[
     _descriptor.FieldDescriptor(
       name='filename', full_name='pluginproto.FileHint.filename', index=0,
       number=1, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=_b("").decode('utf-8'),
+      has_default_value=False, default_value=b"".decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR),
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
     _descriptor.FieldDescriptor(
       name='store', full_name='pluginproto.FileHint.store', index=1,
       number=2, type=8, cpp_type=7, label=1,
       has_default_value=False, default_value=False,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR),
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
   ],
   extensions=[
   ],
@@ -110,8 +111,76 @@ _FILEHINT = _descriptor.Descriptor(
   serialized_end=184,
 )
 
+
+_FILEREQUESTBATCH = _descriptor.Descriptor(
+  name='FileRequestBatch',
+  full_name='pluginproto.FileRequestBatch',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='requests', full_name='pluginproto.FileRequestBatch.requests', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=186,
+  serialized_end=248,
+)
+
+
+_FILEHINTBATCH = _descriptor.Descriptor(
+  name='FileHintBatch',
+  full_name='pluginproto.FileHintBatch',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='hints', full_name='pluginproto.FileHintBatch.hints', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=250,
+  serialized_end=303,
+)
+
+_FILEREQUESTBATCH.fields_by_name['requests'].message_type = _FILEREQUEST
+_FILEHINTBATCH.fields_by_name['hints'].message_type = _FILEHINT
 DESCRIPTOR.message_types_by_name['FileRequest'] = _FILEREQUEST
 DESCRIPTOR.message_types_by_name['FileHint'] = _FILEHINT
+DESCRIPTOR.message_types_by_name['FileRequestBatch'] = _FILEREQUESTBATCH
+DESCRIPTOR.message_types_by_name['FileHintBatch'] = _FILEHINTBATCH
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
 
 FileRequest = _reflection.GeneratedProtocolMessageType('FileRequest', (_message.Message,), {
@@ -128,6 +197,20 @@ FileHint = _reflection.GeneratedProtocolMessageType('FileHint', (_message.Messag
   })
 _sym_db.RegisterMessage(FileHint)
 
+FileRequestBatch = _reflection.GeneratedProtocolMessageType('FileRequestBatch', (_message.Message,), {
+  'DESCRIPTOR' : _FILEREQUESTBATCH,
+  '__module__' : 'pluginProto.pluginProto_pb2'
+  # @@protoc_insertion_point(class_scope:pluginproto.FileRequestBatch)
+  })
+_sym_db.RegisterMessage(FileRequestBatch)
+
+FileHintBatch = _reflection.GeneratedProtocolMessageType('FileHintBatch', (_message.Message,), {
+  'DESCRIPTOR' : _FILEHINTBATCH,
+  '__module__' : 'pluginProto.pluginProto_pb2'
+  # @@protoc_insertion_point(class_scope:pluginproto.FileHintBatch)
+  })
+_sym_db.RegisterMessage(FileHintBatch)
+
 
 DESCRIPTOR._options = None
 
@@ -137,8 +220,9 @@ _PLUGINPROTO = _descriptor.ServiceDescriptor(
   file=DESCRIPTOR,
   index=0,
   serialized_options=None,
-  serialized_start=187,
-  serialized_end=392,
+  create_key=_descriptor._internal_create_key,
+  serialized_start=306,
+  serialized_end=588,
   methods=[
   _descriptor.MethodDescriptor(
     name='GetHint',
@@ -148,6 +232,7 @@ _PLUGINPROTO = _descriptor.ServiceDescriptor(
     input_type=_FILEHINT,
     output_type=_FILEHINT,
     serialized_options=None,
+    create_key=_descriptor._internal_create_key,
   ),
   _descriptor.MethodDescriptor(
     name='UpdateStats',
@@ -157,6 +242,7 @@ _PLUGINPROTO = _descriptor.ServiceDescriptor(
     input_type=_FILEREQUEST,
     output_type=google_dot_protobuf_dot_empty__pb2._EMPTY,
     serialized_options=None,
+    create_key=_descriptor._internal_create_key,
   ),
   _descriptor.MethodDescriptor(
     name='ResetHistory',
@@ -166,6 +252,17 @@ _PLUGINPROTO = _descriptor.ServiceDescriptor(
     input_type=google_dot_protobuf_dot_empty__pb2._EMPTY,
     output_type=google_dot_protobuf_dot_empty__pb2._EMPTY,
     serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
+  _descriptor.MethodDescriptor(
+    name='ProcessBatch',
+    full_name='pluginproto.PluginProto.ProcessBatch',
+    index=3,
+    containing_service=None,
+    input_type=_FILEREQUESTBATCH,
+    output_type=_FILEHINTBATCH,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
   ),
 ])
 _sym_db.RegisterServiceDescriptor(_PLUGINPROTO)
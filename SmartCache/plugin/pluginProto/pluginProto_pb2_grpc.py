@@ -30,6 +30,11 @@ class PluginProtoStub(object):
         request_serializer=google_dot_protobuf_dot_empty__pb2.Empty.SerializeToString,
         response_deserializer=google_dot_protobuf_dot_empty__pb2.Empty.FromString,
         )
+    self.ProcessBatch = channel.unary_unary(
+        '/pluginproto.PluginProto/ProcessBatch',
+        request_serializer=pluginProto_dot_pluginProto__pb2.FileRequestBatch.SerializeToString,
+        response_deserializer=pluginProto_dot_pluginProto__pb2.FileHintBatch.FromString,
+        )
 
 
 class PluginProtoServicer(object):
@@ -57,6 +62,13 @@ class PluginProtoServicer(object):
     context.set_details('Method not implemented!')
     raise NotImplementedError('Method not implemented!')
 
+  def ProcessBatch(self, request, context):
+    """UpdateStats and GetHint of each request, in order
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
 
 def add_PluginProtoServicer_to_server(servicer, server):
   rpc_method_handlers = {
@@ -75,6 +87,11 @@ def add_PluginProtoServicer_to_server(servicer, server):
           request_deserializer=google_dot_protobuf_dot_empty__pb2.Empty.FromString,
           response_serializer=google_dot_protobuf_dot_empty__pb2.Empty.SerializeToString,
       ),
+      'ProcessBatch': grpc.unary_unary_rpc_method_handler(
+          servicer.ProcessBatch,
+          request_deserializer=pluginProto_dot_pluginProto__pb2.FileRequestBatch.FromString,
+          response_serializer=pluginProto_dot_pluginProto__pb2.FileHintBatch.SerializeToString,
+      ),
   }
   generic_handler = grpc.method_handlers_generic_handler(
       'pluginproto.PluginProto', rpc_method_handlers)
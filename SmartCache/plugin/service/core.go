@@ -17,6 +17,7 @@ type XCachePlugin interface {
 	GetHint(context.Context, *pb.FileHint) (*pb.FileHint, error)
 	UpdateStats(context.Context, *pb.FileRequest) (*empty.Empty, error)
 	ResetHistory(context.Context, *empty.Empty) (*empty.Empty, error)
+	ProcessBatch(context.Context, *pb.FileRequestBatch) (*pb.FileHintBatch, error)
 }
 
 // PluginServiceServer is the server API for PluginService curService.
@@ -69,6 +70,22 @@ func (curService PluginServiceServer) ResetHistory(ctx context.Context, _ *empty
 	return &empty.Empty{}, nil
 }
 
+// ProcessBatch function for plugin service: UpdateStats and GetHint of each request, in order
+func (curService PluginServiceServer) ProcessBatch(ctx context.Context, batch *pb.FileRequestBatch) (*pb.FileHintBatch, error) {
+	hints := make([]*pb.FileHint, 0, len(batch.Requests))
+	for _, curFile := range batch.Requests {
+		if _, err := curService.UpdateStats(ctx, curFile); err != nil {
+			return nil, err
+		}
+		hint, err := curService.GetHint(ctx, &pb.FileHint{Filename: curFile.Filename})
+		if err != nil {
+			return nil, err
+		}
+		hints = append(hints, hint)
+	}
+	return &pb.FileHintBatch{Hints: hints}, nil
+}
+
 func updateWeightSingleFile(curStats *weightedFileStats, functionType FunctionType, exp float32, curTime time.Time, curWg *sync.WaitGroup) {
 	curStats.updateWeight(
 		functionType,
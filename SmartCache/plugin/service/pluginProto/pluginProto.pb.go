@@ -127,33 +127,118 @@ func (m *FileHint) GetStore() bool {
 	return false
 }
 
+type FileRequestBatch struct {
+	Requests             []*FileRequest `protobuf:"bytes,1,rep,name=requests,proto3" json:"requests,omitempty"`
+	XXX_NoUnkeyedLiteral struct{}       `json:"-"`
+	XXX_unrecognized     []byte         `json:"-"`
+	XXX_sizecache        int32          `json:"-"`
+}
+
+func (m *FileRequestBatch) Reset()         { *m = FileRequestBatch{} }
+func (m *FileRequestBatch) String() string { return proto.CompactTextString(m) }
+func (*FileRequestBatch) ProtoMessage()    {}
+func (*FileRequestBatch) Descriptor() ([]byte, []int) {
+	return fileDescriptor_47ff7801c14f782c, []int{2}
+}
+
+func (m *FileRequestBatch) XXX_Unmarshal(b []byte) error {
+	return xxx_messageInfo_FileRequestBatch.Unmarshal(m, b)
+}
+func (m *FileRequestBatch) XXX_Marshal(b []byte, deterministic bool) ([]byte, error) {
+	return xxx_messageInfo_FileRequestBatch.Marshal(b, m, deterministic)
+}
+func (m *FileRequestBatch) XXX_Merge(src proto.Message) {
+	xxx_messageInfo_FileRequestBatch.Merge(m, src)
+}
+func (m *FileRequestBatch) XXX_Size() int {
+	return xxx_messageInfo_FileRequestBatch.Size(m)
+}
+func (m *FileRequestBatch) XXX_DiscardUnknown() {
+	xxx_messageInfo_FileRequestBatch.DiscardUnknown(m)
+}
+
+var xxx_messageInfo_FileRequestBatch proto.InternalMessageInfo
+
+func (m *FileRequestBatch) GetRequests() []*FileRequest {
+	if m != nil {
+		return m.Requests
+	}
+	return nil
+}
+
+type FileHintBatch struct {
+	Hints                []*FileHint `protobuf:"bytes,1,rep,name=hints,proto3" json:"hints,omitempty"`
+	XXX_NoUnkeyedLiteral struct{}    `json:"-"`
+	XXX_unrecognized     []byte      `json:"-"`
+	XXX_sizecache        int32       `json:"-"`
+}
+
+func (m *FileHintBatch) Reset()         { *m = FileHintBatch{} }
+func (m *FileHintBatch) String() string { return proto.CompactTextString(m) }
+func (*FileHintBatch) ProtoMessage()    {}
+func (*FileHintBatch) Descriptor() ([]byte, []int) {
+	return fileDescriptor_47ff7801c14f782c, []int{3}
+}
+
+func (m *FileHintBatch) XXX_Unmarshal(b []byte) error {
+	return xxx_messageInfo_FileHintBatch.Unmarshal(m, b)
+}
+func (m *FileHintBatch) XXX_Marshal(b []byte, deterministic bool) ([]byte, error) {
+	return xxx_messageInfo_FileHintBatch.Marshal(b, m, deterministic)
+}
+func (m *FileHintBatch) XXX_Merge(src proto.Message) {
+	xxx_messageInfo_FileHintBatch.Merge(m, src)
+}
+func (m *FileHintBatch) XXX_Size() int {
+	return xxx_messageInfo_FileHintBatch.Size(m)
+}
+func (m *FileHintBatch) XXX_DiscardUnknown() {
+	xxx_messageInfo_FileHintBatch.DiscardUnknown(m)
+}
+
+var xxx_messageInfo_FileHintBatch proto.InternalMessageInfo
+
+func (m *FileHintBatch) GetHints() []*FileHint {
+	if m != nil {
+		return m.Hints
+	}
+	return nil
+}
+
 func init() {
 	proto.RegisterType((*FileRequest)(nil), "pluginproto.FileRequest")
 	proto.RegisterType((*FileHint)(nil), "pluginproto.FileHint")
+	proto.RegisterType((*FileRequestBatch)(nil), "pluginproto.FileRequestBatch")
+	proto.RegisterType((*FileHintBatch)(nil), "pluginproto.FileHintBatch")
 }
 
 func init() { proto.RegisterFile("pluginProto/pluginProto.proto", fileDescriptor_47ff7801c14f782c) }
 
 var fileDescriptor_47ff7801c14f782c = []byte{
-	// 287 bytes of a gzipped FileDescriptorProto
-	0x1f, 0x8b, 0x08, 0x00, 0x00, 0x00, 0x00, 0x00, 0x02, 0xff, 0x7c, 0x90, 0x4d, 0x4b, 0xf4, 0x30,
-	0x14, 0x85, 0x27, 0x33, 0xbc, 0xaf, 0xf5, 0xd6, 0x85, 0x04, 0x95, 0x52, 0x3f, 0x28, 0x5d, 0x75,
-	0x63, 0x0a, 0xba, 0x12, 0x5c, 0xe8, 0x80, 0x1f, 0xcb, 0x12, 0x71, 0xe5, 0xaa, 0xd3, 0xde, 0xe9,
-	0x04, 0x3a, 0x4d, 0x6c, 0x52, 0x65, 0x7e, 0xa4, 0xff, 0x49, 0x92, 0xce, 0x68, 0x41, 0xc7, 0x4d,
-	0xc8, 0xb9, 0x1c, 0x9e, 0x7b, 0xcf, 0x81, 0x53, 0x55, 0x77, 0x95, 0x68, 0xb2, 0x56, 0x1a, 0x99,
-	0x0e, 0xfe, 0x4c, 0xd9, 0x97, 0xfa, 0xfd, 0xc8, 0x89, 0xf0, 0xb8, 0x92, 0xb2, 0xaa, 0x31, 0x75,
-	0x6a, 0xd6, 0xcd, 0x53, 0x5c, 0x2a, 0xb3, 0xea, 0x9d, 0xf1, 0x0b, 0xf8, 0xf7, 0xa2, 0x46, 0x8e,
-	0xaf, 0x1d, 0x6a, 0x43, 0x43, 0xf0, 0xe6, 0xa2, 0xc6, 0x26, 0x5f, 0x62, 0x40, 0x22, 0x92, 0xec,
-	0xf2, 0x2f, 0x4d, 0xcf, 0x00, 0x4a, 0xf9, 0xde, 0xd4, 0x32, 0x2f, 0xb1, 0x0c, 0xc6, 0x11, 0x49,
-	0xc6, 0x7c, 0x30, 0xa1, 0xfb, 0x30, 0x59, 0x08, 0x13, 0x4c, 0x22, 0x92, 0x78, 0xdc, 0x7e, 0xe3,
-	0x6b, 0xf0, 0x2c, 0xfc, 0x51, 0x34, 0x7f, 0x93, 0x0f, 0xe0, 0x9f, 0x36, 0xb2, 0x45, 0x07, 0xf5,
-	0x78, 0x2f, 0x2e, 0x3e, 0x08, 0xf8, 0xd9, 0x77, 0x34, 0x7a, 0x05, 0x3b, 0x0f, 0x68, 0x1c, 0xec,
-	0x90, 0x0d, 0x02, 0xb2, 0xcd, 0x8e, 0xf0, 0xf7, 0x71, 0x3c, 0xa2, 0xb7, 0xe0, 0x3f, 0xab, 0x32,
-	0x37, 0xf8, 0x64, 0x72, 0xa3, 0x69, 0xf0, 0xc3, 0xb7, 0xce, 0x1f, 0x1e, 0xb1, 0xbe, 0x2c, 0xb6,
-	0x29, 0x8b, 0xdd, 0xd9, 0xb2, 0xe2, 0x11, 0xbd, 0x81, 0x3d, 0x8e, 0xda, 0xee, 0xb7, 0xd7, 0xad,
-	0xe8, 0x16, 0xe7, 0x76, 0xc2, 0xf4, 0x1c, 0x4e, 0x84, 0x64, 0x55, 0xab, 0x0a, 0x56, 0xe4, 0xc5,
-	0x02, 0xd7, 0x47, 0x30, 0x8d, 0xed, 0x9b, 0x28, 0x70, 0x3a, 0x0c, 0x9b, 0x91, 0xd9, 0x7f, 0x07,
-	0xb8, 0xfc, 0x0c, 0x00, 0x00, 0xff, 0xff, 0x9a, 0xc1, 0xd9, 0x1c, 0xeb, 0x01, 0x00, 0x00,
+	// 353 bytes of a gzipped FileDescriptorProto
+	0x1f, 0x8b, 0x08, 0x00, 0x00, 0x00, 0x00, 0x00, 0x02, 0xff, 0x7c, 0x91, 0x41, 0x4b, 0xc3, 0x40,
+	0x10, 0x85, 0x9b, 0x96, 0x6a, 0x9c, 0x54, 0x28, 0x8b, 0x4a, 0x88, 0x56, 0x42, 0x4e, 0x01, 0x71,
+	0x0b, 0xd5, 0x8b, 0xd0, 0x83, 0x16, 0xd4, 0x82, 0x97, 0xb0, 0xe2, 0xc9, 0x53, 0x9a, 0x4c, 0x93,
+	0x85, 0x34, 0x1b, 0xb3, 0x5b, 0xa5, 0x7f, 0xc5, 0x5f, 0x2b, 0xc9, 0xda, 0x1a, 0xb0, 0xed, 0x25,
+	0xec, 0x9b, 0x7d, 0xfb, 0x65, 0xe6, 0x0d, 0x0c, 0x8a, 0x6c, 0x99, 0xf0, 0x3c, 0x28, 0x85, 0x12,
+	0xc3, 0xc6, 0x99, 0x16, 0xd5, 0x97, 0x58, 0xba, 0x54, 0x0b, 0xe7, 0x3c, 0x11, 0x22, 0xc9, 0x70,
+	0x58, 0xab, 0xd9, 0x72, 0x3e, 0xc4, 0x45, 0xa1, 0x56, 0xda, 0xe9, 0xbd, 0x83, 0xf5, 0xc4, 0x33,
+	0x64, 0xf8, 0xb1, 0x44, 0xa9, 0x88, 0x03, 0xe6, 0x9c, 0x67, 0x98, 0x87, 0x0b, 0xb4, 0x0d, 0xd7,
+	0xf0, 0x8f, 0xd8, 0x46, 0x93, 0x4b, 0x80, 0x58, 0x7c, 0xe5, 0x99, 0x08, 0x63, 0x8c, 0xed, 0xb6,
+	0x6b, 0xf8, 0x6d, 0xd6, 0xa8, 0x90, 0x3e, 0x74, 0x52, 0xae, 0xec, 0x8e, 0x6b, 0xf8, 0x26, 0xab,
+	0x8e, 0xde, 0x18, 0xcc, 0x0a, 0x3e, 0xe5, 0xf9, 0x7e, 0xf2, 0x09, 0x74, 0xa5, 0x12, 0x25, 0xd6,
+	0x50, 0x93, 0x69, 0xe1, 0x4d, 0xa1, 0xdf, 0x68, 0x6d, 0x12, 0xaa, 0x28, 0x25, 0xb7, 0x60, 0x96,
+	0x5a, 0x4b, 0xdb, 0x70, 0x3b, 0xbe, 0x35, 0xb2, 0x69, 0x63, 0x56, 0xda, 0x78, 0xc0, 0x36, 0x4e,
+	0x6f, 0x0c, 0xc7, 0xeb, 0x3e, 0x34, 0xe6, 0x0a, 0xba, 0x29, 0xcf, 0x37, 0x8c, 0xd3, 0x7f, 0x8c,
+	0xca, 0xca, 0xb4, 0x67, 0xf4, 0xdd, 0x06, 0x2b, 0xf8, 0x8b, 0x98, 0xdc, 0xc1, 0xe1, 0x33, 0xaa,
+	0x7a, 0xa8, 0xed, 0x0f, 0x9d, 0xed, 0x65, 0xaf, 0x45, 0x1e, 0xc0, 0x7a, 0x2b, 0xe2, 0x50, 0xe1,
+	0xab, 0x0a, 0x95, 0x24, 0x3b, 0x7b, 0x77, 0xce, 0xa8, 0x5e, 0x1a, 0x5d, 0x2f, 0x8d, 0x3e, 0x56,
+	0x4b, 0xf3, 0x5a, 0xe4, 0x1e, 0x7a, 0x0c, 0x65, 0xf5, 0xff, 0x2a, 0xa5, 0x15, 0xd9, 0xe1, 0xdc,
+	0x43, 0x78, 0x81, 0x5e, 0x50, 0x8a, 0x08, 0xa5, 0xd4, 0x61, 0x0c, 0x76, 0x75, 0x51, 0x5f, 0x3b,
+	0xce, 0xd6, 0x61, 0xea, 0x3b, 0xaf, 0x35, 0xb9, 0x86, 0x0b, 0x2e, 0x68, 0x52, 0x16, 0x11, 0x8d,
+	0xc2, 0x28, 0xc5, 0x5f, 0x33, 0x95, 0x58, 0x7e, 0xf2, 0x08, 0x27, 0xcd, 0xe4, 0x02, 0x63, 0x76,
+	0x50, 0x53, 0x6e, 0x7e, 0x02, 0x00, 0x00, 0xff, 0xff, 0x96, 0xe3, 0xb8, 0x80, 0xc0, 0x02, 0x00,
+	0x00,
 }
 
 // Reference imports to suppress errors if they are not otherwise used.
@@ -171,6 +256,8 @@ type PluginProtoClient interface {
 	GetHint(ctx context.Context, in *FileHint, opts ...grpc.CallOption) (*FileHint, error)
 	UpdateStats(ctx context.Context, in *FileRequest, opts ...grpc.CallOption) (*empty.Empty, error)
 	ResetHistory(ctx context.Context, in *empty.Empty, opts ...grpc.CallOption) (*empty.Empty, error)
+	// UpdateStats and GetHint of each request, in order
+	ProcessBatch(ctx context.Context, in *FileRequestBatch, opts ...grpc.CallOption) (*FileHintBatch, error)
 }
 
 type pluginProtoClient struct {
@@ -208,11 +295,22 @@ func (c *pluginProtoClient) ResetHistory(ctx context.Context, in *empty.Empty, o
 	return out, nil
 }
 
+func (c *pluginProtoClient) ProcessBatch(ctx context.Context, in *FileRequestBatch, opts ...grpc.CallOption) (*FileHintBatch, error) {
+	out := new(FileHintBatch)
+	err := c.cc.Invoke(ctx, "/pluginproto.PluginProto/ProcessBatch", in, out, opts...)
+	if err != nil {
+		return nil, err
+	}
+	return out, nil
+}
+
 // PluginProtoServer is the server API for PluginProto service.
 type PluginProtoServer interface {
 	GetHint(context.Context, *FileHint) (*FileHint, error)
 	UpdateStats(context.Context, *FileRequest) (*empty.Empty, error)
 	ResetHistory(context.Context, *empty.Empty) (*empty.Empty, error)
+	// UpdateStats and GetHint of each request, in order
+	ProcessBatch(context.Context, *FileRequestBatch) (*FileHintBatch, error)
 }
 
 // UnimplementedPluginProtoServer can be embedded to have forward compatible implementations.
@@ -228,6 +326,9 @@ func (*UnimplementedPluginProtoServer) UpdateStats(ctx context.Context, req *Fil
 func (*UnimplementedPluginProtoServer) ResetHistory(ctx context.Context, req *empty.Empty) (*empty.Empty, error) {
 	return nil, status.Errorf(codes.Unimplemented, "method ResetHistory not implemented")
 }
+func (*UnimplementedPluginProtoServer) ProcessBatch(ctx context.Context, req *FileRequestBatch) (*FileHintBatch, error) {
+	return nil, status.Errorf(codes.Unimplemented, "method ProcessBatch not implemented")
+}
 
 func RegisterPluginProtoServer(s *grpc.Server, srv PluginProtoServer) {
 	s.RegisterService(&_PluginProto_serviceDesc, srv)
@@ -287,6 +388,24 @@ func _PluginProto_ResetHistory_Handler(srv interface{}, ctx context.Context, dec
 	return interceptor(ctx, in, info, handler)
 }
 
+func _PluginProto_ProcessBatch_Handler(srv interface{}, ctx context.Context, dec func(interface{}) error, interceptor grpc.UnaryServerInterceptor) (interface{}, error) {
+	in := new(FileRequestBatch)
+	if err := dec(in); err != nil {
+		return nil, err
+	}
+	if interceptor == nil {
+		return srv.(PluginProtoServer).ProcessBatch(ctx, in)
+	}
+	info := &grpc.UnaryServerInfo{
+		Server:     srv,
+		FullMethod: "/pluginproto.PluginProto/ProcessBatch",
+	}
+	handler := func(ctx context.Context, req interface{}) (interface{}, error) {
+		return srv.(PluginProtoServer).ProcessBatch(ctx, req.(*FileRequestBatch))
+	}
+	return interceptor(ctx, in, info, handler)
+}
+
 var _PluginProto_serviceDesc = grpc.ServiceDesc{
 	ServiceName: "pluginproto.PluginProto",
 	HandlerType: (*PluginProtoServer)(nil),
@@ -303,6 +422,10 @@ var _PluginProto_serviceDesc = grpc.ServiceDesc{
 			MethodName: "ResetHistory",
 			Handler:    _PluginProto_ResetHistory_Handler,
 		},
+		{
+			MethodName: "ProcessBatch",
+			Handler:    _PluginProto_ProcessBatch_Handler,
+		},
 	},
 	Streams:  []grpc.StreamDesc{},
 	Metadata: "pluginProto/pluginProto.proto",
@@ -0,0 +1,190 @@
+"""Persistent cache of the file sizes resolved by the plugin.
+
+Usage:
+    python size_cache.py warmup --db cache.db --file-size-db-path /foo/bar/file_sizes_folder
+    python size_cache.py stats --db cache.db
+"""
+import argparse
+import sqlite3
+import time
+from collections import OrderedDict
+from os import path
+from threading import Lock
+
+SIZE_DB = "./file_sizes_cache.db"
+# Databases of the file sizes used also by scripts/DataAnalysis/statistics.py
+SOURCE_DBS = ["mc_file_sizes.db", "data_file_sizes.db"]
+
+
+class SizeCache(object):
+
+    """Two tier cache of file sizes.
+
+    The memory tier is an LRU of at most max_entries LFNs, the disk
+    tier is a SQLite table that survives the restarts of the service.
+    If a ttl is specified, entries older than ttl seconds are misses in
+    both tiers.
+    """
+
+    def __init__(self, db_path: str = SIZE_DB, max_entries: int = 100000,
+                 ttl: float = None):
+        """Init function of the size cache.
+
+        Args:
+            db_path (str): the SQLite file of the disk tier, None to use
+                only the memory tier
+            max_entries (int): max number of LFNs in memory
+            ttl (float): max age of the entries in seconds
+
+        Returns:
+            SizeCache: the instance of this object
+
+        """
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._memory = OrderedDict()
+        self._lock = Lock()
+        self._conn = None
+        if db_path is not None:
+            # The Flask service can call the cache from several threads
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sizes "
+                "(lfn TEXT PRIMARY KEY, size REAL, updated REAL)"
+            )
+            self._conn.commit()
+        # Stat attributes
+        self._memory_hits: int = 0
+        self._disk_hits: int = 0
+        self._misses: int = 0
+
+    def __expired(self, updated: float) -> bool:
+        return self._ttl is not None and time.time() - updated > self._ttl
+
+    def __remember(self, lfn: str, size: float, updated: float):
+        self._memory[lfn] = (size, updated)
+        self._memory.move_to_end(lfn)
+        if len(self._memory) > self._max_entries:
+            self._memory.popitem(last=False)
+
+    def __contains__(self, lfn: str) -> bool:
+        return self.get(lfn) is not None
+
+    def get(self, lfn: str) -> float:
+        """Get the size of a file, None if it is not cached."""
+        with self._lock:
+            entry = self._memory.get(lfn)
+            if entry is not None and not self.__expired(entry[1]):
+                self._memory.move_to_end(lfn)
+                self._memory_hits += 1
+                return entry[0]
+            if self._conn is not None:
+                entry = self._conn.execute(
+                    "SELECT size, updated FROM sizes WHERE lfn = ?", (lfn,)
+                ).fetchone()
+                if entry is not None and not self.__expired(entry[1]):
+                    self.__remember(lfn, *entry)
+                    self._disk_hits += 1
+                    return entry[0]
+            self._misses += 1
+            return None
+
+    def set(self, lfn: str, size: float):
+        with self._lock:
+            updated = time.time()
+            self.__remember(lfn, size, updated)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sizes VALUES (?, ?, ?)",
+                    (lfn, size, updated)
+                )
+                self._conn.commit()
+
+    def warm_up(self, file_size_db_path: str) -> int:
+        """Bulk load the sizes of the file size databases.
+
+        Args:
+            file_size_db_path (str): the folder with mc_file_sizes.db and
+                data_file_sizes.db (file_sizes tables)
+
+        Returns:
+            int: number of loaded sizes
+        """
+        if self._conn is None:
+            raise Exception("Warm up needs a disk tier...")
+        loaded = 0
+        with self._lock:
+            for db_name in SOURCE_DBS:
+                source = path.join(file_size_db_path, db_name)
+                if not path.isfile(source):
+                    continue
+                self._conn.execute("ATTACH DATABASE ? AS source", (source,))
+                try:
+                    # The LFN and the size are the first two columns, as
+                    # in scripts/DataAnalysis/statistics.py
+                    lfn_col, size_col = [
+                        column[1] for column in self._conn.execute(
+                            "PRAGMA source.table_info(file_sizes)"
+                        ).fetchall()[:2]
+                    ]
+                    loaded += self._conn.execute(
+                        "INSERT OR REPLACE INTO sizes "
+                        f'SELECT "{lfn_col}", "{size_col}", ? FROM source.file_sizes',
+                        (time.time(),)
+                    ).rowcount
+                    self._conn.commit()
+                finally:
+                    self._conn.execute("DETACH DATABASE source")
+        return loaded
+
+    @property
+    def stats(self) -> dict:
+        requests = self._memory_hits + self._disk_hits + self._misses
+        return {
+            'memory_hits': self._memory_hits,
+            'disk_hits': self._disk_hits,
+            'misses': self._misses,
+            'hit_rate': (self._memory_hits + self._disk_hits) / max(requests, 1),
+            'memory_entries': len(self._memory),
+        }
+
+    def __len__(self):
+        if self._conn is not None:
+            return self._conn.execute("SELECT Count(*) FROM sizes").fetchone()[0]
+        return len(self._memory)
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __del__(self):
+        """Close SQLite connection."""
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        "size_cache", description="Manage the plugin file size cache"
+    )
+    parser.add_argument('command', choices=['warmup', 'stats'])
+    parser.add_argument('--file-size-db-path', type=str, default=None,
+                        help='Folder with mc_file_sizes.db and data_file_sizes.db')
+    parser.add_argument('--db', type=str, default=SIZE_DB,
+                        help=f'Size cache database [DEFAULT: {SIZE_DB}]')
+    args = parser.parse_args()
+
+    cache = SizeCache(args.db)
+    if args.command == "warmup":
+        if args.file_size_db_path is None:
+            parser.error("warmup needs the file size db folder")
+        start = time.time()
+        loaded = cache.warm_up(args.file_size_db_path)
+        print(f"[Loaded {loaded} sizes in {time.time() - start:.2f}s]")
+    print(f"[Cached sizes: {len(cache)}]")
+    cache.close()
+
+
+if __name__ == '__main__':
+    main()
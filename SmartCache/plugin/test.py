@@ -0,0 +1,74 @@
+import unittest
+
+
+class TestSizeCache(unittest.TestCase):
+
+    def test_memory_tier(self):
+        from unittest import mock
+        from size_cache import SizeCache
+        cache = SizeCache(None, max_entries=2, ttl=10.)
+        with mock.patch("size_cache.time.time", return_value=100.):
+            cache.set("/store/a", 1.)
+            cache.set("/store/b", 2.)
+            self.assertEqual(cache.get("/store/a"), 1.)
+            # B is the least recently used
+            cache.set("/store/c", 3.)
+            self.assertIsNone(cache.get("/store/b"))
+            self.assertEqual(cache.get("/store/c"), 3.)
+        with mock.patch("size_cache.time.time", return_value=111.):
+            self.assertIsNone(cache.get("/store/a"))
+        self.assertEqual(
+            (cache.stats['memory_hits'], cache.stats['misses']), (2, 2))
+        self.assertEqual(len(cache), 2)
+
+    def test_disk_tier(self):
+        from os import path
+        from tempfile import TemporaryDirectory
+        from unittest import mock
+        from size_cache import SizeCache
+        with TemporaryDirectory() as folder:
+            db_path = path.join(folder, "sizes.db")
+            cache = SizeCache(db_path, max_entries=1, ttl=10.)
+            with mock.patch("size_cache.time.time", return_value=100.):
+                cache.set("/store/a", 1.)
+                cache.set("/store/b", 2.)
+                # A is only on disk
+                self.assertEqual(cache.get("/store/a"), 1.)
+            self.assertEqual(cache.stats['disk_hits'], 1)
+            cache.close()
+
+            restored = SizeCache(db_path, ttl=10.)
+            with mock.patch("size_cache.time.time", return_value=105.):
+                self.assertEqual(restored.get("/store/b"), 2.)
+            with mock.patch("size_cache.time.time", return_value=111.):
+                self.assertIsNone(restored.get("/store/a"))
+            self.assertEqual(len(restored), 2)
+            restored.close()
+
+    def test_warm_up(self):
+        import sqlite3
+        from os import path
+        from tempfile import TemporaryDirectory
+        from size_cache import SizeCache
+        with TemporaryDirectory() as folder:
+            # Same layout of the DBS file size tables
+            source = sqlite3.connect(path.join(folder, "mc_file_sizes.db"))
+            source.execute(
+                "CREATE TABLE file_sizes (f_logical_file_name TEXT, f_file_size INTEGER)")
+            source.executemany("INSERT INTO file_sizes VALUES (?, ?)",
+                               [("/store/mc/a", 10), ("/store/mc/b", 20)])
+            source.commit()
+            source.close()
+
+            cache = SizeCache(path.join(folder, "sizes.db"))
+            self.assertEqual(cache.warm_up(folder), 2)
+            self.assertEqual(cache.get("/store/mc/b"), 20)
+            self.assertEqual(len(cache), 2)
+            cache.close()
+
+            with self.assertRaises(Exception):
+                SizeCache(None).warm_up(folder)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+from os import path
+from tempfile import TemporaryDirectory
+
+import numpy as np
+import pandas as pd
+
+from .cache import PriorityCache, intern_trace
+
+# Reverse time of a file that is not requested again
+NEVER = -1
+
+
+def next_uses(file_ids, last_seen: dict = None, start: int = 0) -> np.ndarray:
+    """Compute the next use of each request with a reverse pass.
+
+    Times are counted backward from the end of the trace (reverse
+    time), so a smaller value means a farther next use and the trace
+    can be processed one chunk at a time, from the last one.
+
+    Args:
+        file_ids (numpy.ndarray): the requested file ids
+        last_seen (dict): file id -> reverse time of its first request
+            in the chunks already processed (updated in place)
+        start (int): reverse time of the last request of the chunk
+
+    Returns:
+        numpy.ndarray: the reverse time of the next request of the
+            same file, NEVER if there is not
+    """
+    if last_seen is None:
+        last_seen = {}
+    result = np.empty(len(file_ids), dtype=np.int64)
+    for cur_time, (idx, file_id) in enumerate(
+        zip(range(len(file_ids) - 1, -1, -1), reversed(file_ids.tolist())), start
+    ):
+        result[idx] = last_seen.get(file_id, NEVER)
+        last_seen[file_id] = cur_time
+    return result
+
+
+class Belady(PriorityCache):
+
+    """Offline optimal (OPT) cache approximation for variable file sizes.
+
+    The file requested farthest in the future is evicted first. A file
+    is not stored if it is not requested again or if room can be made
+    only evicting files requested before it (greedy size-aware
+    Belady). Each request needs the reverse time of its next use,
+    see next_uses.
+    """
+
+    def get(self, filename: str, size: float, next_use: int) -> bool:
+        """Request a file to the cache.
+
+        Args:
+            size (float): the file size in MB
+            next_use (int): the reverse time of the next request of
+                the file (see next_uses)
+        """
+        return super(Belady, self).get(filename, size, next_use)
+
+    def replay(self, filenames, sizes=None, next_use=None) -> dict:
+        """Request a whole sequence of files to the cache.
+
+        Args:
+            filenames (numpy.ndarray, pandas.DataFrame): the requested
+                filenames or a DataFrame with the Filename and Size columns
+            sizes (numpy.ndarray): the file sizes in MB
+            next_use (numpy.ndarray): the next use of each request, if
+                not specified the sequence is considered the whole trace
+
+        Returns:
+            dict: per-request hit flags and cumulative counters
+        """
+        if next_use is None:
+            next_use = next_uses(intern_trace(filenames, sizes)[0])
+        return super(Belady, self).replay(filenames, sizes, next_use)
+
+    def priority(self, row: int, next_use: int) -> float:
+        return next_use
+
+    def admit(self, row: int, size: float, next_use: int) -> bool:
+        if next_use == NEVER:
+            return False
+        # The files to evict must be requested after the new one
+        return all(victim_use <= next_use for victim_use, _, _ in self._victims(size))
+
+
+def upper_bounds(day_files: list, capacities: list,
+                 job_success_only: bool = True) -> dict:
+    """Offline optimal hit rate and read on hit of daily csv files.
+
+    The files are read once in reverse day order to compute the next
+    uses, then each capacity is simulated from the interned arrays
+    saved in a temporary folder, so the memory used is bounded by the
+    number of distinct files and the size of a single day.
+
+    Args:
+        day_files (list): the csv (or csv.gz) files in day order
+        capacities (list): the cache sizes to evaluate in MB
+        job_success_only (bool): use only the requests of successful jobs
+
+    Returns:
+        dict: arrays with the 'capacity', the 'hit_rate' and the
+            'read_on_hit' (fraction of the read data served by hits)
+    """
+    columns = {'Filename', 'Size', 'JobSuccess'}
+    results = {
+        'capacity': np.asarray(capacities, dtype=np.float64),
+        'hit_rate': np.zeros(len(capacities)),
+        'read_on_hit': np.zeros(len(capacities)),
+    }
+
+    with TemporaryDirectory() as tmp_dir:
+        file_ids = {}
+        last_seen = {}
+        start = 0
+        for day, day_file in reversed(list(enumerate(day_files))):
+            df = pd.read_csv(day_file, usecols=lambda column: column in columns)
+            if job_success_only and 'JobSuccess' in df.columns:
+                df = df[df.JobSuccess.astype(bool)]
+            ids = np.fromiter(
+                (file_ids.setdefault(filename, len(file_ids))
+                 for filename in df.Filename.tolist()),
+                dtype=np.int64, count=len(df.index)
+            )
+            np.savez(
+                path.join(tmp_dir, f"{day}.npz"),
+                ids=ids,
+                sizes=df.Size.to_numpy(dtype=np.float64) / 1024**2,
+                next_use=next_uses(ids, last_seen, start),
+            )
+            start += len(ids)
+        del file_ids, last_seen
+
+        for idx, capacity in enumerate(capacities):
+            cache = Belady(capacity)
+            read_on_hit = 0.0
+            for day in range(len(day_files)):
+                with np.load(path.join(tmp_dir, f"{day}.npz")) as chunk:
+                    sizes = chunk['sizes']
+                    result = cache.replay(chunk['ids'], sizes, chunk['next_use'])
+                    read_on_hit += float(sizes[result['hit']].sum())
+            results['hit_rate'][idx] = cache.hit_rate()
+            results['read_on_hit'][idx] = read_on_hit / max(cache._read_data, 1.)
+
+    return results
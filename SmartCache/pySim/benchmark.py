@@ -0,0 +1,141 @@
+import tracemalloc
+from random import randrange, seed
+from sys import argv
+from time import perf_counter
+
+import numpy as np
+
+from .cache import LRU, Stats
+
+RESIDENT_FILES = [10**3, 10**4, 10**5, 10**6, 10**7]
+NUM_REQUESTS = 10**6
+FILE_SIZE = 1.0
+
+
+def lru_throughput(num_files: int, num_requests: int = NUM_REQUESTS,
+                   hit_ratio: float = 0.5) -> float:
+    """Measure the LRU request rate with a given number of resident files.
+
+    The cache is filled with exactly num_files files of the same size,
+    then a mix of requests on recently inserted files (mostly hits) and on new
+    files (misses, each one causing an eviction) is measured.
+
+    Args:
+        num_files (int): number of files resident in the cache
+        num_requests (int): number of requests to measure
+        hit_ratio (float): fraction of requests that are hits
+
+    Returns:
+        float: requests per second
+    """
+    seed(42)
+    cache = LRU(num_files * FILE_SIZE)
+    for idx in range(num_files):
+        cache.get(f"/store/file_{idx}", FILE_SIZE)
+
+    next_file = num_files
+    hit_threshold = int(hit_ratio * 100)
+    requests = []
+    for _ in range(num_requests):
+        if randrange(100) < hit_threshold:
+            requests.append(f"/store/file_{randrange(next_file - num_files, next_file)}")
+        else:
+            requests.append(f"/store/file_{next_file}")
+            next_file += 1
+
+    start = perf_counter()
+    for filename in requests:
+        cache.get(filename, FILE_SIZE)
+    return num_requests / (perf_counter() - start)
+
+
+def bench_lru(resident_files: list = RESIDENT_FILES,
+              num_requests: int = NUM_REQUESTS):
+    print(f"{'resident files':>16} {'requests/s':>14}")
+    for num_files in resident_files:
+        rate = lru_throughput(num_files, num_requests)
+        print(f"{num_files:>16} {rate:>14.0f}")
+
+
+def bench_replay(num_requests: int = NUM_REQUESTS, num_files: int = 10**5):
+    """Compare a get loop with a replay of the same request sequence."""
+    rng = np.random.default_rng(42)
+    filenames = np.array([
+        f"/store/file_{idx}" for idx in rng.integers(0, num_files, num_requests)
+    ])
+    sizes = rng.uniform(100., 4000., num_requests)
+    max_size = sizes.mean() * num_files / 10.
+
+    cache = LRU(max_size)
+    start = perf_counter()
+    for filename, size in zip(filenames, sizes):
+        cache.get(filename, size)
+    get_time = perf_counter() - start
+
+    cache = LRU(max_size)
+    start = perf_counter()
+    cache.replay(filenames, sizes)
+    replay_time = perf_counter() - start
+
+    print(f"{'mode':>8} {'requests/s':>14}")
+    print(f"{'get':>8} {num_requests / get_time:>14.0f}")
+    print(f"{'replay':>8} {num_requests / replay_time:>14.0f}")
+
+
+class _ObjectFileStats(object):
+
+    """Previous per-object stats layout, kept as memory reference."""
+
+    def __init__(self, size: float):
+        self._size: float = size
+        self._hit: int = 0
+        self._miss: int = 0
+
+
+def _object_stats(filenames: list) -> dict:
+    stats = {}
+    for filename in filenames:
+        stats[filename] = _ObjectFileStats(1.0)
+    return stats
+
+
+def _columnar_stats(filenames: list) -> 'Stats':
+    stats = Stats()
+    for filename in filenames:
+        stats.index_or_set(filename, 1.0)
+    return stats
+
+
+def bench_stats_memory(num_files: int = 10**6):
+    """Compare the memory used by the stats of num_files distinct files.
+
+    The filenames are allocated before the measure, so only the stats
+    layout is taken into account.
+    """
+    filenames = [f"/store/file_{idx}" for idx in range(num_files)]
+
+    print(f"{'layout':>10} {'MB':>10} {'bytes/file':>12}")
+    for name, function in [('object', _object_stats), ('columnar', _columnar_stats)]:
+        tracemalloc.start()
+        stats = function(filenames)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del stats
+        print(f"{name:>10} {peak / 1024**2:>10.1f} {peak / num_files:>12.1f}")
+
+
+if __name__ == "__main__":
+    if len(argv) >= 2 and argv[1] == "lru":
+        if len(argv) > 2:
+            bench_lru([int(elm) for elm in argv[2:]])
+        else:
+            bench_lru()
+    elif len(argv) >= 2 and argv[1] == "replay":
+        bench_replay()
+    elif len(argv) >= 2 and argv[1] == "memory":
+        if len(argv) > 2:
+            bench_stats_memory(int(argv[2]))
+        else:
+            bench_stats_memory()
+    else:
+        print("Usage: python -m SmartCache.pySim.benchmark target[lru, replay, memory] [num_files ...]")
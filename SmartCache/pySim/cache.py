@@ -1,50 +1,212 @@
+import json
+from collections import OrderedDict
+from heapq import heapify, heappop, heappush
+from os import makedirs, path
+
+import numpy as np
+import pandas as pd
+
+
+def intern_trace(filenames, sizes=None) -> tuple:
+    """Intern the filenames of a trace to integer ids.
+
+    Args:
+        filenames (numpy.ndarray, pandas.DataFrame): the requested
+            filenames or a DataFrame (as returned by the Probe loaders)
+            with the Filename and Size columns, Size in bytes
+        sizes (numpy.ndarray): the file sizes in MB
+
+    Returns:
+        tuple: (ids, names, sizes) where names[ids[idx]] is the filename
+            of the request idx and sizes are float64 values in MB
+    """
+    if isinstance(filenames, pd.DataFrame):
+        sizes = filenames.Size.to_numpy(dtype=np.float64) / 1024**2
+        filenames = filenames.Filename.to_numpy()
+    assert sizes is not None, "You have to specify the file sizes..."
+
+    ids, names = pd.factorize(np.asarray(filenames))
+    if (ids < 0).any():
+        raise Exception("The trace has missing filenames (None or NaN)...")
+    return ids, names, np.asarray(sizes, dtype=np.float64)
+
+
 class FileStats(object):
 
-    def __init__(self, size: float):
-        self._size: float = size
-        self._hit: int = 0
-        self._miss: int = 0
+    """View on the stats of a single file stored in a Stats table."""
+
+    __slots__ = ('_stats', '_idx')
+
+    def __init__(self, stats: 'Stats', idx: int):
+        self._stats: 'Stats' = stats
+        self._idx: int = idx
 
     def update(self, size: float, hit: bool = False):
-        self._size = size
-        if hit:
-            self._hit += 1
-        else:
-            self._miss += 1
+        self._stats.update(self._idx, size, hit)
 
     @property
     def tot_requests(self):
-        return self._hit + self._miss
+        return self.hit + self.miss
 
     @property
     def hit(self):
-        return self._hit
+        return int(self._stats._hits[self._idx])
 
     @property
     def miss(self):
-        return self._miss
+        return int(self._stats._misses[self._idx])
 
     @property
     def size(self):
-        return self._size
+        return float(self._stats._sizes[self._idx])
 
 
 class Stats(object):
 
-    def __init__(self):
-        self._files = {}
+    """Columnar store of the file stats.
+
+    Each file is mapped to a row index and its size, hits and misses
+    are stored in growable NumPy arrays instead of one object per file.
+    Single rows are accessed through memoryviews of the arrays, that
+    read and write plain Python scalars.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._index = {}
+        self._sizes = np.zeros(capacity, dtype=np.float64)
+        self._hits = np.zeros(capacity, dtype=np.int64)
+        self._misses = np.zeros(capacity, dtype=np.int64)
+        self.__views()
+
+    def __views(self):
+        self._size_view = memoryview(self._sizes)
+        self._hit_view = memoryview(self._hits)
+        self._miss_view = memoryview(self._misses)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, filename: str) -> bool:
+        return filename in self._index
+
+    def __grow(self):
+        capacity = 2 * len(self._sizes)
+        for name in ['_sizes', '_hits', '_misses']:
+            column = getattr(self, name)
+            new_column = np.zeros(capacity, dtype=column.dtype)
+            new_column[:len(column)] = column
+            setattr(self, name, new_column)
+        self.__views()
+
+    def index_or_set(self, filename: str, size: float) -> int:
+        idx = self._index.get(filename)
+        if idx is None:
+            idx = len(self._index)
+            if idx == len(self._sizes):
+                self.__grow()
+            self._index[filename] = idx
+            self._size_view[idx] = size
+        return idx
 
     def get_or_set(self, filename: str, size: float) -> 'FileStats':
-        stats = None
-        if filename not in self._files:
-            stats = FileStats(size)
-            self._files[filename] = stats
+        return FileStats(self, self.index_or_set(filename, size))
+
+    def intern(self, filenames: list, sizes: list) -> 'np.ndarray':
+        """Get the rows of distinct filenames, adding the new ones."""
+        return np.fromiter(
+            (self.index_or_set(filename, size) for filename, size in zip(filenames, sizes)),
+            dtype=np.int64, count=len(filenames)
+        )
+
+    def update(self, idx: int, size: float, hit: bool = False):
+        self._size_view[idx] = size
+        if hit:
+            self._hit_view[idx] += 1
+        else:
+            self._miss_view[idx] += 1
+
+    def update_many(self, rows: 'np.ndarray', sizes: 'np.ndarray', hits: 'np.ndarray'):
+        """Update the stats of a sequence of requests at once."""
+        num_files = len(self._index)
+        self._hits[:num_files] += np.bincount(rows[hits], minlength=num_files)
+        self._misses[:num_files] += np.bincount(rows[~hits], minlength=num_files)
+        # The size of the last request of each file
+        _, last = np.unique(rows[::-1], return_index=True)
+        last = len(rows) - 1 - last
+        self._sizes[rows[last]] = sizes[last]
+
+    def size(self, idx: int) -> float:
+        return self._size_view[idx]
+
+    def requests(self, idx: int) -> int:
+        return self._hit_view[idx] + self._miss_view[idx]
+
+    @property
+    def names(self) -> list:
+        """The filenames in row order."""
+        return list(self._index)
+
+    def save(self, folder: str):
+        """Write the stats columns and the filename table in a folder.
+
+        Columns are stored as .npy files. Filenames are stored as an
+        int64 .npy file if they are all integers, otherwise as the
+        UTF-8 bytes of all the names (names_data.npy) and the offset
+        of each name in them (names_offsets.npy).
+        """
+        num_files = len(self._index)
+        names = self.names
+        if all(isinstance(name, (int, np.integer)) for name in names):
+            np.save(path.join(folder, "names.npy"), np.array(names, dtype=np.int64))
+        elif all(isinstance(name, str) for name in names):
+            encoded = [name.encode("utf-8") for name in names]
+            np.save(path.join(folder, "names_data.npy"),
+                    np.frombuffer(b"".join(encoded), dtype=np.uint8))
+            np.save(path.join(folder, "names_offsets.npy"), np.cumsum(
+                [0] + [len(name) for name in encoded], dtype=np.int64))
+        else:
+            raise Exception("Filenames have to be all strings or all integers...")
+        np.save(path.join(folder, "sizes.npy"), self._sizes[:num_files])
+        np.save(path.join(folder, "hits.npy"), self._hits[:num_files])
+        np.save(path.join(folder, "misses.npy"), self._misses[:num_files])
+
+    def load(self, folder: str) -> 'Stats':
+        """Read the stats written by save.
+
+        Returns:
+            Stats: this object instance
+        """
+        if path.isfile(path.join(folder, "names.npy")):
+            names = np.load(path.join(folder, "names.npy")).tolist()
         else:
-            stats = self._files[filename]
-        return stats
+            data = np.load(path.join(folder, "names_data.npy")).tobytes()
+            offsets = np.load(path.join(folder, "names_offsets.npy")).tolist()
+            names = [
+                data[start:stop].decode("utf-8")
+                for start, stop in zip(offsets[:-1], offsets[1:])
+            ]
+        num_files = len(names)
+        capacity = max(num_files, 1024)
+        for name in ['_sizes', '_hits', '_misses']:
+            column = np.load(path.join(folder, f"{name[1:]}.npy"), mmap_mode='r')
+            new_column = np.zeros(capacity, dtype=column.dtype)
+            new_column[:num_files] = column
+            setattr(self, name, new_column)
+        self.__views()
+        self._index = dict(zip(names, range(num_files)))
+        return self
 
 
-class LRU(object):
+class Cache(object):
+
+    """Base cache with the request loop and the stats accounting.
+
+    Files are identified by their row in the stats table. A policy is
+    defined by the hooks insert, on_hit and evict, that keep the
+    resident files (self._files, row -> size) in the policy order, and
+    by admit, that decides if a new file is stored before any file is
+    evicted.
+    """
 
     def __init__(self, size: float = 104857600):
         """Initialize cache.
@@ -55,8 +217,7 @@ class LRU(object):
         """
         self._size: float = 0.0
         self._max_size = size
-        self._files = {}
-        self._queue = []
+        self._files: 'dict[int, float]' = {}
 
         self._stats = Stats()
         # Stat attributes
@@ -72,61 +233,467 @@ class LRU(object):
         return 0.0
 
     def check(self, filename: str) -> bool:
-        return filename in self._files
+        return self._stats._index.get(filename) in self._files
 
-    def get(self, filename: str, *args) -> bool:
+    @property
+    def files(self) -> list:
+        """The resident filenames in policy order."""
+        names = self._stats.names
+        return [names[row] for row in self._files]
+
+    def get(self, filename: str, size: float, *args) -> bool:
         """Requesta a file to the cache.
 
         Args:
-            args (list): list of tuple with:
-                (size, ...)
+            size (float): the file size in MB
+            args (list): the other values of the request, used by
+                the policy
         """
-        hit = self.check(filename)
-        stats = self.before_request(filename, hit, *args)
-        added = self.update_policy(filename, stats, hit)
-        self.after_request(stats, hit, added)
-        pass
+        stats = self._stats
+        row = stats.index_or_set(filename, size)
+        hit = row in self._files
+        stats.update(row, size, hit)
+        added = self.update_policy(row, size, hit, *args)
+        # Stats of the request
+        if hit:
+            self._hit += 1
+        else:
+            self._miss += 1
+            if added:
+                self._written_data += size
+        self._read_data += size
+        return hit
+
+    def replay(self, filenames, sizes=None, *fields) -> dict:
+        """Request a whole sequence of files to the cache.
 
-    def before_request(self, filename, hit: bool, *args) -> 'FileStats':
-        stats = self._stats.get_or_set(filename, *args)
-        stats.update(args[0], hit)
-        return stats
+        Filenames are interned to stats rows once, so each distinct
+        file is hashed only one time and the request loop runs over
+        the integer row array. The cache counters are updated as if
+        each file was requested with get.
 
-    def update_policy(self, filename, file_stats, hit: bool) -> bool:
+        Args:
+            filenames (numpy.ndarray, pandas.DataFrame): the requested
+                filenames or a DataFrame (as returned by the Probe loaders)
+                with the Filename and Size columns, Size in bytes
+            sizes (numpy.ndarray): the file sizes in MB
+            fields (numpy.ndarray): other per-request values passed to
+                the policy, as the arguments of get after the size
+
+        Returns:
+            dict: per-request arrays with the hit flags ('hit') and the
+                cumulative counters ('hits', 'misses', 'written_data',
+                'read_data', 'deleted_data')
+        """
+        ids, names, sizes = intern_trace(filenames, sizes)
+        # Ids are given in order of appearance: a new id is a new maximum
+        first = np.flatnonzero(np.diff(np.maximum.accumulate(ids), prepend=-1))
+        rows = self._stats.intern(names.tolist(), sizes[first].tolist())[ids]
+
+        hits, added, deleted_data = self._replay_rows(rows, sizes, *fields)
+
+        cum_hits = np.cumsum(hits) + self._hit
+        cum_misses = np.cumsum(~hits) + self._miss
+        cum_written = np.cumsum(np.where(added, sizes, 0.)) + self._written_data
+        cum_read = np.cumsum(sizes) + self._read_data
+
+        if len(rows):
+            self._hit = int(cum_hits[-1])
+            self._miss = int(cum_misses[-1])
+            self._written_data = float(cum_written[-1])
+            self._read_data = float(cum_read[-1])
+
+        return {
+            'hit': hits,
+            'hits': cum_hits,
+            'misses': cum_misses,
+            'written_data': cum_written,
+            'read_data': cum_read,
+            'deleted_data': deleted_data,
+        }
+
+    def _replay_rows(self, rows: 'np.ndarray', sizes: 'np.ndarray', *fields) -> tuple:
+        """Run the requests of a sequence of stats rows.
+
+        Returns:
+            tuple: the hit flags, the added flags and the deleted data
+                after each request
+        """
+        num_requests = len(rows)
+        hits = bytearray(num_requests)
+        added = bytearray(num_requests)
+        deleted_data = np.empty(num_requests, dtype=np.float64)
+
+        files = self._files
+        update = self._stats.update
+        update_policy = self.update_policy
+        fields = [np.asarray(field).tolist() for field in fields]
+        for idx, (row, size, *args) in enumerate(zip(rows.tolist(), sizes.tolist(), *fields)):
+            hit = row in files
+            update(row, size, hit)
+            hits[idx] = hit
+            added[idx] = update_policy(row, size, hit, *args)
+            deleted_data[idx] = self._deleted_data
+
+        return (np.frombuffer(hits, dtype=bool), np.frombuffer(added, dtype=bool),
+                deleted_data)
+
+    def update_policy(self, row: int, size: float, hit: bool, *args) -> bool:
+        """Update the resident files after a request.
+
+        Args:
+            args (list): the other values of the request, passed to
+                the policy hooks
+
+        Returns:
+            bool: True if the file is added to the cache
+        """
         if not hit:
-            if self._size + file_stats.size <= self._max_size:
-                self._files[filename] = file_stats
-                self._queue.append(filename)
-                self._size += file_stats.size
-                return True
-            else:
-                while self._size + file_stats.size > self._max_size:
-                    to_remove = self._queue.pop(0)
-                    file_size = self._files[to_remove].size
-                    self._size -= file_size
-                    self._deleted_data += file_size
-                    del self._files[to_remove]
-                else:
-                    self._files[filename] = file_stats
-                    self._queue.append(filename)
-                    self._size += file_stats.size
-                    return True
+            if size > self._max_size or not self.admit(row, size, *args):
+                return False
+            while self._size + size > self._max_size and self._files:
+                removed = self.evict()
+                self._size -= removed
+                self._deleted_data += removed
+            self.insert(row, size, *args)
+            self._size += size
+            return True
         else:
-            self._queue.remove(filename)
-            self._queue.append(filename)
+            self.on_hit(row, *args)
 
         return False
 
-    def after_request(self, fileStats, hit: bool, added: bool):
-        if hit:
-            self._hit += 1
-        else:
-            self._miss += 1
+    def admit(self, row: int, size: float, *args) -> bool:
+        """Check if a new file should be stored.
+
+        It is called before the evictions needed to make room for the
+        file, so a file that is not admitted leaves the cache unchanged.
+
+        Args:
+            row (int): the stats row of the file to insert
+            size (float): the size of the file
+
+        Returns:
+            bool: True if the file should be stored
+        """
+        return True
+
+    def insert(self, row: int, size: float, *args):
+        """Add a file to the resident files."""
+        self._files[row] = size
+
+    def on_hit(self, row: int, *args):
+        """Update the policy order after a hit."""
+        pass
+
+    def evict(self) -> float:
+        """Remove a file to make room for a new one.
+
+        Returns:
+            float: the size of the removed file
+        """
+        raise NotImplementedError
+
+    def save(self, folder: str) -> 'Cache':
+        """Write a snapshot of the cache in a folder.
+
+        The resident files (in policy order) and the file stats are
+        stored as .npy arrays, that can be memory-mapped, together with
+        the filename table and a meta.json with the cache counters.
+
+        Args:
+            folder (str): the output folder, created if missing
+
+        Returns:
+            Cache: this object instance
+        """
+        makedirs(folder, exist_ok=True)
+        self._stats.save(folder)
+        np.save(path.join(folder, "resident.npy"), np.fromiter(
+            self._files, dtype=np.int64, count=len(self._files)))
+        np.save(path.join(folder, "resident_size.npy"), np.fromiter(
+            self._files.values(), dtype=np.float64, count=len(self._files)))
+        for name, column in self._policy_state().items():
+            np.save(path.join(folder, f"{name}.npy"), column)
+        with open(path.join(folder, "meta.json"), "w") as meta_file:
+            json.dump({
+                'cache': type(self).__name__,
+                'size': self._size,
+                'max_size': self._max_size,
+                'hit': self._hit,
+                'miss': self._miss,
+                'written_data': self._written_data,
+                'deleted_data': self._deleted_data,
+                'read_data': self._read_data,
+            }, meta_file, indent=2)
+        return self
+
+    def load(self, folder: str) -> 'Cache':
+        """Restore a snapshot written by save.
+
+        Args:
+            folder (str): the snapshot folder
+
+        Returns:
+            Cache: this object instance
+        """
+        with open(path.join(folder, "meta.json")) as meta_file:
+            meta = json.load(meta_file)
+        if meta['cache'] != type(self).__name__:
+            raise Exception("Snapshot of a {} cache cannot be loaded in a {} cache...".format(
+                meta['cache'], type(self).__name__))
+
+        self._stats = Stats().load(folder)
+        resident = np.load(path.join(folder, "resident.npy")).tolist()
+        self._files.clear()
+        self._files.update(zip(
+            resident, np.load(path.join(folder, "resident_size.npy")).tolist()))
+        self._load_policy_state(folder, resident)
+
+        self._size = meta['size']
+        self._max_size = meta['max_size']
+        self._hit = meta['hit']
+        self._miss = meta['miss']
+        self._written_data = meta['written_data']
+        self._deleted_data = meta['deleted_data']
+        self._read_data = meta['read_data']
+        return self
+
+    def _policy_state(self) -> dict:
+        """Extra arrays of the policy, aligned with the resident files."""
+        return {}
+
+    def _load_policy_state(self, folder: str, resident: list):
+        pass
+
+
+class LRU(Cache):
+
+    def __init__(self, size: float = 104857600):
+        super(LRU, self).__init__(size)
+        # Resident files in recency order: the first item is the least
+        # recently used one, the last item the most recently used one
+        self._files: 'OrderedDict[int, float]' = OrderedDict()
+
+    def on_hit(self, row: int, *args):
+        self._files.move_to_end(row)
+
+    def evict(self) -> float:
+        return self._files.popitem(last=False)[1]
+
+    def _replay_rows(self, rows: 'np.ndarray', sizes: 'np.ndarray', *fields) -> tuple:
+        """Run the requests with the LRU policy inlined.
+
+        The policy does not depend on the stats, so they are updated
+        at once after the loop, and the deleted data is stored only
+        at the evictions.
+        """
+        num_requests = len(rows)
+        hits = bytearray(num_requests)
+        added = bytearray(num_requests)
+        evictions = []
+        deleted = []
+
+        files = self._files
+        move_to_end = files.move_to_end
+        popitem = files.popitem
+        max_size = self._max_size
+        cur_size = self._size
+        deleted_data = self._deleted_data
+        for idx, (row, size) in enumerate(zip(rows.tolist(), sizes.tolist())):
+            if row in files:
+                move_to_end(row)
+                hits[idx] = True
+            elif size <= max_size:
+                if cur_size + size > max_size:
+                    while cur_size + size > max_size and files:
+                        removed = popitem(last=False)[1]
+                        cur_size -= removed
+                        deleted_data += removed
+                    evictions.append(idx)
+                    deleted.append(deleted_data)
+                files[row] = size
+                cur_size += size
+                added[idx] = True
+        self._size = cur_size
+
+        hits = np.frombuffer(hits, dtype=bool)
+        self._stats.update_many(rows, sizes, hits)
+        deleted = np.array([self._deleted_data] + deleted)
+        self._deleted_data = deleted_data
+        return (
+            hits, np.frombuffer(added, dtype=bool),
+            deleted[np.searchsorted(evictions, np.arange(num_requests), side='right')]
+        )
+
+
+class PriorityCache(Cache):
+
+    """Base cache that evicts the file with the lowest priority.
+
+    Priorities live in a binary heap with lazy invalidation: an update
+    pushes a new entry and the old one is discarded when it reaches the
+    top, so both updates and evictions cost O(log n). Ties are broken
+    by the time of the last update (the oldest is evicted first).
+    """
+
+    def __init__(self, size: float = 104857600):
+        super(PriorityCache, self).__init__(size)
+        self._heap: list = []
+        self._entries: dict = {}
+        self._tick: int = 0
+
+    def priority(self, row: int, *args) -> float:
+        raise NotImplementedError
+
+    def _push(self, row: int, *args):
+        self._tick += 1
+        entry = [self.priority(row, *args), self._tick, row]
+        self._entries[row] = entry
+        heappush(self._heap, entry)
+        # Drop the invalidated entries when they are the majority
+        if len(self._heap) > 2 * len(self._entries) + 1024:
+            self._heap = list(self._entries.values())
+            heapify(self._heap)
+
+    def _top(self) -> list:
+        heap = self._heap
+        while heap[0] is not self._entries.get(heap[0][2]):
+            heappop(heap)
+        return heap[0]
+
+    def _eviction_order(self):
+        """Iterate over the resident files in eviction order.
+
+        The heap is visited from the top with a second heap of the
+        frontier nodes, so it is not modified and the first k entries
+        cost O(k log k).
+
+        Yields:
+            list: the heap entries [priority, tick, row]
+        """
+        heap = self._heap
+        entries = self._entries
+        if not heap:
+            return
+        frontier = [(heap[0], 0)]
+        while frontier:
+            entry, position = heappop(frontier)
+            if entry is entries.get(entry[2]):
+                yield entry
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < len(heap):
+                    heappush(frontier, (heap[child], child))
+
+    def _victims(self, size: float):
+        """The heap entries evicted to make room for a file of a given size."""
+        needed = self._size + size - self._max_size
+        for entry in self._eviction_order():
+            if needed <= 0:
+                return
+            yield entry
+            needed -= self._files[entry[2]]
+
+    def insert(self, row: int, size: float, *args):
+        super(PriorityCache, self).insert(row, size)
+        self._push(row, *args)
+
+    def on_hit(self, row: int, *args):
+        self._push(row, *args)
+
+    def evict(self) -> float:
+        self._top()
+        _, _, row = heappop(self._heap)
+        del self._entries[row]
+        return self._files.pop(row)
+
+    def _policy_state(self) -> dict:
+        entries = [self._entries[row] for row in self._files]
+        return {
+            'priority': np.array([entry[0] for entry in entries], dtype=np.float64),
+            'tick': np.array([entry[1] for entry in entries], dtype=np.int64),
+        }
+
+    def _load_policy_state(self, folder: str, resident: list):
+        priorities = np.load(path.join(folder, "priority.npy")).tolist()
+        ticks = np.load(path.join(folder, "tick.npy")).tolist()
+        self._entries = {
+            row: [priority, tick, row]
+            for row, priority, tick in zip(resident, priorities, ticks)
+        }
+        self._heap = list(self._entries.values())
+        heapify(self._heap)
+        self._tick = max(ticks, default=0)
+
+
+class LFU(PriorityCache):
+
+    """Evict the least frequently requested file."""
+
+    def priority(self, row: int, *args) -> float:
+        return self._stats.requests(row)
+
+
+class SizeSmall(PriorityCache):
+
+    """Evict the smallest file first."""
+
+    def priority(self, row: int, *args) -> float:
+        return self._stats.size(row)
+
+
+class SizeBig(PriorityCache):
+
+    """Evict the biggest file first."""
+
+    def priority(self, row: int, *args) -> float:
+        return -self._stats.size(row)
+
+
+def weighted_cost(size: float, frequency: int, exp: float = 2.0) -> float:
+    """Default cost of a file for the Weighted cache."""
+    return (size / frequency) ** exp
+
+
+class Weighted(PriorityCache):
+
+    """Evict the file with the highest cost.
+
+    A new file is inserted only evicting files with a cost greater
+    than its own, otherwise it is not stored.
+    """
+
+    def __init__(self, size: float = 104857600,
+                 cost_function: callable = weighted_cost):
+        """Initialize cache.
+
+        Args:
+            size (float): cache size in MB. Default = 10T
+            cost_function (callable): cost of a file from its size
+                and its number of requests
+
+        """
+        super(Weighted, self).__init__(size)
+        self._cost_function = cost_function
+
+    def cost(self, row: int) -> float:
+        return self._cost_function(self._stats.size(row), self._stats.requests(row))
+
+    def priority(self, row: int, *args) -> float:
+        return -self.cost(row)
+
+    def admit(self, row: int, size: float, *args) -> bool:
+        cost = self.cost(row)
+        return all(-priority > cost for priority, _, _ in self._victims(size))
 
-        if added:
-            self._written_data += fileStats.size
 
-        self._read_data += fileStats.size
+POLICIES = {
+    'lru': LRU,
+    'lfu': LFU,
+    'sizesmall': SizeSmall,
+    'sizebig': SizeBig,
+    'weighted': Weighted,
+}
 
 
 if __name__ == "__main__":
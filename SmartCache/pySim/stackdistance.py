@@ -0,0 +1,172 @@
+from bisect import bisect_left
+
+import numpy as np
+
+from .cache import intern_trace
+
+
+class StackDistance(object):
+
+    """Byte-weighted LRU stack distances computed in a single pass.
+
+    The stack distance of a request is the size of the requested file
+    plus the sizes of the distinct files requested after its previous
+    access: an LRU cache of capacity C has a hit if the distance is not
+    greater than C. A file larger than C is never stored by the cache,
+    so it is not counted in the distances for C. Files are split in
+    size bands between the capacities, with a Fenwick tree for each
+    band indexed by the time of the last access of each file, so each
+    request costs O(log n) for each band with files and all the
+    capacities are evaluated with the same pass.
+
+    Note:
+        The results are the ones of LRU only if each file is always
+        requested with the same size. The distances use the size of
+        the last request of each file, while an LRU cache keeps the
+        size of a file when it is stored, that depends on the capacity
+        (the hits do not change it).
+    """
+
+    def __init__(self, capacities: list, tree_size: int = 1024):
+        """Initialize the simulation.
+
+        Args:
+            capacities (list): the cache sizes to evaluate in MB
+            tree_size (int): initial number of slots of the Fenwick trees
+
+        """
+        self._capacities = np.sort(np.asarray(capacities, dtype=np.float64))
+        num_bands = len(self._capacities)
+        # The band of a file is the first capacity that can store it
+        self._trees = [[0.0] * (tree_size + 1) for _ in range(num_bands)]
+        self._totals = [0.0] * num_bands
+        self._last_access = {}
+        self._time: int = 0
+        # Stat attributes
+        self._requests: int = 0
+        self._read_data: float = 0.0
+        self._hits = np.zeros(num_bands, dtype=np.int64)
+        self._read_on_hit = np.zeros(num_bands, dtype=np.float64)
+
+    @staticmethod
+    def __add(tree: list, position: int, value: float):
+        size = len(tree)
+        while position < size:
+            tree[position] += value
+            position += position & -position
+
+    @staticmethod
+    def __prefix(tree: list, position: int) -> float:
+        result = 0.0
+        while position > 0:
+            result += tree[position]
+            position -= position & -position
+        return result
+
+    def __compact(self):
+        """Renumber the last accesses and rebuild bigger trees.
+
+        Only the last access of each file is stored, so the new trees
+        need a slot for each distinct file plus the free ones.
+        """
+        live = sorted(self._last_access.items(), key=lambda item: item[1][0])
+        size = max(2 * len(live), len(self._trees[0]) - 1) + 1
+        trees = [[0.0] * size for _ in self._trees]
+        for position, (filename, (_, file_size, band)) in enumerate(live, 1):
+            self._last_access[filename] = (position, file_size, band)
+            trees[band][position] = file_size
+        for tree in trees:
+            for position in range(1, size):
+                parent = position + (position & -position)
+                if parent < size:
+                    tree[parent] += tree[position]
+        self._trees = trees
+        self._time = len(live)
+
+    def update(self, filenames, sizes=None) -> np.ndarray:
+        """Add a chunk of requests to the simulation.
+
+        Args:
+            filenames (numpy.ndarray, pandas.DataFrame): the requested
+                filenames or a DataFrame with the Filename and Size columns
+            sizes (numpy.ndarray): the file sizes in MB
+
+        Returns:
+            numpy.ndarray: the stack distances in MB of the requests
+                (rows) for each capacity (columns), inf for the first
+                request of a file and for the files that do not fit
+        """
+        ids, names, sizes = intern_trace(filenames, sizes)
+        names = names.tolist()
+        capacities = self._capacities.tolist()
+        num_bands = len(capacities)
+        distances = np.full((len(ids), num_bands), np.inf)
+
+        last_access = self._last_access
+        trees = self._trees
+        totals = self._totals
+        for idx, (file_id, size) in enumerate(zip(ids.tolist(), sizes.tolist())):
+            band = bisect_left(capacities, size)
+            filename = names[file_id]
+            previous = last_access.pop(filename, None)
+            if previous is not None:
+                position, old_size, old_band = previous
+                above = 0.0
+                for cur_band in range(num_bands):
+                    if totals[cur_band]:
+                        above += totals[cur_band] - self.__prefix(trees[cur_band], position)
+                    # The file is stored only by the caches that fit both sizes
+                    if cur_band >= band and cur_band >= old_band:
+                        distances[idx, cur_band] = above + size
+                if old_band < num_bands:
+                    self.__add(trees[old_band], position, -old_size)
+                    totals[old_band] -= old_size
+            # The files larger than all the capacities are never stored
+            if band < num_bands:
+                if self._time + 1 == len(trees[0]):
+                    self.__compact()
+                    trees = self._trees
+                self._time += 1
+                self.__add(trees[band], self._time, size)
+                totals[band] += size
+                last_access[filename] = (self._time, size, band)
+
+        for cur_band, capacity in enumerate(capacities):
+            hits = distances[:, cur_band] <= capacity
+            self._hits[cur_band] += int(hits.sum())
+            self._read_on_hit[cur_band] += float(sizes[hits].sum())
+        self._requests += len(ids)
+        self._read_data += float(sizes.sum())
+
+        return distances
+
+    def curves(self) -> dict:
+        """Get the LRU results for all the capacities.
+
+        Returns:
+            dict: arrays with the 'capacity', the 'hit_rate' and the
+                'read_on_hit' (fraction of the read data served by hits)
+        """
+        return {
+            'capacity': self._capacities,
+            'hit_rate': self._hits / max(self._requests, 1),
+            'read_on_hit': self._read_on_hit / max(self._read_data, 1.),
+        }
+
+
+def lru_curves(filenames, capacities: list, sizes=None) -> dict:
+    """Simulate LRU caches of several sizes with a single pass.
+
+    Args:
+        filenames (numpy.ndarray, pandas.DataFrame): the requested
+            filenames or a DataFrame with the Filename and Size columns
+        capacities (list): the cache sizes to evaluate in MB
+        sizes (numpy.ndarray): the file sizes in MB
+
+    Returns:
+        dict: arrays with the 'capacity', the 'hit_rate' and the
+            'read_on_hit' for each capacity
+    """
+    simulation = StackDistance(capacities)
+    simulation.update(filenames, sizes)
+    return simulation.curves()
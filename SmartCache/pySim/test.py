@@ -0,0 +1,309 @@
+import unittest
+
+
+class TestCaches(unittest.TestCase):
+
+    def test_stats_store(self):
+        from .cache import Stats
+        stats = Stats(capacity=2)
+        for idx in range(5):
+            stats.get_or_set(f"FILE {idx}", 100.0).update(100.0 + idx)
+        file_stats = stats.get_or_set("FILE 1", 0.0)
+        file_stats.update(200.0, hit=True)
+
+        self.assertEqual(len(stats), 5)
+        self.assertEqual(file_stats.size, 200.0)
+        self.assertEqual(file_stats.hit, 1)
+        self.assertEqual(file_stats.miss, 1)
+        self.assertEqual(file_stats.tot_requests, 2)
+        self.assertEqual(stats.get_or_set("FILE 4", 0.0).size, 104.0)
+
+    def test_lru_eviction_order(self):
+        from .cache import LRU
+        cache = LRU(1000)
+        cache.get("FILE A", 500.0)
+        cache.get("FILE B", 500.0)
+        cache.get("FILE A", 500.0)
+        cache.get("FILE C", 500.0)
+
+        self.assertTrue(cache.check("FILE A"))
+        self.assertFalse(cache.check("FILE B"))
+        self.assertTrue(cache.check("FILE C"))
+        self.assertEqual(cache.hit_rate(), 0.25)
+        self.assertEqual(cache._deleted_data, 500.0)
+
+    def test_lru_multiple_evictions(self):
+        from .cache import LRU
+        cache = LRU(1000)
+        for filename in ["A", "B", "C", "D"]:
+            cache.get(filename, 250.0)
+        cache.get("A", 250.0)
+        cache.get("E", 600.0)
+
+        self.assertEqual(cache.files, ["A", "E"])
+        self.assertEqual(cache._size, 850.0)
+
+    def test_lru_replay(self):
+        import numpy as np
+        import pandas as pd
+        from .cache import LRU
+        filenames = np.array(["A", "B", "A", "C", "B", "A"])
+        sizes = np.array([500., 500., 500., 500., 500., 500.])
+
+        cache = LRU(1000)
+        for filename, size in zip(filenames, sizes):
+            cache.get(filename, size)
+
+        replayed = LRU(1000)
+        result = replayed.replay(filenames, sizes)
+        self.assertEqual(result['hit'].tolist(), [False, False, True, False, False, False])
+        self.assertEqual(result['hits'][-1], cache._hit)
+        self.assertEqual(result['misses'][-1], cache._miss)
+        self.assertEqual(result['written_data'][-1], cache._written_data)
+        self.assertEqual(result['deleted_data'][-1], cache._deleted_data)
+        self.assertEqual(replayed.files, cache.files)
+        self.assertEqual(replayed._stats.get_or_set("A", 0.).hit, 1)
+        self.assertEqual(replayed._stats.get_or_set("A", 0.).miss, 2)
+
+        rng = np.random.default_rng(42)
+        filenames = np.array([f"FILE {idx}" for idx in rng.integers(0, 50, 2000)])
+        sizes = rng.uniform(1., 100., len(filenames))
+        cache = LRU(1000)
+        deleted_data = []
+        for filename, size in zip(filenames, sizes):
+            cache.get(filename, size)
+            deleted_data.append(cache._deleted_data)
+        replayed = LRU(1000)
+        result = replayed.replay(filenames, sizes)
+        np.testing.assert_allclose(result['deleted_data'], deleted_data)
+        self.assertEqual(replayed.files, cache.files)
+        self.assertEqual(replayed._stats.names, cache._stats.names)
+        np.testing.assert_allclose(replayed._stats._sizes, cache._stats._sizes)
+        self.assertEqual(replayed._stats._hits.tolist(), cache._stats._hits.tolist())
+
+        from_df = LRU(1000)
+        from_df.replay(pd.DataFrame({
+            'Filename': filenames,
+            'Size': sizes * 1024**2
+        }))
+        self.assertEqual(from_df.hit_rate(), cache.hit_rate())
+
+        with self.assertRaises(Exception):
+            LRU(1000).replay(pd.DataFrame({
+                'Filename': ["A", None, "B"],
+                'Size': [1024.**2] * 3
+            }))
+
+    def test_lfu(self):
+        from .cache import LFU
+        cache = LFU(1000)
+        for filename in ["A", "A", "B", "C", "C", "C", "D"]:
+            cache.get(filename, 250.0)
+        cache.get("E", 500.0)
+
+        self.assertEqual(sorted(cache.files), ["A", "C", "E"])
+
+    def test_size_policies(self):
+        from .cache import SizeBig, SizeSmall
+        requests = [("A", 100.0), ("B", 600.0), ("C", 200.0), ("D", 300.0)]
+        small = SizeSmall(1000)
+        big = SizeBig(1000)
+        for filename, size in requests:
+            small.get(filename, size)
+            big.get(filename, size)
+
+        self.assertEqual(sorted(small.files), ["B", "D"])
+        self.assertEqual(sorted(big.files), ["A", "C", "D"])
+
+    def test_weighted_admission(self):
+        from .cache import Weighted
+        cache = Weighted(1000, cost_function=lambda size, frequency: size / frequency)
+        cache.get("A", 500.0)
+        cache.get("A", 500.0)
+        cache.get("B", 500.0)
+        # Cost 600 is greater than the cost of A (250) and B (500)
+        cache.get("C", 600.0)
+        self.assertFalse(cache.check("C"))
+        cache.get("D", 400.0)
+
+        self.assertEqual(sorted(cache.files), ["A", "D"])
+        self.assertEqual(cache._deleted_data, 500.0)
+
+    def test_weighted_declined_insertion(self):
+        from .cache import Weighted
+        cache = Weighted(1000, cost_function=lambda size, frequency: 1. / frequency)
+        for filename, size in [("A", 800.), ("A", 800.), ("A", 800.), ("A", 800.),
+                               ("B", 100.)]:
+            cache.get(filename, size)
+        # X (cost 0.5) needs to evict B (cost 1) and A (cost 0.25), so
+        # it is not stored and no file is evicted
+        cache.get("X", 300.)
+        cache.get("X", 300.)
+        self.assertFalse(cache.check("X"))
+        self.assertEqual(sorted(cache.files), ["A", "B"])
+        self.assertEqual(cache._size, 900.)
+        self.assertEqual(cache._deleted_data, 0.)
+        self.assertEqual(cache.hit_rate(), 3 / 7)
+
+    def test_stack_distance_matches_lru(self):
+        import numpy as np
+        from .cache import LRU
+        from .stackdistance import StackDistance
+        rng = np.random.default_rng(42)
+        file_ids = rng.integers(0, 200, 5000)
+        filenames = np.array([f"FILE {idx}" for idx in file_ids])
+        file_sizes = rng.uniform(1.0, 100.0, 200)
+        # Files larger than some of the capacities
+        file_sizes[:10] = [500.0, 2000.0, 6000.0] * 3 + [150.0]
+        sizes = file_sizes[file_ids]
+        capacities = [100.0, 1000.0, 5000.0]
+
+        simulation = StackDistance(capacities, tree_size=8)
+        for chunk in np.array_split(np.arange(len(filenames)), 3):
+            simulation.update(filenames[chunk], sizes[chunk])
+        curves = simulation.curves()
+
+        for idx, capacity in enumerate(capacities):
+            cache = LRU(capacity)
+            hits = cache.replay(filenames, sizes)['hit']
+            self.assertAlmostEqual(curves['hit_rate'][idx], cache.hit_rate())
+            self.assertAlmostEqual(
+                curves['read_on_hit'][idx], sizes[hits].sum() / sizes.sum())
+
+        # A file larger than the capacity is never a hit
+        filenames = np.array(["BIG", "A", "BIG", "A", "BIG"])
+        sizes = np.array([200., 10., 200., 10., 200.])
+        curves = StackDistance([100.0, 500.0]).update(filenames, sizes)
+        simulation = StackDistance([100.0, 500.0])
+        simulation.update(filenames, sizes)
+        for idx, capacity in enumerate([100.0, 500.0]):
+            cache = LRU(capacity)
+            cache.replay(filenames, sizes)
+            self.assertAlmostEqual(
+                simulation.curves()['hit_rate'][idx], cache.hit_rate())
+        self.assertEqual(simulation.curves()['hit_rate'].tolist(), [0.2, 0.6])
+        self.assertEqual(curves[:, 0].tolist(), [np.inf, np.inf, np.inf, 10., np.inf])
+
+        # A grows after it is stored: LRU keeps its first size, so B is
+        # still in the cache, while the distance of B counts the new size
+        filenames = np.array(["A", "B", "A", "C", "B"])
+        sizes = np.array([50., 40., 60., 10., 40.])
+        simulation = StackDistance([100.0])
+        simulation.update(filenames, sizes)
+        cache = LRU(100.0)
+        cache.replay(filenames, sizes)
+        self.assertEqual(simulation.curves()['hit_rate'].tolist(), [0.2])
+        self.assertEqual(cache.hit_rate(), 0.4)
+
+    def test_belady(self):
+        import numpy as np
+        from .belady import NEVER, Belady, next_uses
+        file_ids = np.array([0, 1, 2, 0, 1, 3, 0, 2])
+        self.assertEqual(
+            next_uses(file_ids).tolist(),
+            [4, 3, 0, 1, NEVER, NEVER, NEVER, NEVER]
+        )
+
+        filenames = np.array([f"FILE {idx}" for idx in file_ids])
+        cache = Belady(200)
+        result = cache.replay(filenames, np.full(len(filenames), 100.))
+        # FILE 2 is requested after FILE 0 and FILE 1, so it is not stored
+        self.assertEqual(
+            result['hit'].tolist(),
+            [False, False, False, True, True, False, True, False]
+        )
+
+        split = Belady(200)
+        last_seen = {}
+        second = next_uses(file_ids[4:], last_seen)
+        first = next_uses(file_ids[:4], last_seen, start=4)
+        split.replay(filenames[:4], np.full(4, 100.), first)
+        split.replay(filenames[4:], np.full(4, 100.), second)
+        self.assertEqual(split.hit_rate(), cache.hit_rate())
+
+        single = Belady(200)
+        hits = [
+            single.get(filename, 100., next_use)
+            for filename, next_use in zip(filenames, next_uses(file_ids).tolist())
+        ]
+        self.assertEqual(hits, result['hit'].tolist())
+
+        # X needs to evict B (requested after it) and A (requested before it)
+        cache = Belady(200)
+        cache.get("A", 100., 5)
+        cache.get("B", 100., 1)
+        cache.get("X", 200., 3)
+        self.assertEqual(sorted(cache.files), ["A", "B"])
+        self.assertEqual(cache._deleted_data, 0.)
+        cache.get("X", 200., 10)
+        self.assertEqual(cache.files, ["X"])
+
+    def test_save_load(self):
+        from tempfile import TemporaryDirectory
+        from .cache import LFU, LRU
+        for cache_type in [LRU, LFU]:
+            cache = cache_type(1000)
+            for filename in ["A", "B", "A", "C"]:
+                cache.get(filename, 300.0)
+            with TemporaryDirectory() as folder:
+                cache.save(folder)
+                restored = cache_type().load(folder)
+            self.assertEqual(restored.files, cache.files)
+            self.assertEqual(restored.hit_rate(), cache.hit_rate())
+            self.assertEqual(restored._stats.get_or_set("A", 0.).hit, 1)
+
+            for filename in ["D", "B", "A"]:
+                cache.get(filename, 300.0)
+                restored.get(filename, 300.0)
+            self.assertEqual(restored.files, cache.files)
+
+        with TemporaryDirectory() as folder:
+            LRU(1000).save(folder)
+            self.assertEqual(LRU().load(folder).files, [])
+            with self.assertRaises(Exception):
+                LFU().load(folder)
+
+        import numpy as np
+        for names in [["/store/a\nb", "/store/è", ""], list(np.arange(3, dtype=np.int32))]:
+            cache = LRU(1000)
+            for filename in names:
+                cache.get(filename, 100.0)
+            with TemporaryDirectory() as folder:
+                cache.save(folder)
+                restored = LRU().load(folder)
+            self.assertEqual(restored.files, names)
+            self.assertTrue(restored.check(names[0]))
+
+    def test_trace_reader(self):
+        from os import path
+        from tempfile import TemporaryDirectory
+        import pandas as pd
+        from .trace import TraceReader
+        with TemporaryDirectory() as folder:
+            for day, filenames in enumerate([["A", "B", "A"], ["C", "A"]]):
+                pd.DataFrame({
+                    'Filename': filenames,
+                    'SiteName': "T2_IT_Pisa",
+                    'Size': 1024**2,
+                    'DataType': "mc",
+                    'JobSuccess': [True] * (len(filenames) - 1) + [False],
+                    'reqDay': 86400 * day,
+                }).to_csv(path.join(folder, f"results_0{day}.csv.gz"), index=False)
+
+            batches = list(TraceReader(folder, chunksize=2))
+            self.assertEqual([len(batch.filename) for batch in batches], [2, 1, 2])
+            self.assertEqual(
+                [int(idx) for batch in batches for idx in batch.filename],
+                [0, 1, 0, 2, 0]
+            )
+            self.assertEqual(batches[-1].size.tolist(), [1.0, 1.0])
+            self.assertEqual(batches[-1].req_day.tolist(), [86400, 86400])
+
+            reader = TraceReader(folder, job_success_only=True)
+            batches = list(reader)
+            self.assertEqual(reader.filenames.names, ["A", "B", "C"])
+            self.assertEqual(sum(len(batch.filename) for batch in batches), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import os
+from collections import namedtuple
+from os import path
+from queue import Empty, Full, Queue
+from threading import Event, Thread
+
+import numpy as np
+import pandas as pd
+
+from ..utils.name_table import NameTable
+
+__all__ = ['TraceBatch', 'TraceReader']
+
+TraceBatch = namedtuple(
+    'TraceBatch', ['filename', 'size', 'req_day', 'site_name', 'data_type']
+)
+TraceBatch.__doc__ = """A chunk of trace records as column arrays.
+
+filename, site_name and data_type are interned ids (see
+SmartCache.utils.name_table.NameTable), size is in MB (as the pySim
+cache sizes) and req_day is the request day timestamp in seconds.
+"""
+
+
+class TraceReader(object):
+
+    """Stream a trace of daily csv files as typed record batches.
+
+    Files are read in day (name) order, in chunks of bounded size, by
+    a background thread: decompression and parsing of the next chunks
+    overlap with the simulation of the current one, and the memory used
+    is bounded by prefetch * chunksize records.
+    """
+
+    COLUMNS = ['Filename', 'Size', 'reqDay', 'SiteName', 'DataType']
+
+    def __init__(self, source: str, chunksize: int = 2**18, prefetch: int = 4,
+                 job_success_only: bool = False, filename_table: str = None):
+        """Init function of the trace reader.
+
+        Args:
+            source (str): a csv (or csv.gz) file or a folder of them
+            chunksize (int): max number of records of a batch
+            prefetch (int): max number of batches read in advance
+            job_success_only (bool): use only the requests of successful jobs
+            filename_table (str): the NameTable log of the filename ids, to
+                share the same ids with other tools and runs
+
+        Returns:
+            TraceReader: the instance of this object
+
+        """
+        if path.isdir(source):
+            self._files = [
+                path.join(source, filename)
+                for filename in sorted(os.listdir(source))
+                if filename.find("csv") != -1
+            ]
+        else:
+            self._files = [source]
+        self._chunksize = chunksize
+        self._prefetch = prefetch
+        self._job_success_only = job_success_only
+        self.filenames = NameTable(filename_table)
+        self.site_names = NameTable()
+        self.data_types = NameTable()
+
+    @property
+    def files(self) -> list:
+        return self._files
+
+    def __to_batch(self, chunk: 'pd.DataFrame') -> 'TraceBatch':
+        if self._job_success_only:
+            chunk = chunk[chunk.JobSuccess.astype(bool)]
+        return TraceBatch(
+            filename=self.filenames.intern(chunk.Filename),
+            size=chunk.Size.to_numpy(dtype=np.float64) / 1024**2,
+            req_day=chunk.reqDay.to_numpy(dtype=np.int64),
+            site_name=self.site_names.intern(chunk.SiteName.fillna("")),
+            data_type=self.data_types.intern(chunk.DataType.fillna("")),
+        )
+
+    def __produce(self, batches: 'Queue', stop: 'Event'):
+        columns = self.COLUMNS + (['JobSuccess'] if self._job_success_only else [])
+        try:
+            for filename in self._files:
+                for chunk in pd.read_csv(filename, usecols=columns,
+                                         chunksize=self._chunksize):
+                    batch = self.__to_batch(chunk)
+                    while not stop.is_set():
+                        try:
+                            batches.put(batch, timeout=0.1)
+                            break
+                        except Full:
+                            pass
+                    if stop.is_set():
+                        return
+        except Exception as err:
+            batches.put(err)
+        else:
+            batches.put(None)
+
+    def __iter__(self):
+        """Iterate over the record batches of the whole trace.
+
+        Yields:
+            TraceBatch: the next batch of records
+        """
+        batches = Queue(maxsize=self._prefetch)
+        stop = Event()
+        producer = Thread(target=self.__produce, args=(batches, stop), daemon=True)
+        producer.start()
+        try:
+            while True:
+                batch = batches.get()
+                if batch is None:
+                    break
+                if isinstance(batch, Exception):
+                    raise batch
+                yield batch
+        finally:
+            stop.set()
+            # Unblock the producer if it is waiting on a full queue
+            try:
+                while True:
+                    batches.get_nowait()
+            except Empty:
+                pass
+            producer.join()
@@ -24,8 +24,10 @@ var _ = math.Inf
 // proto package needs to be updated.
 const _ = proto.ProtoPackageIsVersion3 // please upgrade the proto package
 
+// An empty model name selects the default model of the server
 type AIInput struct {
 	InputVector          []float64 `protobuf:"fixed64,1,rep,packed,name=inputVector,proto3" json:"inputVector,omitempty"`
+	Model                string    `protobuf:"bytes,2,opt,name=model,proto3" json:"model,omitempty"`
 	XXX_NoUnkeyedLiteral struct{}  `json:"-"`
 	XXX_unrecognized     []byte    `json:"-"`
 	XXX_sizecache        int32     `json:"-"`
@@ -63,6 +65,13 @@ func (m *AIInput) GetInputVector() []float64 {
 	return nil
 }
 
+func (m *AIInput) GetModel() string {
+	if m != nil {
+		return m.Model
+	}
+	return ""
+}
+
 type StorePrediction struct {
 	Store                bool     `protobuf:"varint,1,opt,name=store,proto3" json:"store,omitempty"`
 	XXX_NoUnkeyedLiteral struct{} `json:"-"`
@@ -102,27 +111,130 @@ func (m *StorePrediction) GetStore() bool {
 	return false
 }
 
+// Input vectors of the same size, concatenated
+type AIInputBatch struct {
+	InputVectors         []float64 `protobuf:"fixed64,1,rep,packed,name=inputVectors,proto3" json:"inputVectors,omitempty"`
+	VectorSize           uint32    `protobuf:"varint,2,opt,name=vectorSize,proto3" json:"vectorSize,omitempty"`
+	Model                string    `protobuf:"bytes,3,opt,name=model,proto3" json:"model,omitempty"`
+	XXX_NoUnkeyedLiteral struct{}  `json:"-"`
+	XXX_unrecognized     []byte    `json:"-"`
+	XXX_sizecache        int32     `json:"-"`
+}
+
+func (m *AIInputBatch) Reset()         { *m = AIInputBatch{} }
+func (m *AIInputBatch) String() string { return proto.CompactTextString(m) }
+func (*AIInputBatch) ProtoMessage()    {}
+func (*AIInputBatch) Descriptor() ([]byte, []int) {
+	return fileDescriptor_4bdfe6a5fd51d81f, []int{2}
+}
+
+func (m *AIInputBatch) XXX_Unmarshal(b []byte) error {
+	return xxx_messageInfo_AIInputBatch.Unmarshal(m, b)
+}
+func (m *AIInputBatch) XXX_Marshal(b []byte, deterministic bool) ([]byte, error) {
+	return xxx_messageInfo_AIInputBatch.Marshal(b, m, deterministic)
+}
+func (m *AIInputBatch) XXX_Merge(src proto.Message) {
+	xxx_messageInfo_AIInputBatch.Merge(m, src)
+}
+func (m *AIInputBatch) XXX_Size() int {
+	return xxx_messageInfo_AIInputBatch.Size(m)
+}
+func (m *AIInputBatch) XXX_DiscardUnknown() {
+	xxx_messageInfo_AIInputBatch.DiscardUnknown(m)
+}
+
+var xxx_messageInfo_AIInputBatch proto.InternalMessageInfo
+
+func (m *AIInputBatch) GetInputVectors() []float64 {
+	if m != nil {
+		return m.InputVectors
+	}
+	return nil
+}
+
+func (m *AIInputBatch) GetVectorSize() uint32 {
+	if m != nil {
+		return m.VectorSize
+	}
+	return 0
+}
+
+func (m *AIInputBatch) GetModel() string {
+	if m != nil {
+		return m.Model
+	}
+	return ""
+}
+
+type StorePredictionBatch struct {
+	Store                []bool   `protobuf:"varint,1,rep,packed,name=store,proto3" json:"store,omitempty"`
+	XXX_NoUnkeyedLiteral struct{} `json:"-"`
+	XXX_unrecognized     []byte   `json:"-"`
+	XXX_sizecache        int32    `json:"-"`
+}
+
+func (m *StorePredictionBatch) Reset()         { *m = StorePredictionBatch{} }
+func (m *StorePredictionBatch) String() string { return proto.CompactTextString(m) }
+func (*StorePredictionBatch) ProtoMessage()    {}
+func (*StorePredictionBatch) Descriptor() ([]byte, []int) {
+	return fileDescriptor_4bdfe6a5fd51d81f, []int{3}
+}
+
+func (m *StorePredictionBatch) XXX_Unmarshal(b []byte) error {
+	return xxx_messageInfo_StorePredictionBatch.Unmarshal(m, b)
+}
+func (m *StorePredictionBatch) XXX_Marshal(b []byte, deterministic bool) ([]byte, error) {
+	return xxx_messageInfo_StorePredictionBatch.Marshal(b, m, deterministic)
+}
+func (m *StorePredictionBatch) XXX_Merge(src proto.Message) {
+	xxx_messageInfo_StorePredictionBatch.Merge(m, src)
+}
+func (m *StorePredictionBatch) XXX_Size() int {
+	return xxx_messageInfo_StorePredictionBatch.Size(m)
+}
+func (m *StorePredictionBatch) XXX_DiscardUnknown() {
+	xxx_messageInfo_StorePredictionBatch.DiscardUnknown(m)
+}
+
+var xxx_messageInfo_StorePredictionBatch proto.InternalMessageInfo
+
+func (m *StorePredictionBatch) GetStore() []bool {
+	if m != nil {
+		return m.Store
+	}
+	return nil
+}
+
 func init() {
 	proto.RegisterType((*AIInput)(nil), "aiservice.AIInput")
 	proto.RegisterType((*StorePrediction)(nil), "aiservice.StorePrediction")
+	proto.RegisterType((*AIInputBatch)(nil), "aiservice.AIInputBatch")
+	proto.RegisterType((*StorePredictionBatch)(nil), "aiservice.StorePredictionBatch")
 }
 
 func init() { proto.RegisterFile("ai.proto", fileDescriptor_4bdfe6a5fd51d81f) }
 
 var fileDescriptor_4bdfe6a5fd51d81f = []byte{
-	// 186 bytes of a gzipped FileDescriptorProto
-	0x1f, 0x8b, 0x08, 0x00, 0x00, 0x00, 0x00, 0x00, 0x02, 0xff, 0xe2, 0xe2, 0x48, 0xcc, 0xd4, 0x2b,
-	0x28, 0xca, 0x2f, 0xc9, 0x17, 0xe2, 0x4c, 0xcc, 0x2c, 0x4e, 0x2d, 0x2a, 0xcb, 0x4c, 0x4e, 0x55,
-	0xd2, 0xe6, 0x62, 0x77, 0xf4, 0xf4, 0xcc, 0x2b, 0x28, 0x2d, 0x11, 0x52, 0xe0, 0xe2, 0xce, 0x04,
-	0x31, 0xc2, 0x52, 0x93, 0x4b, 0xf2, 0x8b, 0x24, 0x18, 0x15, 0x98, 0x35, 0x18, 0x83, 0x90, 0x85,
-	0x94, 0xd4, 0xb9, 0xf8, 0x83, 0x4b, 0xf2, 0x8b, 0x52, 0x03, 0x8a, 0x52, 0x53, 0x32, 0x93, 0x4b,
-	0x32, 0xf3, 0xf3, 0x84, 0x44, 0xb8, 0x58, 0x8b, 0x41, 0x42, 0x12, 0x8c, 0x0a, 0x8c, 0x1a, 0x1c,
-	0x41, 0x10, 0x8e, 0x91, 0x2f, 0x17, 0xa7, 0xa3, 0x67, 0x30, 0xc4, 0x0a, 0x21, 0x07, 0x2e, 0x1e,
-	0x47, 0x4f, 0xa8, 0x16, 0xff, 0xbc, 0x54, 0x21, 0x21, 0x3d, 0xb8, 0xf5, 0x7a, 0x50, 0xbb, 0xa5,
-	0xa4, 0x90, 0xc4, 0xd0, 0xac, 0x50, 0x62, 0x70, 0xd2, 0xe1, 0x92, 0xc8, 0xcc, 0xd7, 0x4b, 0x2f,
-	0x2a, 0x48, 0xd6, 0x4b, 0x4e, 0x4c, 0xce, 0x48, 0xd5, 0x4b, 0xcc, 0xd4, 0x83, 0xaa, 0x76, 0xe2,
-	0x73, 0x06, 0x89, 0xc0, 0x6d, 0x0b, 0x60, 0x4c, 0x62, 0x03, 0x7b, 0xd2, 0x18, 0x10, 0x00, 0x00,
-	0xff, 0xff, 0x11, 0xaa, 0xe7, 0x22, 0xf0, 0x00, 0x00, 0x00,
+	// 275 bytes of a gzipped FileDescriptorProto
+	0x1f, 0x8b, 0x08, 0x00, 0x00, 0x00, 0x00, 0x00, 0x02, 0xff, 0x74, 0x91, 0xcf, 0x4a, 0xc4, 0x30,
+	0x10, 0xc6, 0x37, 0x2e, 0xea, 0x76, 0x5c, 0x57, 0x08, 0x0b, 0x96, 0x1e, 0xb4, 0xe4, 0x62, 0x0f,
+	0x4b, 0x0e, 0xfa, 0x02, 0xb6, 0x9e, 0x0a, 0x82, 0x4b, 0x0b, 0xde, 0x63, 0x36, 0xd8, 0x80, 0x36,
+	0x25, 0x8d, 0x7b, 0xf0, 0x55, 0x7c, 0x59, 0xc9, 0x1f, 0x6a, 0x5c, 0xf1, 0x36, 0xf3, 0x65, 0xe6,
+	0xfb, 0x7e, 0x4c, 0x60, 0xc1, 0x24, 0x1d, 0xb4, 0x32, 0x0a, 0x27, 0x4c, 0x8e, 0x42, 0xef, 0x25,
+	0x17, 0xa4, 0x84, 0xd3, 0xb2, 0xae, 0xfb, 0xe1, 0xc3, 0xe0, 0x1c, 0xce, 0xa4, 0x2d, 0x9e, 0x05,
+	0x37, 0x4a, 0xa7, 0x28, 0x9f, 0x17, 0xa8, 0x89, 0x25, 0xbc, 0x86, 0xe3, 0x77, 0xb5, 0x13, 0x6f,
+	0xe9, 0x51, 0x8e, 0x8a, 0xa4, 0xf1, 0x0d, 0xb9, 0x81, 0x8b, 0xd6, 0x28, 0x2d, 0xb6, 0x5a, 0xec,
+	0x24, 0x37, 0x52, 0xf5, 0x76, 0x70, 0xb4, 0x52, 0x8a, 0x72, 0x54, 0x2c, 0x1a, 0xdf, 0x90, 0x0e,
+	0x96, 0x21, 0xab, 0x62, 0x86, 0x77, 0x98, 0xc0, 0x32, 0x72, 0x1f, 0x43, 0xe2, 0x2f, 0x0d, 0x5f,
+	0x01, 0xec, 0x5d, 0xd9, 0xca, 0x4f, 0xe1, 0x72, 0xcf, 0x9b, 0x48, 0xf9, 0x41, 0x9a, 0xc7, 0x48,
+	0x1b, 0x58, 0x1f, 0x20, 0xf9, 0xc4, 0x88, 0x6b, 0x3e, 0x71, 0xdd, 0x7e, 0x21, 0x48, 0xca, 0xba,
+	0xf5, 0x17, 0xc1, 0xf7, 0x96, 0x32, 0x2c, 0x3e, 0xf5, 0x02, 0x63, 0x3a, 0x5d, 0x8b, 0x06, 0xfc,
+	0x2c, 0x8b, 0xb4, 0x83, 0x20, 0x32, 0xc3, 0x8f, 0xb0, 0x9a, 0x1c, 0x7c, 0xee, 0xe5, 0x5f, 0x0f,
+	0xf7, 0x90, 0x5d, 0xff, 0x6f, 0xe4, 0x06, 0xc8, 0xac, 0xda, 0x40, 0x2a, 0x15, 0x7d, 0xd5, 0x03,
+	0xa7, 0x9c, 0xf1, 0x4e, 0x50, 0x26, 0x69, 0x58, 0xa9, 0x56, 0x0f, 0x56, 0x99, 0xd8, 0xb7, 0xe8,
+	0xe5, 0xc4, 0xfd, 0xf0, 0xdd, 0x77, 0x00, 0x00, 0x00, 0xff, 0xff, 0xd3, 0x40, 0xf4, 0x94, 0xed,
+	0x01, 0x00, 0x00,
 }
 
 // Reference imports to suppress errors if they are not otherwise used.
@@ -139,6 +251,8 @@ const _ = grpc.SupportPackageIsVersion4
 type AIServiceClient interface {
 	// Make 1 prediction only
 	AIPredictOne(ctx context.Context, in *AIInput, opts ...grpc.CallOption) (*StorePrediction, error)
+	// Make a prediction for each input vector of the batch
+	AIPredictBatch(ctx context.Context, in *AIInputBatch, opts ...grpc.CallOption) (*StorePredictionBatch, error)
 }
 
 type aIServiceClient struct {
@@ -158,10 +272,21 @@ func (c *aIServiceClient) AIPredictOne(ctx context.Context, in *AIInput, opts ..
 	return out, nil
 }
 
+func (c *aIServiceClient) AIPredictBatch(ctx context.Context, in *AIInputBatch, opts ...grpc.CallOption) (*StorePredictionBatch, error) {
+	out := new(StorePredictionBatch)
+	err := c.cc.Invoke(ctx, "/aiservice.AIService/AIPredictBatch", in, out, opts...)
+	if err != nil {
+		return nil, err
+	}
+	return out, nil
+}
+
 // AIServiceServer is the server API for AIService service.
 type AIServiceServer interface {
 	// Make 1 prediction only
 	AIPredictOne(context.Context, *AIInput) (*StorePrediction, error)
+	// Make a prediction for each input vector of the batch
+	AIPredictBatch(context.Context, *AIInputBatch) (*StorePredictionBatch, error)
 }
 
 // UnimplementedAIServiceServer can be embedded to have forward compatible implementations.
@@ -171,6 +296,9 @@ type UnimplementedAIServiceServer struct {
 func (*UnimplementedAIServiceServer) AIPredictOne(ctx context.Context, req *AIInput) (*StorePrediction, error) {
 	return nil, status.Errorf(codes.Unimplemented, "method AIPredictOne not implemented")
 }
+func (*UnimplementedAIServiceServer) AIPredictBatch(ctx context.Context, req *AIInputBatch) (*StorePredictionBatch, error) {
+	return nil, status.Errorf(codes.Unimplemented, "method AIPredictBatch not implemented")
+}
 
 func RegisterAIServiceServer(s *grpc.Server, srv AIServiceServer) {
 	s.RegisterService(&_AIService_serviceDesc, srv)
@@ -194,6 +322,24 @@ func _AIService_AIPredictOne_Handler(srv interface{}, ctx context.Context, dec f
 	return interceptor(ctx, in, info, handler)
 }
 
+func _AIService_AIPredictBatch_Handler(srv interface{}, ctx context.Context, dec func(interface{}) error, interceptor grpc.UnaryServerInterceptor) (interface{}, error) {
+	in := new(AIInputBatch)
+	if err := dec(in); err != nil {
+		return nil, err
+	}
+	if interceptor == nil {
+		return srv.(AIServiceServer).AIPredictBatch(ctx, in)
+	}
+	info := &grpc.UnaryServerInfo{
+		Server:     srv,
+		FullMethod: "/aiservice.AIService/AIPredictBatch",
+	}
+	handler := func(ctx context.Context, req interface{}) (interface{}, error) {
+		return srv.(AIServiceServer).AIPredictBatch(ctx, req.(*AIInputBatch))
+	}
+	return interceptor(ctx, in, info, handler)
+}
+
 var _AIService_serviceDesc = grpc.ServiceDesc{
 	ServiceName: "aiservice.AIService",
 	HandlerType: (*AIServiceServer)(nil),
@@ -202,6 +348,10 @@ var _AIService_serviceDesc = grpc.ServiceDesc{
 			MethodName: "AIPredictOne",
 			Handler:    _AIService_AIPredictOne_Handler,
 		},
+		{
+			MethodName: "AIPredictBatch",
+			Handler:    _AIService_AIPredictBatch_Handler,
+		},
 	},
 	Streams:  []grpc.StreamDesc{},
 	Metadata: "ai.proto",
@@ -1,5 +1,15 @@
 from hashlib import blake2b
-from sys import argv
+from itertools import islice
+from multiprocessing import Pool
+from sys import argv, stdin
+
+import numpy as np
+import pandas as pd
+
+# Number of distinct values above which hash_many uses the process pool
+POOL_THRESHOLD = 10**6
+# Number of lines hashed at once in file mode
+FILE_CHUNK = 10**6
 
 
 def hash_hexdigest(string: str, digest_size=8) -> str:
@@ -15,8 +25,84 @@ def hash_int(string, digest_size=8, num_digits=10) -> int:
     return int(cur_hash, 16) % 10**num_digits
 
 
+def _digests(strings: list) -> bytes:
+    """Concatenate the 8 byte digests of a list of strings."""
+    base = blake2b(digest_size=8)
+    digests = []
+    for string in strings:
+        cur_h = base.copy()
+        cur_h.update(string.encode("ascii"))
+        digests.append(cur_h.digest())
+    return b"".join(digests)
+
+
+def hash_many(values, num_digits: int = None, processes: int = 1) -> 'np.ndarray':
+    """Hash a sequence of strings.
+
+    Each distinct string is hashed only once and the digests are read
+    as integers directly, without the hex round trip of hash_int.
+
+    Args:
+        values (iterable, pandas.Series): the strings to hash
+        num_digits (int): if specified, keep only the last num_digits
+            decimal digits, as hash_int does
+        processes (int): number of processes used when there are more
+            than POOL_THRESHOLD distinct strings
+
+    Returns:
+        numpy.ndarray: the uint64 hashes, hash_int(value) for each value
+            when num_digits is specified
+    """
+    if not isinstance(values, (np.ndarray, pd.Series)):
+        values = list(values)
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+    if (codes < 0).any():
+        raise Exception("Cannot hash missing values (None or NaN)...")
+    uniques = uniques.tolist()
+
+    if processes > 1 and len(uniques) > POOL_THRESHOLD:
+        chunks = [
+            uniques[idx:idx + POOL_THRESHOLD // 10]
+            for idx in range(0, len(uniques), POOL_THRESHOLD // 10)
+        ]
+        with Pool(processes) as pool:
+            digests = b"".join(pool.map(_digests, chunks))
+    else:
+        digests = _digests(uniques)
+
+    hashes = np.frombuffer(digests, dtype='>u8').astype(np.uint64)
+    if num_digits is not None:
+        hashes %= np.uint64(10**num_digits)
+    return hashes[codes]
+
+
+def hash_stream(stream, target: str = "int", processes: int = 1):
+    """Hash each line of a text stream.
+
+    Yields:
+        str: the output lines, a hash for each input line
+    """
+    while True:
+        lines = [line.rstrip("\n") for line in islice(stream, FILE_CHUNK)]
+        if not lines:
+            break
+        if target == "hex":
+            for value in hash_many(lines, processes=processes).tolist():
+                yield f"{value:016x}"
+        else:
+            for value in hash_many(lines, num_digits=10, processes=processes).tolist():
+                yield str(value)
+
+
 if __name__ == "__main__":
-    if len(argv) == 3:
+    if len(argv) == 3 and argv[1] in ["hex", "int"] and argv[2] == "-":
+        for line in hash_stream(stdin, argv[1]):
+            print(line)
+    elif len(argv) == 4 and argv[1] in ["hex", "int"] and argv[2] == "--file":
+        with open(argv[3]) as input_file:
+            for line in hash_stream(input_file, argv[1]):
+                print(line)
+    elif len(argv) == 3:
         if argv[1] == "hex":
             print(hash_hexdigest(argv[2]))
         elif argv[1] == "int":
@@ -24,4 +110,4 @@ if __name__ == "__main__":
         else:
             print(f"Error: Unrecognized target {argv[1]}")
     else:
-        print("Too many arguments... usage: target[hex, int] string_value")
+        print("Wrong arguments... usage: target[hex, int] [string_value | - | --file filename]")
@@ -0,0 +1,131 @@
+import mmap
+from os import path
+
+import numpy as np
+import pandas as pd
+
+__all__ = ['NameTable']
+
+
+class NameTable(object):
+
+    """Map names (e.g. file LFNs) to consecutive int32 ids.
+
+    If a filename is given the table is persisted as an append-only
+    log with a name per line, the id of a name is its line number.
+    The log is memory-mapped and split once at load time, new names
+    are appended at each flush, so the same ids can be shared by
+    different tools (pySim, Probe converter, analysis scripts).
+
+    Note:
+        Only one process at a time should add names to a log.
+    """
+
+    def __init__(self, filename: str = None):
+        """Init function of the name table.
+
+        Args:
+            filename (str): the log file, created if it does not exist
+
+        Returns:
+            NameTable: the instance of this object
+
+        """
+        self._ids = {}
+        self._pending = []
+        self._filename = filename
+        self.__log = None
+        if filename is not None:
+            self.__load()
+            self.__log = open(filename, "ab")
+
+    def __load(self):
+        if not path.isfile(self._filename) or path.getsize(self._filename) == 0:
+            return
+        with open(self._filename, "r+b") as log_file:
+            with mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                end = content.rfind(b"\n") + 1
+                names = content[:end].decode("utf-8").split("\n")[:-1]
+            # Drop a partial record left by an interrupted write
+            if end != path.getsize(self._filename):
+                log_file.truncate(end)
+        self._ids = dict(zip(names, range(len(names))))
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, name) -> bool:
+        return name in self._ids
+
+    def __getitem__(self, name) -> int:
+        return self._ids[name]
+
+    @property
+    def names(self) -> list:
+        """The names in id order."""
+        return list(self._ids)
+
+    def get_or_add(self, name) -> int:
+        """Get the id of a name, adding it if it is new."""
+        if self._filename is not None:
+            name = str(name)
+        idx = self._ids.get(name)
+        if idx is None:
+            idx = len(self._ids)
+            if self._filename is not None:
+                if name.find("\n") != -1:
+                    raise Exception("Names with a new line are not supported...")
+                self._pending.append(name)
+            self._ids[name] = idx
+        return idx
+
+    def intern(self, values) -> np.ndarray:
+        """Get the ids of an array of names, adding the new ones.
+
+        Each distinct value is hashed only once per call.
+
+        Args:
+            values (numpy.ndarray, pandas.Series): the names to intern
+
+        Returns:
+            numpy.ndarray: the int32 ids of the names
+        """
+        codes, uniques = pd.factorize(np.asarray(values))
+        if (codes < 0).any():
+            raise Exception("Missing names (None or NaN) cannot be interned...")
+        uniques = uniques.tolist()
+        table = np.fromiter(
+            (self.get_or_add(value) for value in uniques),
+            dtype=np.int32, count=len(uniques)
+        )
+        self.flush()
+        return table[codes]
+
+    def flush(self):
+        """Append the new names to the log."""
+        if self._pending:
+            self.__log.write(("\n".join(self._pending) + "\n").encode("utf-8"))
+            self.__log.flush()
+            self._pending = []
+
+    def close(self):
+        if self.__log is not None and not self.__log.closed:
+            self.flush()
+            self.__log.close()
+
+    def __del__(self):
+        """Object destructor."""
+        self.close()
+
+    def __enter__(self):
+        """Initialization for 'with' statement.
+
+        Returns:
+            NameTable: this object instance
+
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Closing function for the 'with' statement."""
+        self.close()
@@ -0,0 +1,67 @@
+import unittest
+
+
+class TestNameTable(unittest.TestCase):
+
+    def test_persistent_table(self):
+        from os import path
+        from tempfile import TemporaryDirectory
+        from .name_table import NameTable
+        with TemporaryDirectory() as folder:
+            filename = path.join(folder, "filenames.log")
+            with NameTable(filename) as table:
+                ids = table.intern(["/store/A", "/store/B", "/store/A"])
+                self.assertEqual(ids.tolist(), [0, 1, 0])
+                self.assertEqual(table.get_or_add(42), 2)
+
+            with open(filename, "ab") as log_file:
+                log_file.write(b"/store/partial")
+
+            with NameTable(filename) as table:
+                self.assertEqual(table.names, ["/store/A", "/store/B", "42"])
+                self.assertEqual(table["42"], 2)
+                ids = table.intern(["/store/C", "/store/B"])
+                self.assertEqual(ids.tolist(), [3, 1])
+
+            self.assertEqual(len(NameTable(filename)), 4)
+
+    def test_missing_names(self):
+        from os import path
+        from tempfile import TemporaryDirectory
+        import pandas as pd
+        from Probe.probe.converter.name_table import NameTable as ProbeNameTable
+        from .name_table import NameTable
+        # The Probe converter has a copy of the table with the same format
+        for table_type in [NameTable, ProbeNameTable]:
+            with TemporaryDirectory() as folder:
+                filename = path.join(folder, "filenames.log")
+                table = table_type(filename)
+                with self.assertRaises(Exception):
+                    table.intern(pd.Series(["/store/A", None, "/store/B"]))
+                self.assertEqual(table.intern(pd.Series(["/store/B", "/store/A"])).tolist(),
+                                 [0, 1])
+                table.close()
+                self.assertEqual(table_type(filename).intern(["/store/A"]).tolist(), [1])
+
+
+class TestHashTool(unittest.TestCase):
+
+    def test_hash_many(self):
+        import pandas as pd
+        from .hash_tool import hash_hexdigest, hash_int, hash_many
+        values = ["/store/A", "/store/B", "/store/A"]
+
+        self.assertEqual(
+            hash_many(pd.Series(values), num_digits=10).tolist(),
+            [hash_int(value) for value in values]
+        )
+        self.assertEqual(
+            [f"{value:016x}" for value in hash_many(iter(values)).tolist()],
+            [hash_hexdigest(value) for value in values]
+        )
+        with self.assertRaises(Exception):
+            hash_many(pd.Series(["/store/A", None, "/store/B"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,12 +1,16 @@
 import pandas as pd
 from tqdm import tqdm
 import pathlib
+from sys import argv
 
 
 def main():
     main_folder = pathlib.Path(".").resolve()
     print(main_folder.as_posix(), list(main_folder.glob("**/*.csv.gz")))
 
+    # Optional cache sizes in TB for the finite capacity upper bounds
+    capacities = [float(elm) for elm in argv[1:]]
+
     for dir_ in main_folder.iterdir():
         if dir_.is_dir():
             for file_ in tqdm(dir_.glob("*.csv.gz"),
@@ -25,6 +29,17 @@ def main():
 
                 print(file_, max_hit_rate, max_read_on_hit)
 
+            if capacities:
+                from SmartCache.pySim.belady import upper_bounds
+                bounds = upper_bounds(
+                    [file_.as_posix() for file_ in sorted(dir_.glob("*.csv.gz"))],
+                    [capacity * 1024**2 for capacity in capacities]
+                )
+                for capacity, hit_rate, read_on_hit in zip(
+                    capacities, bounds['hit_rate'], bounds['read_on_hit']
+                ):
+                    print(dir_, f"{capacity}T", hit_rate * 100., read_on_hit * 100.)
+
 
 if __name__ == "__main__":
     main()
@@ -21,7 +21,9 @@ setup(
         'DataManager.collector.dataset',
         'SmartCache',
         'SmartCache.ai',
-        'SmartCache.ai.models'
+        'SmartCache.ai.models',
+        'SmartCache.pySim',
+        'SmartCache.utils'
     ],
     scripts=[],
     url='https://github.com/Cloud-PG/smart-cache',
@@ -29,6 +31,12 @@ setup(
     description='Tool collection for SmartCache.',
     long_description="To do...",
     install_requires=open("requirements.txt").read(),
+    extras_require={
+        # Parquet data files, Table.from_pylist is in pyarrow 7
+        'parquet': ["pyarrow>=7.0.0"],
+        # Faster parsing of the JSON data files
+        'fastjson': ["orjson>=3.0.0"],
+    },
     classifier=[
         "Operating System :: POSIX :: Linux",
         "License :: OSI Approved :: Apache 2.0 License",